@@ -0,0 +1,68 @@
+"""Benchmark: applying a rename plan to a large folder.
+
+Creates ``--files`` small files in a temporary folder, writes a plan that
+renames every one of them (a third of them onto the same name, so
+collisions have to be resolved), then times :func:`apply_plan`. No PDF is
+parsed; this measures only what ``pdf-organizer apply`` does.
+
+Run with ``python -m benchmarks.bench_apply --files 100000``.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from pdf_organizer.plan import apply_plan, write_plan
+
+_DOC_TYPES = ["Invoice", "Receipt", "Bank_Statement"]
+
+
+def make_plan(folder: Path, plan_path: Path, count: int) -> None:
+    """Create *count* files in *folder* and a plan renaming all of them."""
+    results = []
+    for i in range(count):
+        name = f"scan_{i:07d}.pdf"
+        (folder / name).write_bytes(b"%PDF-1.0\n")
+        if i % 3 == 0:
+            date = "2024-01-01"  # Every third file collides on the same name.
+        else:
+            date = f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        results.append({
+            "original_name": name,
+            "new_name": "",
+            "doc_type": _DOC_TYPES[i % len(_DOC_TYPES)],
+            "institution": f"Bank{i % 97}",
+            "date": date,
+            "pages": 1,
+            "status": "renamed",
+            "duplicate_of": "",
+        })
+    write_plan(results, plan_path, folder)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "docs"
+        folder.mkdir()
+        plan_path = Path(tmp) / "plan.jsonl"
+        make_plan(folder, plan_path, args.files)
+
+        start = time.perf_counter()
+        results = apply_plan(plan_path)
+        elapsed = time.perf_counter() - start
+
+        renamed = sum(r["status"] == "renamed" for r in results)
+        print(f"{args.files} files, {renamed} renamed in {elapsed:.2f}s "
+              f"({args.files / elapsed:.0f} files/s)")
+        return 0 if renamed == args.files else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Benchmark: batch classification throughput, classify vs. classify_many.
+
+Builds a seeded collection of already-extracted texts (see
+:func:`benchmarks.corpus.make_pages`) and classifies it with a
+:func:`classify` loop, then with :func:`classify_many` serially and with
+each ``--jobs`` value. Reports texts/sec and the speedup over the loop,
+and checks that every batch run agrees with :func:`classify`.
+
+Run with ``python -m benchmarks.bench_classify --texts 100000 --jobs 1 4``.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+from benchmarks.corpus import make_pages
+from pdf_organizer.classifier import DOC_TYPE_RULES, classify, classify_many
+
+
+def make_texts(count: int, pages: int, seed: int = 0) -> list[str]:
+    """Return *count* document texts cycling through every doc type."""
+    rng = random.Random(seed)
+    doc_types = [doc_type for doc_type, _ in DOC_TYPE_RULES]
+    return [
+        "\n".join(make_pages(doc_types[i % len(doc_types)], rng, pages)[0])
+        for i in range(count)
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument(
+        "--jobs", type=int, nargs="+", default=[os.cpu_count() or 1],
+        help="worker counts to measure classify_many with",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    texts = make_texts(args.texts, args.pages)
+    start = time.perf_counter()
+    expected = [classify(text) for text in texts]
+    baseline = time.perf_counter() - start
+
+    print(f"{len(texts)} texts, {sum(map(len, texts)) // len(texts)} chars each")
+    print(f"{'method':<22} {'texts/s':>10} {'speedup':>8}  agrees")
+    print(f"{'classify loop':<22} {len(texts) / baseline:>10.0f} {1:>7.2f}x")
+    ok = True
+    for jobs in [1] + [j for j in args.jobs if j > 1]:
+        start = time.perf_counter()
+        table = classify_many(texts, jobs=jobs, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - start
+        agrees = list(table) == expected
+        ok = ok and agrees
+        print(f"{f'classify_many -j {jobs}':<22} {len(texts) / elapsed:>10.0f} "
+              f"{baseline / elapsed:>7.2f}x  {'yes' if agrees else 'NO'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
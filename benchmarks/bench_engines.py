@@ -0,0 +1,84 @@
+"""Benchmark: text extraction engines, speed and classification agreement.
+
+Extracts every PDF with each engine in :data:`ENGINES`, classifies the
+text, and reports files/sec plus how often each engine's doc type,
+institution and date agree with the ``layout`` engine (the reference).
+Runs on a synthetic corpus by default; pass ``--folder`` to measure a
+directory of real PDFs instead.
+
+Run with ``python -m benchmarks.bench_engines``.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.corpus import generate
+from benchmarks.bench_pipeline import percentile
+from pdf_organizer.classifier import classify
+from pdf_organizer.extractor import ENGINES, extract_text
+
+_FIELDS = ("doc_type", "institution", "date")
+
+
+def run(paths: list[Path]) -> list[dict]:
+    results: dict[str, list[dict[str, str]]] = {}
+    rows = []
+    for engine in ["layout"] + [e for e in ENGINES if e != "layout"]:
+        samples = []
+        infos = []
+        for path in paths:
+            start = time.perf_counter()
+            text = extract_text(path, engine=engine)
+            samples.append(time.perf_counter() - start)
+            infos.append(classify(text))
+        results[engine] = infos
+        reference = results["layout"]
+        agree = {
+            field: sum(a[field] == b[field] for a, b in zip(infos, reference))
+            for field in _FIELDS
+        }
+        rows.append({
+            "engine": engine,
+            "files_per_sec": len(paths) / sum(samples),
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "all_agree": sum(
+                all(a[f] == b[f] for f in _FIELDS) for a, b in zip(infos, reference)
+            ),
+            **{f"{field}_agree": count for field, count in agree.items()},
+        })
+    return rows
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folder", type=Path, help="PDFs to measure")
+    parser.add_argument("--files", type=int, default=70)
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.folder:
+            paths = sorted(
+                p for p in args.folder.iterdir() if p.suffix.lower() == ".pdf"
+            )
+        else:
+            paths = [p for p, _, _ in generate(Path(tmp), args.files, args.pages)]
+        rows = run(paths)
+
+    n = len(paths)
+    print(f"{n} files; agreement is with the layout engine")
+    print(f"{'engine':<8} {'files/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'all':>6} {'type':>6} {'inst':>6} {'date':>6}")
+    for row in rows:
+        print(f"{row['engine']:<8} {row['files_per_sec']:>9.1f} "
+              f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+              f"{row['all_agree'] / n:>6.0%} {row['doc_type_agree'] / n:>6.0%} "
+              f"{row['institution_agree'] / n:>6.0%} {row['date_agree'] / n:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: peak memory of extracting one long PDF.
+
+Writes a seeded ``--pages``-page statement (see :func:`benchmarks.corpus.
+write_pdf`) and extracts it with each ``--engine``, each time in a fresh
+process, reporting the time taken and the peak RSS of that process. Every
+engine is measured as shipped and with page caches kept (the old
+behaviour), which shows how memory grows with page count without
+:func:`pdf_organizer.extractor._release`.
+
+Run with ``python -m benchmarks.bench_memory --pages 200``.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.corpus import make_pages, write_pdf
+from pdf_organizer import extractor
+from pdf_organizer.supervisor import peak_rss
+
+
+def _measure(path: Path, engine: str, keep: bool) -> tuple[float, Optional[int]]:
+    if keep:
+        # Hold on to every page, as iterating ``pdf.pages`` used to.
+        kept = []
+        extractor._release = lambda pdf, page: kept.append(page)
+    start = time.perf_counter()
+    for _ in extractor.iter_page_texts(path, engine=engine):
+        pass
+    return time.perf_counter() - start, peak_rss()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--dates", type=int, default=40, help="dates per page")
+    parser.add_argument(
+        "--engine", nargs="+", default=["fast", "layout"],
+        choices=list(extractor.ENGINES),
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "long.pdf"
+        pages, _ = make_pages(
+            "Bank_Statement", random.Random(0), args.pages, args.dates
+        )
+        write_pdf(path, pages)
+        print(f"{args.pages} pages, {path.stat().st_size / 2**20:.1f} MB")
+        print(f"{'engine':<8} {'caches':<9} {'seconds':>8} {'peak MB':>8}")
+        with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+            for engine in args.engine:
+                for keep in (False, True):
+                    seconds, peak = pool.apply(_measure, (path, engine, keep))
+                    peak_mb = "-" if peak is None else f"{peak / 2**20:.0f}"
+                    print(f"{engine:<8} {'kept' if keep else 'released':<9} "
+                          f"{seconds:>8.2f} {peak_mb:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
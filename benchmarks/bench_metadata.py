@@ -0,0 +1,72 @@
+"""Benchmark: classifying from metadata and file names before reading pages.
+
+Writes three seeded folders of ``--files`` PDFs of ``--pages`` pages each
+(see :func:`benchmarks.corpus.generate`): plain scans named
+``scan_NNN.pdf``, the same documents with a Title that names their type,
+institution and date, and a folder already renamed by a previous run. Each
+is classified with :func:`pdf_organizer.renamer.rename_files` (dry run, no
+cache, ``--engine``) as shipped and with ``text_only`` (the old
+behaviour), reporting the best files/sec of ``--repeat`` runs and the
+pages read.
+
+Run with ``python -m benchmarks.bench_metadata --files 200 --pages 5``.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.corpus import generate
+from pdf_organizer.extractor import ENGINES
+from pdf_organizer.renamer import rename_files
+
+
+def _measure(
+    folder: Path, engine: str, text_only: bool, repeat: int
+) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = rename_files(
+            folder, dry_run=True, engine=engine, text_only=text_only
+        )
+        best = min(best, time.perf_counter() - start)
+    return len(results) / best, sum(r["pages"] for r in results)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N")
+    parser.add_argument("--engine", default="auto", choices=list(ENGINES))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = Path(tmp) / "plain"
+        titled = Path(tmp) / "titled"
+        organized = Path(tmp) / "organized"
+        generate(plain, args.files, args.pages)
+        generate(titled, args.files, args.pages, titled=True)
+        generate(organized, args.files, args.pages)
+        rename_files(organized, engine=args.engine)
+
+        print(f"{args.files} files of {args.pages} pages each")
+        print(f"{'corpus':<10} {'tiered':>8} {'pages':>7} "
+              f"{'text-only':>10} {'pages':>7}")
+        for name, folder in (
+            ("plain", plain), ("titled", titled), ("organized", organized)
+        ):
+            tiered, tiered_pages = _measure(folder, args.engine, False, args.repeat)
+            text, text_pages = _measure(folder, args.engine, True, args.repeat)
+            print(f"{name:<10} {tiered:>8.0f} {tiered_pages:>7} "
+                  f"{text:>10.0f} {text_pages:>7}")
+        print("(files/sec, pages read)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""Benchmark suite: throughput and latency of each pipeline stage.
+
+Generates a synthetic corpus (see :mod:`benchmarks.corpus`) and times
+
+* ``extract``  -- :func:`extract_text` per file,
+* ``classify`` -- :func:`classify` per extracted text,
+* ``name``     -- :func:`build_new_name` plus collision resolution against
+  a :class:`DirectoryIndex`, as :func:`iter_renames` does it,
+* ``resolve_collision`` -- the same names through the stat-based
+  :func:`_resolve_collision`,
+* ``rename``   -- the full :func:`iter_renames` path on a fresh copy of the
+  corpus (no cache), timing the gap between consecutive results.
+
+Results are printed and can be saved as JSON with files/sec and p50/p95
+latency per stage. ``--baseline`` compares against an earlier JSON file
+and exits with status 1 if any stage regressed beyond ``--threshold``.
+
+Run with ``python -m benchmarks.bench_pipeline --output bench.json``.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+from benchmarks.corpus import generate
+from pdf_organizer.classifier import classify
+from pdf_organizer.extractor import extract_text
+from pdf_organizer.renamer import (
+    DirectoryIndex,
+    _resolve_collision,
+    build_new_name,
+    iter_renames,
+)
+
+# Bump when the JSON layout changes.
+_FORMAT_VERSION = 1
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the *pct* percentile of *samples* (nearest-rank)."""
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(samples: list[float], elapsed: float) -> dict[str, float]:
+    """Return files/sec and latency percentiles (ms) for one stage run."""
+    return {
+        "files": len(samples),
+        "files_per_sec": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "total_s": elapsed,
+    }
+
+
+def _time_each(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+) -> tuple[list[float], float]:
+    samples = []
+    start = time.perf_counter()
+    for item in items:
+        t = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - t)
+    return samples, time.perf_counter() - start
+
+
+def _time_stream(results: Iterable[Any]) -> tuple[list[float], float]:
+    samples = []
+    start = last = time.perf_counter()
+    for _ in results:
+        now = time.perf_counter()
+        samples.append(now - last)
+        last = now
+    return samples, last - start
+
+
+def run(
+    count: int,
+    pages: int,
+    dates_per_page: int,
+    repeat: int,
+    jobs: int,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Run every stage *repeat* times and return the best run of each."""
+    stages: dict[str, dict[str, float]] = {}
+
+    def record(name: str, samples: list[float], elapsed: float) -> None:
+        result = summarize(samples, elapsed)
+        best = stages.get(name)
+        if best is None or result["files_per_sec"] > best["files_per_sec"]:
+            stages[name] = result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus"
+        written = generate(corpus, count, pages, dates_per_page, seed)
+        paths = [path for path, _, _ in written]
+
+        texts = [extract_text(path) for path in paths]
+        infos = [classify(text) for text in texts]
+        correct = sum(
+            (info["doc_type"], info["institution"]) == (doc_type, institution)
+            for info, (_, doc_type, institution) in zip(infos, written)
+        )
+
+        for i in range(repeat):
+            record("extract", *_time_each(extract_text, paths))
+            record("classify", *_time_each(classify, texts))
+
+            index = DirectoryIndex(corpus)
+
+            def name(pair: tuple[dict[str, str], Path]) -> None:
+                new_name = index.resolve(build_new_name(*pair))
+                index.add(new_name)
+
+            record("name", *_time_each(name, zip(infos, paths)))
+            record("resolve_collision", *_time_each(
+                lambda pair: _resolve_collision(corpus / build_new_name(*pair)),
+                zip(infos, paths),
+            ))
+
+            work = Path(tmp) / f"run{i}"
+            shutil.copytree(corpus, work)
+            record("rename", *_time_stream(iter_renames(work, jobs=jobs)))
+            shutil.rmtree(work)
+
+    return {
+        "version": _FORMAT_VERSION,
+        "meta": {
+            "files": count,
+            "pages": pages,
+            "dates_per_page": dates_per_page,
+            "seed": seed,
+            "repeat": repeat,
+            "jobs": jobs,
+            "classified_correctly": correct,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": stages,
+    }
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float,
+) -> list[str]:
+    """Print current vs. *baseline* per stage; return the regressed stages.
+
+    A stage regresses if its files/sec drops, or its p95 latency rises, by
+    more than *threshold* (a fraction).
+    """
+    regressed = []
+    print(f"\n{'stage':<18} {'base f/s':>10} {'now f/s':>10} {'change':>8} "
+          f"{'base p95':>9} {'now p95':>9}")
+    for name, now in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base is None:
+            print(f"{name:<18} {'-':>10} {now['files_per_sec']:>10.1f}")
+            continue
+        change = now["files_per_sec"] / base["files_per_sec"] - 1
+        slower = (
+            change < -threshold
+            or now["p95_ms"] > base["p95_ms"] * (1 + threshold)
+        )
+        if slower:
+            regressed.append(name)
+        print(f"{name:<18} {base['files_per_sec']:>10.1f} "
+              f"{now['files_per_sec']:>10.1f} {change:>+7.1%} "
+              f"{base['p95_ms']:>9.3f} {now['p95_ms']:>9.3f}"
+              f"{'  REGRESSION' if slower else ''}")
+    return regressed
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--dates", type=int, default=3, help="dates per page")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON results to compare with")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="allowed slowdown vs. the baseline (default: 0.10 = 10%%)",
+    )
+    args = parser.parse_args(argv)
+
+    result = run(args.files, args.pages, args.dates, args.repeat, args.jobs, args.seed)
+    meta = result["meta"]
+    print(f"{meta['files']} files x {meta['pages']} pages, "
+          f"{meta['classified_correctly']} classified correctly")
+    print(f"{'stage':<18} {'files/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stage in result["stages"].items():
+        print(f"{name:<18} {stage['files_per_sec']:>10.1f} "
+              f"{stage['p50_ms']:>9.3f} {stage['p95_ms']:>9.3f}")
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["meta"]["files"] != meta["files"] or (
+            baseline["meta"]["pages"] != meta["pages"]
+        ):
+            print("warning: baseline was run on a different corpus size")
+        if compare(result, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Microbenchmark: doc type rule matching, compiled vs. sequential.
+
+Measures the per-document cost of finding the doc type as a function of
+text length and rule count, comparing :class:`CompiledRules` against the
+original approach of calling ``re.search`` once per pattern.
+
+Run with ``python -m benchmarks.bench_rules``.
+"""
+
+import argparse
+import random
+import re
+import time
+
+from pdf_organizer.classifier import DOC_TYPE_RULES, compile_rules
+
+_FILLER = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua 12 34 2024 usd"
+).split()
+
+
+def sequential_doc_type(text: str, rules: list[tuple[str, list[str]]]) -> str:
+    """The original matcher: lowercase, then one re.search per pattern."""
+    text_lower = text.lower()
+    for doc_type, patterns in rules:
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                return doc_type
+    return "Unknown"
+
+
+def make_rules(count: int, rng: random.Random) -> list[tuple[str, list[str]]]:
+    """Return DOC_TYPE_RULES padded with synthetic keyword rules to *count*."""
+    rules = [(doc_type, list(patterns)) for doc_type, patterns in DOC_TYPE_RULES]
+    total = sum(len(patterns) for _, patterns in rules)
+    extra: list[str] = []
+    while total + len(extra) < count:
+        word = "".join(rng.choice("bcdfghjklmnpqrstvwxz") for _ in range(7))
+        extra.append(rf"\b{word}\b")
+    if extra:
+        rules.append(("Synthetic", extra))
+    return rules
+
+
+def make_text(length: int, rng: random.Random) -> str:
+    """Return *length* characters of filler text that matches no rule."""
+    words: list[str] = []
+    size = 0
+    while size < length:
+        word = rng.choice(_FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def _time(func, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(lengths: list[int], rule_counts: list[int], repeat: int) -> list[dict]:
+    rng = random.Random(0)
+    rows = []
+    for count in rule_counts:
+        rules = make_rules(count, rng)
+        compiled = compile_rules(rules)
+        for length in lengths:
+            # Worst case: no rule matches, so every pattern scans everything.
+            text = make_text(length, rng)
+            assert compiled.match(text) == sequential_doc_type(text, rules)
+            seq = _time(sequential_doc_type, text, rules, repeat=repeat)
+            comp = _time(compiled.match, text, repeat=repeat)
+            rows.append({
+                "rules": sum(len(p) for _, p in rules),
+                "chars": length,
+                "sequential_ms": seq * 1000,
+                "compiled_ms": comp * 1000,
+                "speedup": seq / comp if comp else float("inf"),
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--lengths", type=int, nargs="+",
+        default=[1_000, 10_000, 100_000, 1_000_000],
+    )
+    parser.add_argument("--rules", type=int, nargs="+", default=[31, 100, 300])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rules':>6} {'chars':>10} {'sequential ms':>14} "
+          f"{'compiled ms':>12} {'speedup':>8}")
+    for row in run(args.lengths, args.rules, args.repeat):
+        print(f"{row['rules']:>6} {row['chars']:>10} {row['sequential_ms']:>14.2f} "
+              f"{row['compiled_ms']:>12.2f} {row['speedup']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark: writing and searching the rename log, CSV against SQLite.
+
+Logs ``--rows`` synthetic results with :class:`pdf_organizer.renamer.CsvLog`
+and with :class:`pdf_organizer.runlog.SqliteLog`, reporting rows written per
+second, then finds one institution's documents from one month: by reading
+the whole CSV, as a user with only the CSV log would, and with
+:func:`pdf_organizer.runlog.query_log` on the indexed database. The SQLite
+log is also written committing every row, as a naive logger would, to show
+what batching the inserts saves.
+
+Run with ``python -m benchmarks.bench_runlog --rows 1000000``.
+"""
+
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from pdf_organizer import runlog
+from pdf_organizer.renamer import CsvLog
+from pdf_organizer.runlog import SqliteLog, query_log
+
+_TYPES = ["Invoice", "Bank_Statement", "Receipt", "Tax_Document", "Other"]
+_INSTITUTIONS = [f"Institution{i}" for i in range(200)]
+
+
+def _results(count: int) -> list[dict[str, Any]]:
+    rng = random.Random(0)
+    results = []
+    for i in range(count):
+        doc_type = rng.choice(_TYPES)
+        institution = rng.choice(_INSTITUTIONS)
+        date = f"20{rng.randint(15, 24)}-{rng.randint(1, 12):02d}-15"
+        results.append({
+            "original_name": f"scans/{i // 1000:04d}/scan_{i}.pdf",
+            "new_name": f"{doc_type}_{institution}_{date}_{i}.pdf",
+            "doc_type": doc_type, "institution": institution, "date": date,
+            "pages": rng.randint(1, 20), "status": "renamed",
+            "duplicate_of": "",
+        })
+    return results
+
+
+def _write(log: Any, results: list[dict[str, Any]]) -> float:
+    start = time.perf_counter()
+    with log:
+        for r in results:
+            log.write(r)
+    return time.perf_counter() - start
+
+
+def _scan_csv(path: Path, institution: str, month: str) -> int:
+    with open(path, newline="", encoding="utf-8") as fh:
+        return sum(
+            1 for row in csv.DictReader(fh)
+            if row["institution"].lower() == institution.lower()
+            and row["date"].startswith(month)
+        )
+
+
+def _timed(func: Any, *args: Any, **kwargs: Any) -> tuple[float, Any]:
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return time.perf_counter() - start, value
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--unbatched-rows", type=int, default=20_000,
+        help="rows for the commit-per-row run, which is slow",
+    )
+    args = parser.parse_args(argv)
+
+    results = _results(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        csv_path, db_path = tmp_path / "log.csv", tmp_path / "log.db"
+        print(f"{'log':<22} {'rows':>9} {'seconds':>8} {'rows/s':>10}")
+        for name, log, rows in (
+            ("csv", CsvLog(csv_path), results),
+            ("sqlite", SqliteLog(db_path, tmp_path), results),
+        ):
+            seconds = _write(log, rows)
+            print(f"{name:<22} {len(rows):>9} {seconds:>8.2f} "
+                  f"{len(rows) / seconds:>10.0f}")
+
+        batch, runlog._BATCH_SIZE = runlog._BATCH_SIZE, 1
+        unbatched = results[:args.unbatched_rows]
+        seconds = _write(SqliteLog(tmp_path / "unbatched.db", tmp_path), unbatched)
+        runlog._BATCH_SIZE = batch
+        print(f"{'sqlite, commit per row':<22} {len(unbatched):>9} "
+              f"{seconds:>8.2f} {len(unbatched) / seconds:>10.0f}")
+
+        print()
+        institution, month = "institution7", "2023-04"
+        csv_seconds, csv_count = _timed(_scan_csv, csv_path, institution, month)
+        db_seconds, db_rows = _timed(
+            lambda: list(query_log(db_path, institution=institution, date=month))
+        )
+        assert csv_count == len(db_rows)
+        print(f"{institution} in {month}: {csv_count} rows")
+        print(f"  CSV scan      {csv_seconds * 1000:>9.1f} ms")
+        print(f"  SQLite query  {db_seconds * 1000:>9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Benchmark: extracting scanned PDFs, with and without the text layer check.
+
+Writes ``--files`` seeded scans of ``--pages`` image-only pages each (see
+:func:`benchmarks.corpus.write_scan_pdf`) and as many text PDFs, and
+extracts every file with each ``--engine``: as shipped, which skips pages
+that :func:`pdf_organizer.extractor.has_text_layer` rejects, and with the
+check disabled (the old behaviour), reporting the best pages/sec of
+``--repeat`` runs. The text PDFs show what the check costs on pages that
+do have text.
+
+Run with ``python -m benchmarks.bench_scans --files 20 --pages 5``.
+"""
+
+import argparse
+import contextlib
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+from unittest import mock
+
+from benchmarks.corpus import generate, write_scan_pdf
+from pdf_organizer import extractor
+
+
+def _pages_per_sec(
+    paths: list[Path], engine: str, check: bool, repeat: int
+) -> float:
+    best = float("inf")
+    with contextlib.ExitStack() as stack:
+        if not check:
+            stack.enter_context(
+                mock.patch.object(extractor, "has_text_layer", lambda page: True)
+            )
+        for _ in range(repeat):
+            pages = 0
+            start = time.perf_counter()
+            for path in paths:
+                pages += sum(1 for _ in extractor.iter_page_texts(path, engine=engine))
+            best = min(best, time.perf_counter() - start)
+    return pages / best
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--dpi", type=int, default=100, help="scan resolution")
+    parser.add_argument("--repeat", type=int, default=3, help="best of N")
+    parser.add_argument(
+        "--engine", nargs="+", default=list(extractor.ENGINES),
+        choices=list(extractor.ENGINES),
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = random.Random(0)
+        scans = [
+            write_scan_pdf(Path(tmp) / f"scan_{i}.pdf", args.pages, rng, args.dpi)
+            for i in range(args.files)
+        ]
+        texts = [
+            path for path, _, _ in generate(
+                Path(tmp) / "text", args.files, args.pages, seed=1
+            )
+        ]
+        print(f"{args.files} files of {args.pages} pages each, "
+              f"scans at {args.dpi} dpi")
+        print(f"{'engine':<8} {'corpus':<7} {'check on':>10} {'check off':>10}")
+        for engine in args.engine:
+            for corpus, paths in (("scans", scans), ("text", texts)):
+                on = _pages_per_sec(paths, engine, True, args.repeat)
+                off = _pages_per_sec(paths, engine, False, args.repeat)
+                print(f"{engine:<8} {corpus:<7} {on:>10.0f} {off:>10.0f}")
+        print("(pages/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Benchmark: per-document latency of one-shot runs versus ``serve``.
+
+Writes ``--files`` single-page PDFs (see :mod:`benchmarks.corpus`) and
+classifies each of them, one process per document as an upload handler
+would: first with ``pdf-organizer --dry-run`` restricted to that file,
+then with ``pdf-organizer-client`` against a running ``pdf-organizer
+serve``, and finally with an in-process :class:`~pdf_organizer.client.
+Client`, which shows the server's own share of the latency.
+
+Run with ``python -m benchmarks.bench_serve --files 20``.
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from benchmarks.bench_pipeline import percentile
+from benchmarks.corpus import generate
+from pdf_organizer.client import Client
+
+_CLI = [sys.executable, "-c", "from pdf_organizer.cli import main; main()"]
+
+
+def _wait_for(socket_path: Path, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            Client(socket_path).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _time_each(commands: list[list[str]]) -> list[float]:
+    samples = []
+    for command in commands:
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp) / "docs"
+        paths = [str(path) for path, _, _ in generate(folder, args.files)]
+        socket_path = Path(tmp) / "serve.sock"
+
+        results = {
+            "one-shot": _time_each([
+                [*_CLI, "--dry-run", "--no-cache", "-j", "1",
+                 "--include", Path(path).name, str(folder)]
+                for path in paths
+            ])
+        }
+        server = subprocess.Popen(
+            [*_CLI, "serve", "--socket", str(socket_path), "-j", "1"],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for(socket_path)
+            results["client"] = _time_each([
+                [sys.executable, "-m", "pdf_organizer.client",
+                 "--socket", str(socket_path), path]
+                for path in paths
+            ])
+            samples = []
+            with Client(socket_path) as client:
+                for path in paths:
+                    start = time.perf_counter()
+                    client.classify(path)
+                    samples.append(time.perf_counter() - start)
+            results["in-process"] = samples
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{'mode':<11} {'p50 ms':>8} {'p95 ms':>8}")
+    for mode, samples in results.items():
+        print(f"{mode:<11} {percentile(samples, 50) * 1000:>8.1f} "
+              f"{percentile(samples, 95) * 1000:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Synthetic PDF corpus for benchmarks.
+
+Writes N small text PDFs cycling through every ``DOC_TYPE_RULES`` type,
+with a known institution and a configurable number of pages and dates per
+page. The output is fully determined by the arguments and *seed*, so two
+runs of a benchmark see byte-identical input. :func:`write_scan_pdf`
+writes scanned pages, images without a text layer, the same way.
+
+Run with ``python -m benchmarks.corpus OUT_DIR --count 500``.
+"""
+
+import argparse
+import random
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from pdf_organizer.classifier import DOC_TYPE_RULES
+
+_MONTH_NAMES = [
+    "January", "February", "March", "April", "May", "June", "July",
+    "August", "September", "October", "November", "December",
+]
+
+# First-page header per doc type. Each one hits its own rules and none of
+# the higher-priority ones; {inst} is filled with one of the institutions.
+_HEADERS: dict[str, tuple[list[str], str]] = {
+    "Tax_Return": (
+        ["IRS"],
+        "{inst} Internal Revenue Service\n"
+        "Form 1040 U.S. Individual Income Tax Return\n"
+        "Adjusted gross income ${amount}",
+    ),
+    "Bank_Statement": (
+        ["Chase", "Wells Fargo", "Citibank", "Capital One"],
+        "{inst}\nMonthly Account Summary\nBeginning balance ${amount}",
+    ),
+    "Insurance": (
+        ["Aetna", "State Farm", "Geico", "Allstate"],
+        "{inst}\nPolicy number HLT-{ref}\nMonthly premium ${amount}",
+    ),
+    "Invoice": (
+        ["Verizon", "Comcast", "AT&T"],
+        "{inst}\nInvoice #INV-{ref}\nBill To: Jane Smith\nAmount Due: ${amount}",
+    ),
+    "Receipt": (
+        ["Amazon", "Costco", "Target", "Best Buy"],
+        "{inst}\nReceipt {ref}\nThank you for your purchase",
+    ),
+    "Medical": (
+        ["Kaiser Permanente", "CVS", "Walgreens"],
+        "{inst}\nPatient: John Doe\nDiagnosis code Z00.{ref}",
+    ),
+    "Contract": (
+        ["Progressive"],
+        "{inst} Service Agreement\nThe parties hereby agree as follows",
+    ),
+}
+
+_FILLER = (
+    "item qty unit price subtotal reference note carried forward "
+    "description code category line total page continued"
+).split()
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(
+    path: Path, pages: list[str], title: Optional[str] = None
+) -> Path:
+    """Write a PDF with one Helvetica text page per entry in *pages*.
+
+    *title* is given as the document's Title, if at all.
+    """
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"",  # page tree, filled in below
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+    ]
+    kids = []
+    for page_text in pages:
+        ops = ["BT /F1 10 Tf 54 750 Td 12 TL"]
+        ops.extend(f"({_pdf_string(line)}) Tj T*" for line in page_text.splitlines())
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<</Length %d>>stream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>" % (len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+    if title is None:
+        return _write_objects(path, objects)
+    objects.append(b"<</Title(%s)>>" % _pdf_string(title).encode("latin-1"))
+    return _write_objects(path, objects, info=len(objects))
+
+
+def _write_objects(
+    path: Path, objects: list[bytes], info: Optional[int] = None
+) -> Path:
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    xref_pos = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer<</Size %d/Root 1 0 R%s>>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        b"/Info %d 0 R" % info if info else b"",
+        xref_pos,
+    )
+    path.write_bytes(bytes(out))
+    return path
+
+
+def write_scan_pdf(
+    path: Path, pages: int, rng: random.Random, dpi: int = 100
+) -> Path:
+    """Write a PDF of *pages* scanned pages: one grey image each, no text.
+
+    Each page is a Flate-compressed 8-bit image of a letter page at *dpi*,
+    mostly white with dark runs where lines of text would be.
+    """
+    width, height = int(8.5 * dpi), 11 * dpi
+    objects = [b"<</Type/Catalog/Pages 2 0 R>>", b""]
+    kids = []
+    for _ in range(pages):
+        rows = []
+        for y in range(height):
+            if y % 24 < 10 and dpi <= y < height - dpi:
+                row = bytearray(b"\xff" * width)
+                for x in range(dpi, width - dpi, 8):
+                    if rng.random() < 0.6:
+                        row[x:x + 6] = b"\x20" * 6
+                rows.append(bytes(row))
+            else:
+                rows.append(b"\xff" * width)
+        pixels = zlib.compress(b"".join(rows))
+        objects.append(
+            b"<</Type/XObject/Subtype/Image/Width %d/Height %d"
+            b"/ColorSpace/DeviceGray/BitsPerComponent 8/Filter/FlateDecode"
+            b"/Length %d>>stream\n%s\nendstream"
+            % (width, height, len(pixels), pixels)
+        )
+        content = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+        objects.append(
+            b"<</Length %d>>stream\n%s\nendstream" % (len(content), content)
+        )
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<</XObject<</Im1 %d 0 R>>>>/Contents %d 0 R>>"
+            % (len(objects) - 1, len(objects))
+        )
+        kids.append(len(objects))
+    objects[1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+    return _write_objects(path, objects)
+
+
+def _date(rng: random.Random) -> str:
+    y, m, d = rng.randint(2015, 2024), rng.randint(1, 12), rng.randint(1, 28)
+    return rng.choice([
+        f"{m:02d}/{d:02d}/{y}",
+        f"{_MONTH_NAMES[m - 1]} {d}, {y}",
+        f"{y}-{m:02d}-{d:02d}",
+    ])
+
+
+def make_pages(
+    doc_type: str,
+    rng: random.Random,
+    pages: int = 1,
+    dates_per_page: int = 3,
+    lines_per_page: int = 40,
+) -> tuple[list[str], str]:
+    """Return the page texts of one document and the institution in it."""
+    institutions, header = _HEADERS[doc_type]
+    institution = rng.choice(institutions)
+    texts = []
+    for page in range(pages):
+        lines = []
+        if page == 0:
+            lines.extend(header.format(
+                inst=institution,
+                ref=rng.randint(1000, 9999),
+                amount=f"{rng.randint(10, 9999)}.{rng.randint(0, 99):02d}",
+            ).splitlines())
+        filler = max(lines_per_page - len(lines), 0)
+        date_lines = set(rng.sample(range(filler), min(dates_per_page, filler)))
+        for i in range(filler):
+            words = " ".join(rng.choice(_FILLER) for _ in range(rng.randint(4, 9)))
+            if i in date_lines:
+                words += f" posted {_date(rng)}"
+            lines.append(f"{rng.randint(100, 999)} {words} {rng.randint(1, 999)}.00")
+        texts.append("\n".join(lines))
+    return texts, institution
+
+
+def generate(
+    folder: Path,
+    count: int,
+    pages: int = 1,
+    dates_per_page: int = 3,
+    seed: int = 0,
+    titled: bool = False,
+) -> list[tuple[Path, str, str]]:
+    """Write *count* PDFs into *folder*, cycling through every doc type.
+
+    If *titled*, each PDF's Title names its doc type, institution and a
+    date, as a scanner or accounting export might.
+
+    Returns ``(path, doc_type, institution)`` for each file, which is the
+    classification a correct run should produce.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    doc_types = [doc_type for doc_type, _ in DOC_TYPE_RULES]
+    width = len(str(count))
+    written = []
+    for i in range(count):
+        doc_type = doc_types[i % len(doc_types)]
+        texts, institution = make_pages(doc_type, rng, pages, dates_per_page)
+        title = None
+        if titled:
+            kind = doc_type.replace("_", " ")
+            title = f"{kind} - {institution} - {_date(rng)}"
+        path = write_pdf(folder / f"scan_{i:0{width}d}.pdf", texts, title)
+        written.append((path, doc_type, institution))
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--dates", type=int, default=3, help="dates per page")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    written = generate(args.folder, args.count, args.pages, args.dates, args.seed)
+    print(f"Wrote {len(written)} PDFs to {args.folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""Persistent on-disk cache of extracted text and classification results."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from pdf_organizer import classifier
+from pdf_organizer.institutions import InstitutionMatcher
+from pdf_organizer.mapped import MappedFile
+
+logger = logging.getLogger(__name__)
+
+# Default upper bound for the stored (compressed) text, in bytes.
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Pending writes are committed in batches of this many statements.
+_COMMIT_EVERY = 500
+
+# Bump when the tables below, or the text an engine stores in them, change;
+# older databases are rebuilt.
+_SCHEMA_VERSION = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    digest      TEXT PRIMARY KEY,
+    text        BLOB NOT NULL,
+    size        INTEGER NOT NULL,
+    complete    INTEGER NOT NULL,
+    engine      TEXT NOT NULL,
+    signature   TEXT NOT NULL,
+    doc_type    TEXT NOT NULL,
+    institution TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS files (
+    dev      INTEGER NOT NULL,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT NOT NULL,
+    PRIMARY KEY (dev, inode)
+);
+"""
+
+
+def default_cache_dir() -> Path:
+    """Return ``$XDG_CACHE_HOME/pdf-organizer`` (``~/.cache`` by default)."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pdf-organizer"
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of the file at *path*."""
+    with MappedFile(path) as mapped:
+        return mapped.digest()
+
+
+def classifier_signature(*settings: object) -> str:
+    """Return a short hash of the classifier rule set and *settings*.
+
+    Cached classifications made under a different signature are stale and
+    get recomputed from the cached text.
+    """
+    h = hashlib.sha256(repr(settings).encode())
+    for doc_type, patterns in classifier.DOC_TYPE_RULES:
+        h.update(doc_type.encode())
+        for pattern in patterns:
+            h.update(b"\0" + pattern.encode())
+    h.update(b"\1" + "\0".join(classifier.KNOWN_INSTITUTIONS).encode())
+    h.update(b"\1" + classifier._DATE_SCAN.pattern.encode())
+    return h.hexdigest()[:16]
+
+
+class CacheKey(NamedTuple):
+    """Fast fingerprint of a file plus its content digest."""
+
+    dev: int
+    inode: int
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+class ExtractionCache:
+    """SQLite-backed cache keyed by file content.
+
+    Lookups first try a ``(device, inode, size, mtime)`` fingerprint, which
+    only needs a ``stat`` call. Files whose fingerprint is unknown are hashed
+    so that copies and moved files still hit. Entries are evicted in
+    least-recently-used order once the stored text exceeds *max_bytes*.
+
+    *date_policy*, *max_pages*, *institutions* and *text_only* must match
+    the settings used to produce the results stored with :meth:`put`; they
+    are part of the signature. Text stored by a different extraction
+    *engine* is never reused.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        date_policy: str = "latest",
+        max_pages: Optional[int] = None,
+        institutions: Optional[InstitutionMatcher] = None,
+        engine: str = "layout",
+        text_only: bool = False,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.date_policy = date_policy
+        self.max_pages = max_pages
+        self.institutions = institutions
+        self.engine = engine
+        self.signature = classifier_signature(
+            date_policy,
+            max_pages,
+            institutions and institutions.fingerprint,
+            *(("text_only",) if text_only else ()),
+        )
+        self.hits = 0
+        self.misses = 0
+
+        # Lookups run in the rename pipeline's extraction thread; the cache
+        # is never used from two threads at once.
+        self._db = sqlite3.connect(
+            self.cache_dir / "cache.sqlite3", check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            self._db.executescript(
+                "DROP TABLE IF EXISTS entries; DROP TABLE IF EXISTS files;"
+                f"PRAGMA user_version = {_SCHEMA_VERSION};"
+            )
+        self._db.executescript(_SCHEMA)
+        self._total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        self._uncommitted = 0
+        self._clock = 0.0
+
+    def __enter__(self) -> "ExtractionCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        self._db.commit()
+        self._db.close()
+
+    def known_key(self, pdf_path: Path) -> Optional[CacheKey]:
+        """Return the key of *pdf_path* if its fingerprint is known.
+
+        Only stats the file; returns ``None`` if the file is new, has
+        changed or cannot be stat'ed, in which case :meth:`key` hashes it.
+        """
+        try:
+            st = os.stat(pdf_path)
+        except OSError:
+            return None
+        row = self._db.execute(
+            "SELECT size, mtime_ns, digest FROM files WHERE dev = ? AND inode = ?",
+            (st.st_dev, st.st_ino),
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return CacheKey(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, row[2])
+        return None
+
+    def key(
+        self, pdf_path: Path, mapped: Optional[MappedFile] = None
+    ) -> Optional[CacheKey]:
+        """Fingerprint *pdf_path*, hashing it only if the fingerprint is new.
+
+        If the file is already mapped, pass the map as *mapped* to hash it
+        from there. Returns ``None`` if the file cannot be read.
+        """
+        key = self.known_key(pdf_path)
+        if key is not None:
+            return key
+        try:
+            st = os.stat(pdf_path)
+            if mapped is not None:
+                digest = mapped.digest()
+            else:
+                digest = file_digest(pdf_path)
+            self._write(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, digest),
+            )
+        except OSError as exc:
+            logger.warning("Cannot fingerprint %s: %s", pdf_path, exc)
+            return None
+        return CacheKey(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, digest)
+
+    def get(self, key: CacheKey, name: str = "") -> Optional[dict[str, str]]:
+        """Return the cached classification for *key*, or ``None``.
+
+        A classification that depends on the file's *name* is only returned
+        for a file of the name it was stored with.
+        """
+        row = self._db.execute(
+            "SELECT signature, complete, doc_type, institution, date, status, "
+            "source, name FROM entries WHERE digest = ? AND engine = ?",
+            (key.digest, self.engine),
+        ).fetchone()
+        # Stale text can only be reclassified if it covers the whole file.
+        if row is None or (row[7] and row[7] != name) or (
+            row[0] != self.signature and not (row[1] and self.max_pages is None)
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        signature, _, doc_type, institution, date, status, source, _ = row
+        if signature != self.signature:
+            # Rule set changed since this entry was written: reclassify.
+            info = classifier.classify(
+                self.get_text(key), self.date_policy, institutions=self.institutions
+            )
+            # Only entries whose text alone gave the classification get here.
+            source = classifier.format_sources(info, {})
+            self._write(
+                "UPDATE entries SET signature = ?, doc_type = ?, institution = ?, "
+                "date = ?, source = ?, last_used = ? WHERE digest = ?",
+                (self.signature, info["doc_type"], info["institution"],
+                 info["date"], source, self._now(), key.digest),
+            )
+        else:
+            self._write(
+                "UPDATE entries SET last_used = ? WHERE digest = ?",
+                (self._now(), key.digest),
+            )
+            info = {"doc_type": doc_type, "institution": institution, "date": date}
+        if source:
+            info["source"] = source
+        if status:
+            # Such as "needs_ocr", which no change of rules affects.
+            info["status"] = status
+        return info
+
+    def get_text(self, key: CacheKey) -> str:
+        """Return the cached extracted text for *key* (empty if absent)."""
+        row = self._db.execute(
+            "SELECT text FROM entries WHERE digest = ?", (key.digest,)
+        ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else ""
+
+    def put(
+        self,
+        key: CacheKey,
+        text: str,
+        info: dict[str, str],
+        complete: bool = True,
+        name: str = "",
+    ) -> None:
+        """Store extracted *text* and its classification under *key*.
+
+        Pass ``complete=False`` if *text* alone does not give the
+        classification, for instance because it covers only part of the
+        document. A ``status`` and ``source`` in *info* are stored too. If
+        the ``source`` says a field came from the file name, the file's
+        *name* is kept with the entry (see :meth:`get`).
+        """
+        blob = zlib.compress(text.encode("utf-8"))
+        source = info.get("source", "")
+        old = self._db.execute(
+            "SELECT size FROM entries WHERE digest = ?", (key.digest,)
+        ).fetchone()
+        self._write(
+            "INSERT OR REPLACE INTO entries "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key.digest, blob, len(blob), complete, self.engine, self.signature,
+             info["doc_type"], info["institution"], info["date"],
+             info.get("status", ""), source, name if ":filename" in source else "",
+             self._now()),
+        )
+        self._total += len(blob) - (old[0] if old else 0)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least-recently-used entries until under 90% of the limit."""
+        target = self.max_bytes * 9 // 10
+        rows = self._db.execute(
+            "SELECT digest, size FROM entries ORDER BY last_used"
+        )
+        doomed = []
+        for digest, size in rows:
+            if self._total <= target:
+                break
+            doomed.append((digest,))
+            self._total -= size
+        self._db.executemany("DELETE FROM entries WHERE digest = ?", doomed)
+        self._db.commit()
+        self._uncommitted = 0
+        logger.debug("Evicted %d cache entries", len(doomed))
+
+    def _now(self) -> float:
+        # Strictly increasing, so LRU order is stable even within one tick.
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return self._clock
+
+    def _write(self, sql: str, params: tuple) -> None:
+        self._db.execute(sql, params)
+        self._uncommitted += 1
+        if self._uncommitted >= _COMMIT_EVERY:
+            self._db.commit()
+            self._uncommitted = 0
@@ -1,7 +1,20 @@
 """Document type classification, institution detection, and date extraction."""
 
+import functools
+import itertools
 import re
-from datetime import datetime
+from array import array
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Optional
+
+from pdf_organizer.institutions import (
+    InstitutionMatcher,
+    build_matcher,
+    read_dictionary,
+)
+from pdf_organizer.supervisor import SupervisedPool
 
 
 # Document type keywords in priority order.
@@ -52,22 +65,27 @@ _MONTHS = (
     "july|august|september|october|november|december"
 )
 
-# Date regex patterns, each with named groups y/m/d.
-_DATE_PATTERNS: list[re.Pattern[str]] = [
-    # MM/DD/YYYY or MM-DD-YYYY
-    re.compile(
-        r"\b(?P<m>\d{1,2})[/\-](?P<d>\d{1,2})[/\-](?P<y>\d{4})\b"
-    ),
-    # Month DD, YYYY
-    re.compile(
-        r"\b(?P<month>" + _MONTHS + r")\s+(?P<d>\d{1,2}),?\s+(?P<y>\d{4})\b",
-        re.IGNORECASE,
-    ),
-    # YYYY-MM-DD
-    re.compile(
-        r"\b(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})\b"
-    ),
-]
+# All supported date formats in one pattern, so text is scanned once:
+#   groups 1-3: MM/DD/YYYY or MM-DD-YYYY
+#   groups 4-6: Month DD, YYYY
+#   groups 7-9: YYYY-MM-DD
+# The branch that matched is identified by the match's lastindex.
+_DATE_FORMATS = (
+    r"(\d{1,2})[/\-](\d{1,2})[/\-](\d{4})"
+    r"|(" + _MONTHS + r")\s+(\d{1,2}),?\s+(\d{4})"
+    r"|(\d{4})-(\d{1,2})-(\d{1,2})"
+)
+_DATE_SCAN: re.Pattern[str] = re.compile(
+    r"\b(?:" + _DATE_FORMATS + r")\b", re.IGNORECASE
+)
+
+# Text between two dates that makes them a range ("Jan 1 - Jan 31, 2024").
+_RANGE_SEPARATOR = re.compile(
+    r"\s*(?:-|\u2013|\u2014|to|through|thru)\s*", re.IGNORECASE
+)
+
+# Days per month; February is checked separately for leap years.
+_MONTH_DAYS = (0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
 
 _MONTH_MAP: dict[str, int] = {
     "january": 1, "february": 2, "march": 3, "april": 4,
@@ -75,61 +93,619 @@ _MONTH_MAP: dict[str, int] = {
     "september": 9, "october": 10, "november": 11, "december": 12,
 }
 
+# Characters at the start of a document searched for the institution.
+_HEADER_CHARS = 500
+
+# Texts per chunk in classify_many; with several jobs, one task per chunk.
+_CHUNK_SIZE = 1000
+
+# Fallback institution: the first capitalized multi-word phrase. [^\S\n]+
+# keeps it from matching across line boundaries.
+_COMPANY_PHRASE = re.compile(r"\b([A-Z][a-z]+(?:[^\S\n]+[A-Z][a-z]+)+)\b")
+
+# How to pick one date when a document contains several:
+#   latest     -- the most recent date anywhere in the document (default)
+#   first      -- the date that appears first in the text
+#   period_end -- the end of the first date range, such as a statement
+#                 period "January 1, 2024 - January 31, 2024"; falls back
+#                 to the most recent date if there is no range
+DATE_POLICIES: tuple[str, ...] = ("latest", "first", "period_end")
+
+# Where a field of a classification can come from, cheapest first: the
+# PDF's metadata, the name of the file, and the text of its pages.
+SOURCES: tuple[str, ...] = ("metadata", "filename", "text")
+
+# The fields of a classification.
+_FIELDS = ("doc_type", "institution", "date")
+
+
+# A leading word boundary followed by a literal word character, e.g. r"\bpaid".
+_LEADING_BOUNDARY = re.compile(r"^\\b(\w)(?![*+?{])")
+
+
+def _literal_first(pattern: str) -> str:
+    """Rewrite a leading ``\\bx`` as the equivalent ``x(?<!\\w.)``.
+
+    Patterns that start with a literal let the regex engine skip ahead with
+    a fast character scan instead of attempting a match at every position.
+    """
+    return _LEADING_BOUNDARY.sub(lambda m: m.group(1) + r"(?<!\w.)", pattern)
+
+
+def _combine(rules: list[tuple[str, list[str]]]) -> re.Pattern[str]:
+    """Merge *rules* into one zero-width pattern with a group per doc type."""
+    groups = []
+    for rank, (_, patterns) in enumerate(rules):
+        body = "|".join(f"(?:{_literal_first(p)})" for p in patterns)
+        groups.append(f"(?P<t{rank}>{body})")
+    return re.compile("(?=" + "|".join(groups) + ")")
+
+
+class CompiledRules:
+    """A doc type rule table compiled for single-pass matching.
+
+    All patterns are merged into one alternation with a named group per doc
+    type, wrapped in a lookahead so every start position is examined. At a
+    given position the alternation prefers earlier (higher-priority) types.
+    After a match of rank *k* the scan continues with a pattern containing
+    only the types ranked above *k*, so the result is the same as trying
+    each pattern of the ordered table in turn, in a single pass.
+
+    Use :func:`compile_rules` to build one.
+    """
+
+    def __init__(self, rules: list[tuple[str, list[str]]]) -> None:
+        self.source = rules
+        self.doc_types = [doc_type for doc_type, _ in rules]
+        # A doc type's own name, as in "Bank Statement" or "Bank_Statement".
+        self._names = re.compile(
+            "|".join(
+                rf"(?<![^\W_])({re.escape(t).replace('_', '[ _]')})(?![^\W_])"
+                for t in self.doc_types
+            )
+            or "(?!)",
+            re.IGNORECASE,
+        )
+        # A whole name in the form this tool gives files, as in
+        # "Bank_Statement_Chase_2024-01-31_2" or "Invoice - Aetna - 3/15/2024".
+        types = "|".join(
+            re.escape(t).replace("_", "[ _]") for t in self.doc_types
+        )
+        sep = r"(?:\s+-\s+|[ _])"
+        date = "(?:" + re.sub(r"\((?!\?)", "(?:", _DATE_FORMATS) + ")"
+        suffix = r"(?:[ _]\d+)?"
+        self._full_names = re.compile(
+            rf"(?:({types or '(?!)'})|Unknown)"
+            rf"(?:{sep}(?!{date}{suffix}$)(.+?))?(?:{sep}({date}))?{suffix}",
+            re.IGNORECASE,
+        )
+        self._scanners: list[Optional[re.Pattern[str]]] = []
+        self._patterns: list[list[re.Pattern[str]]] = []
+        try:
+            # _scanners[k] matches any pattern of the first k doc types.
+            self._scanners = [None] + [
+                _combine(rules[:k]) for k in range(1, len(rules) + 1)
+            ]
+        except re.error:
+            # Patterns that cannot be combined (e.g. conflicting group
+            # names or inline flags) are tried one at a time instead.
+            self._patterns = [
+                [re.compile(p) for p in patterns] for _, patterns in rules
+            ]
+
+    def rank(self, text: str) -> int:
+        """Return the index of the best-priority doc type matching *text*.
 
-def _detect_doc_type(text: str) -> str:
-    text_lower = text.lower()
-    for doc_type, patterns in DOC_TYPE_RULES:
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                return doc_type
-    return "Unknown"
+        Returns -1 if no rule matches.
+        """
+        text_lower = text.lower()
+        if not self._scanners:
+            for rank, patterns in enumerate(self._patterns):
+                if any(p.search(text_lower) for p in patterns):
+                    return rank
+            return -1
 
+        best = len(self.doc_types)
+        pos = 0
+        while best > 0:
+            m = self._scanners[best].search(text_lower, pos)
+            if m is None:
+                break
+            best = int(m.lastgroup[1:])
+            pos = m.start() + 1
+        return best if best < len(self.doc_types) else -1
 
-def _detect_institution(text: str) -> str:
+    def name_rank(self, text: str) -> int:
+        """Return the rank of the first doc type named in *text*, or -1.
+
+        Names such as ``Bank_Statement`` are what this tool puts in the
+        files it renames, though most doc types' rules do not match them.
+        """
+        m = self._names.search(text)
+        return m.lastindex - 1 if m is not None else -1
+
+    def split_name(self, text: str) -> Optional[tuple[str, str, str]]:
+        """Split a name of the form ``{Type}_{Institution}_{Date}``.
+
+        Parts may also be separated by spaces or by ``" - "``, and the
+        date be written in any format dates in text are. Returns the doc
+        type, institution and date parts of *text*, each ``""`` where the
+        name leaves it out (the doc type also for ``Unknown``), or None if
+        *text* is not such a name as a whole.
+        """
+        m = self._full_names.fullmatch(text.strip())
+        if m is None:
+            return None
+        return m.group(1) or "", m.group(2) or "", m.group(3) or ""
+
+    def match(self, text: str) -> str:
+        """Return the best-priority doc type for *text*, or ``"Unknown"``."""
+        rank = self.rank(text)
+        return self.doc_types[rank] if rank >= 0 else "Unknown"
+
+
+def compile_rules(rules: list[tuple[str, list[str]]]) -> CompiledRules:
+    """Compile a rule table shaped like DOC_TYPE_RULES for fast matching."""
+    return CompiledRules(rules)
+
+
+_compiled_rules = compile_rules(DOC_TYPE_RULES)
+
+
+def _default_rules() -> CompiledRules:
+    """Return the compiled DOC_TYPE_RULES, recompiling if it was replaced."""
+    global _compiled_rules
+    if _compiled_rules.source is not DOC_TYPE_RULES:
+        _compiled_rules = compile_rules(DOC_TYPE_RULES)
+    return _compiled_rules
+
+
+def _detect_doc_type(text: str, rules: Optional[CompiledRules] = None) -> str:
+    return (rules or _default_rules()).match(text)
+
+
+_default_matcher = (KNOWN_INSTITUTIONS, InstitutionMatcher(KNOWN_INSTITUTIONS))
+
+
+def _default_institutions() -> InstitutionMatcher:
+    """Return the matcher for KNOWN_INSTITUTIONS, rebuilding if replaced."""
+    global _default_matcher
+    if _default_matcher[0] is not KNOWN_INSTITUTIONS:
+        _default_matcher = (KNOWN_INSTITUTIONS, InstitutionMatcher(KNOWN_INSTITUTIONS))
+    return _default_matcher[1]
+
+
+def load_institutions(
+    dictionary: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+) -> InstitutionMatcher:
+    """Return a matcher for KNOWN_INSTITUTIONS plus names from *dictionary*.
+
+    *dictionary* is a text file with one name per line; its names rank
+    below the built-in ones. The built automaton is cached in *cache_dir*
+    across runs and in memory for the life of the process.
+    """
+    if dictionary is None:
+        return _default_institutions()
+    return _load_dictionary_matcher(Path(dictionary), cache_dir)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_dictionary_matcher(
+    dictionary: Path,
+    cache_dir: Optional[Path],
+) -> InstitutionMatcher:
+    names = KNOWN_INSTITUTIONS + read_dictionary(dictionary)
+    return build_matcher(names, cache_dir)
+
+
+def _detect_institution(
+    text: str,
+    institutions: Optional[InstitutionMatcher] = None,
+) -> str:
     # Search the first ~500 characters for known names.
-    header = text[:500]
-    for name in KNOWN_INSTITUTIONS:
-        if re.search(re.escape(name), header, re.IGNORECASE):
-            return name
+    header = text[:_HEADER_CHARS]
+    name = (institutions or _default_institutions()).find(header)
+    if name:
+        return name
 
     # Heuristic: first capitalized multi-word phrase that looks like a company.
-    # Use [^\S\n]+ to avoid matching across line boundaries.
-    match = re.search(r"\b([A-Z][a-z]+(?:[^\S\n]+[A-Z][a-z]+)+)\b", header)
+    match = _COMPANY_PHRASE.search(header)
     if match:
         return match.group(1)
 
     return ""
 
 
-def _extract_date(text: str) -> str:
-    """Extract the most recent date found in *text*, returned as YYYY-MM-DD."""
-    dates: list[datetime] = []
-    for pattern in _DATE_PATTERNS:
-        for m in pattern.finditer(text):
-            try:
-                groups = m.groupdict()
-                if "month" in groups:
-                    month = _MONTH_MAP[groups["month"].lower()]
-                    day = int(groups["d"])
-                    year = int(groups["y"])
-                else:
-                    month = int(groups["m"])
-                    day = int(groups["d"])
-                    year = int(groups["y"])
-                dates.append(datetime(year, month, day))
-            except (ValueError, KeyError):
-                continue
-
-    if not dates:
+def _name_key(name: str) -> str:
+    """Return *name* without case, punctuation or spacing, for comparing."""
+    return re.sub(r"[\W_]+", "", name).lower()
+
+
+def _pack_date(year: int, month: int, day: int) -> int:
+    """Return the date as a ``yyyymmdd`` integer, or 0 if it is invalid."""
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= _MONTH_DAYS[month]:
+        return 0
+    if month == 2 and day == 29 and (year % 4 or (year % 100 == 0 and year % 400)):
+        return 0
+    return year * 10000 + month * 100 + day
+
+
+def _scan_dates(text: str) -> tuple[int, int, int]:
+    """Scan *text* once for dates.
+
+    Returns packed ``yyyymmdd`` integers for the first date in the text,
+    the most recent date, and the end of the first date range, with 0 for
+    any that were not found.
+    """
+    first = latest = period_end = 0
+    prev_end = -1
+    for m in _DATE_SCAN.finditer(text):
+        branch = m.lastindex
+        if branch == 3:
+            month, day, year = m.group(1, 2, 3)
+            packed = _pack_date(int(year), int(month), int(day))
+        elif branch == 6:
+            name, day, year = m.group(4, 5, 6)
+            packed = _pack_date(int(year), _MONTH_MAP[name.lower()], int(day))
+        else:
+            year, month, day = m.group(7, 8, 9)
+            packed = _pack_date(int(year), int(month), int(day))
+        if not packed:
+            continue
+
+        if not first:
+            first = packed
+        if packed > latest:
+            latest = packed
+        if (
+            not period_end
+            and prev_end >= 0
+            and _RANGE_SEPARATOR.fullmatch(text, prev_end, m.start())
+        ):
+            period_end = packed
+        prev_end = m.end()
+    return first, latest, period_end
+
+
+def _pick_date(scan: tuple[int, int, int], policy: str) -> int:
+    first, latest, period_end = scan
+    if policy == "first":
+        return first
+    if policy == "period_end":
+        return period_end or latest
+    return latest
+
+
+def _format_date(packed: int) -> str:
+    if not packed:
         return ""
-    most_recent = max(dates)
-    return most_recent.strftime("%Y-%m-%d")
+    return f"{packed // 10000:04d}-{packed // 100 % 100:02d}-{packed % 100:02d}"
+
+
+def _extract_date(text: str, policy: str = "latest") -> str:
+    """Extract a date from *text* according to *policy*, as YYYY-MM-DD.
+
+    By default the most recent date found is returned.
+    """
+    return _format_date(_pick_date(_scan_dates(text), policy))
+
+
+def format_sources(info: dict[str, str], sources: dict[str, str]) -> str:
+    """Describe where each field of the classification *info* came from.
+
+    Returns ``field:source`` pairs such as ``"doc_type:metadata
+    date:text"``, for the fields that were found; fields missing from
+    *sources* came from the text.
+    """
+    return " ".join(
+        f"{field}:{sources.get(field, 'text')}"
+        for field in _FIELDS
+        if info[field] and info[field] != "Unknown"
+    )
 
 
-def classify(text: str) -> dict[str, str]:
-    """Classify document text and return doc_type, institution, and date."""
+def classify(
+    text: str,
+    date_policy: str = "latest",
+    rules: Optional[CompiledRules] = None,
+    institutions: Optional[InstitutionMatcher] = None,
+) -> dict[str, str]:
+    """Classify document text and return doc_type, institution, and date.
+
+    *rules* is a custom rule table from :func:`compile_rules`, and
+    *institutions* a matcher from :func:`load_institutions`; by default
+    DOC_TYPE_RULES and KNOWN_INSTITUTIONS are used.
+    """
     return {
-        "doc_type": _detect_doc_type(text),
-        "institution": _detect_institution(text),
-        "date": _extract_date(text),
+        "doc_type": _detect_doc_type(text, rules),
+        "institution": _detect_institution(text, institutions),
+        "date": _extract_date(text, date_policy),
     }
+
+
+class ClassificationTable:
+    """Classifications of many texts, stored column by column.
+
+    :attr:`doc_types`, :attr:`institutions` and :attr:`dates` are parallel
+    arrays with one entry per text. The first two hold codes into
+    :attr:`doc_type_labels` and :attr:`institution_labels`; dates are
+    ``yyyymmdd`` integers, 0 where no date was found. Indexing or iterating
+    the table gives the dicts :func:`classify` would have returned.
+    """
+
+    def __init__(self, doc_types: list[str]) -> None:
+        # Rank -1 ("no rule matched") is stored as the last code.
+        self.doc_type_labels = list(doc_types) + ["Unknown"]
+        self.institution_labels = [""]
+        self.doc_types = array("H")
+        self.institutions = array("I")
+        self.dates = array("I")
+        self._institution_codes = {"": 0}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, i: int) -> dict[str, str]:
+        return {
+            "doc_type": self.doc_type_labels[self.doc_types[i]],
+            "institution": self.institution_labels[self.institutions[i]],
+            "date": _format_date(self.dates[i]),
+        }
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        return (self[i] for i in range(len(self)))
+
+    def _institution_code(self, name: str) -> int:
+        code = self._institution_codes.get(name)
+        if code is None:
+            code = self._institution_codes[name] = len(self.institution_labels)
+            self.institution_labels.append(name)
+        return code
+
+    def append(self, rank: int, institution: str, date: int) -> None:
+        """Add one row: a doc type rank (-1 if unknown), a name and a date."""
+        self.doc_types.append(rank if rank >= 0 else len(self.doc_type_labels) - 1)
+        self.institutions.append(self._institution_code(institution))
+        self.dates.append(date)
+
+    def extend(self, other: "ClassificationTable") -> None:
+        """Append the rows of *other*, which must use the same doc types."""
+        if other.doc_type_labels != self.doc_type_labels:
+            raise ValueError("tables were classified with different rules")
+        codes = [self._institution_code(name) for name in other.institution_labels]
+        self.doc_types.extend(other.doc_types)
+        self.institutions.extend(codes[code] for code in other.institutions)
+        self.dates.extend(other.dates)
+
+    def column(self, name: str) -> list[str]:
+        """Return the ``doc_type``, ``institution`` or ``date`` column as text."""
+        if name == "doc_type":
+            return [self.doc_type_labels[code] for code in self.doc_types]
+        if name == "institution":
+            return [self.institution_labels[code] for code in self.institutions]
+        if name == "date":
+            return [_format_date(packed) for packed in self.dates]
+        raise KeyError(name)
+
+
+def _classify_chunk(
+    texts: Iterable[str],
+    date_policy: str,
+    rules: CompiledRules,
+    institutions: InstitutionMatcher,
+) -> ClassificationTable:
+    table = ClassificationTable(rules.doc_types)
+    append = table.append
+    rank = rules.rank
+    for text in texts:
+        append(
+            rank(text),
+            _detect_institution(text, institutions),
+            _pick_date(_scan_dates(text), date_policy),
+        )
+    return table
+
+
+def classify_many(
+    texts: Iterable[str],
+    date_policy: str = "latest",
+    rules: Optional[CompiledRules] = None,
+    institutions: Optional[InstitutionMatcher] = None,
+    jobs: int = 1,
+    chunk_size: int = _CHUNK_SIZE,
+) -> ClassificationTable:
+    """Classify every text in *texts*, as :func:`classify` would.
+
+    Rules and the institution matcher are resolved once for the whole
+    batch, and results go into a :class:`ClassificationTable` rather than
+    a dict per text. *texts* is read *chunk_size* texts at a time; with
+    *jobs* > 1 the chunks are classified in that many worker processes,
+    a few chunks ahead of the results, so memory stays bounded for any
+    number of texts.
+    """
+    if date_policy not in DATE_POLICIES:
+        raise ValueError(f"Unknown date policy: {date_policy!r}")
+    rules = rules or _default_rules()
+    classify_chunk = functools.partial(
+        _classify_chunk,
+        date_policy=date_policy,
+        rules=rules,
+        institutions=institutions or _default_institutions(),
+    )
+    if jobs <= 1:
+        return classify_chunk(texts)
+
+    texts = iter(texts)
+    chunks = iter(lambda: list(itertools.islice(texts, chunk_size)), [])
+    table = ClassificationTable(rules.doc_types)
+    with SupervisedPool(classify_chunk, jobs) as pool:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(chunk))
+            if len(pending) >= 2 * jobs:
+                table.extend(pending.popleft().result())
+        while pending:
+            table.extend(pending.popleft().result())
+    return table
+
+
+class IncrementalClassifier:
+    """Classify a document fed to it one page at a time.
+
+    :meth:`feed` returns ``True`` once more pages cannot change the result
+    in a way the caller cares about, so extraction can stop early:
+
+    * the doc type is decided once a page matches the highest-priority
+      rule; a match of any other rule may still be outranked by a later
+      page, so it does not stop extraction;
+    * the institution is decided once the first ~500 characters are known;
+    * the date is decided by the first dated page under the ``first``
+      policy, by the first date range under ``period_end``, and never
+      early under ``latest``.
+
+    When every page is fed, the result equals :func:`classify` on the
+    joined text (matches spanning a page break aside).
+
+    Before any page, :meth:`hint` can settle fields from cheaper sources
+    such as the PDF's metadata or its file name; pages then only decide
+    the fields that are left. What such a source merely mentions is used
+    only for fields the pages leave empty.
+    """
+
+    def __init__(
+        self,
+        date_policy: str = "latest",
+        rules: Optional[CompiledRules] = None,
+        institutions: Optional[InstitutionMatcher] = None,
+    ) -> None:
+        if date_policy not in DATE_POLICIES:
+            raise ValueError(f"Unknown date policy: {date_policy!r}")
+        self.date_policy = date_policy
+        self.rules = rules or _default_rules()
+        self.institutions = institutions
+        self.pages = 0
+        self._rank = -1
+        self._header = ""
+        self._dates = (0, 0, 0)
+        # Fields settled by hints, and the source of each.
+        self._hinted: dict[str, str] = {}
+        self._sources: dict[str, str] = {}
+        # Values hints only mention, used for fields the pages leave empty,
+        # and the source of each.
+        self._fallbacks: dict[str, tuple[str, str]] = {}
+
+    @property
+    def settled(self) -> bool:
+        """Whether further pages can no longer change the result."""
+        hinted = self._hinted
+        return (
+            ("doc_type" in hinted or self._rank == 0)
+            and ("institution" in hinted or len(self._header) >= _HEADER_CHARS)
+            and ("date" in hinted or self._date_settled())
+        )
+
+    def hint(self, source: str, text: str) -> bool:
+        """Settle the fields that *text* gives with confidence.
+
+        *text* is a short description of the document from *source* (see
+        :data:`SOURCES`), such as its title or file name. It settles the
+        doc type if it names one (as in ``Bank_Statement``). Only a name
+        of the form this tool gives files, ``{Type}_{Institution}_{Date}``
+        with a known institution, settles the institution and date too;
+        otherwise the institution is settled only if *text* is nothing but
+        a known name, as an Author field may be. Fields already settled
+        are kept, so the best source is given first.
+
+        Anything else *text* mentions is no such evidence: a rule keyword
+        (``IMG_1040`` need not be a tax return), a known name
+        (``progressive_tax_plan``) or a date (``Scanned 2020-01-01``) is
+        used only if the pages give nothing for that field. Returns
+        :attr:`settled`.
+        """
+        matcher = self.institutions or _default_institutions()
+        mentioned = {
+            "doc_type": self.rules.match(text),
+            "institution": matcher.find(text),
+            "date": _format_date(_pick_date(_scan_dates(text), self.date_policy)),
+        }
+        rank = self.rules.name_rank(text)
+        found = {"doc_type": self.rules.doc_types[rank] if rank >= 0 else ""}
+        parts = self.rules.split_name(text)
+        if parts is not None:
+            _, named, dated = parts
+            known = matcher.find(named) if named else ""
+            if _name_key(known) == _name_key(named):
+                found["institution"] = known
+                found["date"] = dated and _extract_date(dated)
+        elif _name_key(mentioned["institution"]) == _name_key(text):
+            found["institution"] = mentioned["institution"]
+
+        for field, value in found.items():
+            if value and field not in self._hinted:
+                self._hinted[field] = value
+                self._sources[field] = source
+        for field, value in mentioned.items():
+            if value and value != "Unknown" and field not in self._fallbacks:
+                self._fallbacks[field] = (value, source)
+        return self.settled
+
+    def _date_settled(self) -> bool:
+        first, _, period_end = self._dates
+        if self.date_policy == "first":
+            return bool(first)
+        if self.date_policy == "period_end":
+            return bool(period_end)
+        return False
+
+    def feed(self, page_text: str) -> bool:
+        """Add the next page's text. Returns :attr:`settled`."""
+        self.pages += 1
+        if not page_text:
+            return self.settled
+
+        if len(self._header) < _HEADER_CHARS and "institution" not in self._hinted:
+            sep = "\n" if self._header else ""
+            self._header = (self._header + sep + page_text)[:_HEADER_CHARS]
+
+        if "doc_type" not in self._hinted:
+            rank = self.rules.rank(page_text)
+            if rank >= 0 and (self._rank < 0 or rank < self._rank):
+                self._rank = rank
+
+        if "date" not in self._hinted and not self._date_settled():
+            first, latest, period_end = self._dates
+            page_first, page_latest, page_period_end = _scan_dates(page_text)
+            self._dates = (
+                first or page_first,
+                max(latest, page_latest),
+                period_end or page_period_end,
+            )
+
+        return self.settled
+
+    def _resolve(self) -> tuple[dict[str, str], dict[str, str]]:
+        rank = self._rank
+        info = {
+            "doc_type": self.rules.doc_types[rank] if rank >= 0 else "",
+            "institution": _detect_institution(
+                self._header, self.institutions
+            ),
+            "date": _format_date(_pick_date(self._dates, self.date_policy)),
+        }
+        sources = dict(self._sources)
+        for field, (value, source) in self._fallbacks.items():
+            if not info[field] and field not in self._hinted:
+                info[field] = value
+                sources[field] = source
+        info.update(self._hinted)
+        info["doc_type"] = info["doc_type"] or "Unknown"
+        return info, sources
+
+    def result(self) -> dict[str, str]:
+        """Return the classification of the pages fed so far."""
+        return self._resolve()[0]
+
+    def sources(self) -> dict[str, str]:
+        """Return the source of each field a hint gave."""
+        return self._resolve()[1]
@@ -1,63 +1,880 @@
 """Click CLI entry point for pdf-organizer."""
 
+import contextlib
+import os
+import signal
+import socket
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
+from typing import Any, Optional
 
 import click
+from click.core import ParameterSource
 
-from pdf_organizer.renamer import rename_files, write_csv_log
+from pdf_organizer.cache import ExtractionCache, default_cache_dir
+from pdf_organizer.classifier import DATE_POLICIES, load_institutions
+from pdf_organizer.client import default_socket_path
+from pdf_organizer.dedup import DEDUP_ACTIONS
+from pdf_organizer.extractor import ENGINES
+from pdf_organizer.journal import Journal, completed_names, undo
+from pdf_organizer.plan import apply_plan, plan_folder, write_plan
+from pdf_organizer.profiling import Profiler
+from pdf_organizer.renamer import CsvLog, iter_renames, watch_renames
+from pdf_organizer.runlog import SqliteLog, export_csv, query_log
+from pdf_organizer.sharding import merge_logs, parse_shard, shard_path
 
 
-@click.command()
-@click.argument(
+class _DefaultGroup(click.Group):
+    """A command group that runs ``run`` when no command is named.
+
+    This keeps ``pdf-organizer FOLDER [OPTIONS]`` working next to the other
+    commands.
+    """
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or (
+            args[0] not in self.commands and args[0] not in ctx.help_option_names
+        ):
+            args = ["run", *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultGroup)
+def main() -> None:
+    """Scan folders for PDFs, classify them, and rename intelligently.
+
+    Without a command, the arguments are passed to ``run``. ``plan`` and
+    ``apply`` split a run in two: the analysis is saved to a plan file,
+    which can be reviewed and then applied without extracting again.
+    ``merge-logs`` combines the logs of runs sharded with ``--shard``, and
+    ``query`` searches logs written with ``--log-format sqlite``.
+    ``serve`` answers single files over a socket, without startup costs.
+    """
+
+
+_FOLDER = click.argument(
     "folder",
     default=".",
     type=click.Path(exists=True, file_okay=False, path_type=Path),
 )
+
+
+def _parse_shard(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[tuple[int, int]]:
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc))
+
+
+def _shard_default(
+    name: str, path: Path, shard: Optional[tuple[int, int]]
+) -> Path:
+    """Give a sharded run's output *path* the shard's name, unless one was chosen."""
+    source = click.get_current_context().get_parameter_source(name)
+    if shard is None or source is not ParameterSource.DEFAULT:
+        return path
+    return shard_path(path, shard)
+
+
+# Options of the commands that write a rename log (run and apply).
+_LOG_OPTIONS = [
+    click.option(
+        "--output-csv",
+        default="rename_log.csv",
+        type=click.Path(path_type=Path),
+        help="Path for the rename log (default: rename_log.csv, or "
+        "rename_log.db with --log-format sqlite).",
+    ),
+    click.option(
+        "--log-format",
+        type=click.Choice(["csv", "sqlite"]),
+        default="csv",
+        show_default=True,
+        help="Write the log as CSV, or append it as a new run to a SQLite "
+        "database that 'query' can search.",
+    ),
+]
+
+
+def _log_options(func: Callable) -> Callable:
+    for option in reversed(_LOG_OPTIONS):
+        func = option(func)
+    return func
+
+
+def _open_log(
+    stack: contextlib.ExitStack,
+    path: Path,
+    log_format: str,
+    folder: Path,
+    command: str,
+    append: bool = False,
+) -> Any:
+    """Open the rename log of a *command* over *folder*.
+
+    With *append*, a CSV log is added to rather than overwritten; a SQLite
+    log always is.
+    """
+    try:
+        if log_format == "csv":
+            return stack.enter_context(CsvLog(path, append))
+        return stack.enter_context(SqliteLog(path, folder, command))
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+
+
+def _log_path(
+    path: Path, log_format: str, shard: Optional[tuple[int, int]] = None
+) -> Path:
+    """Return the rename log path, defaulting to one that suits the format."""
+    source = click.get_current_context().get_parameter_source("output_csv")
+    if log_format == "sqlite" and source is ParameterSource.DEFAULT:
+        path = path.with_suffix(".db")
+    return _shard_default("output_csv", path, shard)
+
+
+def _echo_log_written(path: Path, log: Any) -> None:
+    if isinstance(log, SqliteLog):
+        click.echo(f"Log written to {path} (run {log.run_id})")
+    else:
+        click.echo(f"Log written to {path}")
+
+
+# Options of the commands that analyse PDFs (run and plan).
+_ANALYSIS_OPTIONS = {
+    "jobs": click.option(
+        "--jobs",
+        "-j",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Worker processes for text extraction (default: CPU count).",
+    ),
+    "no-cache": click.option(
+        "--no-cache",
+        is_flag=True,
+        default=False,
+        help="Do not read or update the extraction cache.",
+    ),
+    "cache-dir": click.option(
+        "--cache-dir",
+        default=None,
+        type=click.Path(file_okay=False, path_type=Path),
+        help="Extraction cache directory (default: ~/.cache/pdf-organizer).",
+    ),
+    "max-pages": click.option(
+        "--max-pages",
+        type=click.IntRange(min=1),
+        default=None,
+        help="Parse at most this many pages per PDF.",
+    ),
+    "date-policy": click.option(
+        "--date-policy",
+        type=click.Choice(DATE_POLICIES),
+        default="latest",
+        show_default=True,
+        help="Which date to use when a document contains several. "
+        "'first' lets extraction stop as soon as the result is settled.",
+    ),
+    "institutions": click.option(
+        "--institutions",
+        "institutions_file",
+        default=None,
+        type=click.Path(exists=True, dir_okay=False, path_type=Path),
+        help="Text file of extra institution names to detect, one per line.",
+    ),
+    "recursive": click.option(
+        "--recursive",
+        "-r",
+        is_flag=True,
+        default=False,
+        help="Also process PDFs in subfolders.",
+    ),
+    "include": click.option(
+        "--include",
+        multiple=True,
+        metavar="GLOB",
+        help="Only process files whose name or relative path matches GLOB. "
+        "May be repeated.",
+    ),
+    "exclude": click.option(
+        "--exclude",
+        multiple=True,
+        metavar="GLOB",
+        help="Skip files and folders whose name or relative path matches GLOB. "
+        "May be repeated.",
+    ),
+    "engine": click.option(
+        "--engine",
+        type=click.Choice(list(ENGINES)),
+        default="auto",
+        show_default=True,
+        help="Text extraction engine. 'fast' reads the raw text stream, 'layout' "
+        "runs full layout analysis, 'auto' uses fast text unless it looks "
+        "garbled.",
+    ),
+    "text-only": click.option(
+        "--text-only",
+        is_flag=True,
+        default=False,
+        help="Classify from page text alone. By default, fields that the PDF's "
+        "metadata or the file name give are not looked for in the pages.",
+    ),
+    "file-timeout": click.option(
+        "--file-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        metavar="SECONDS",
+        help="Give up on a file whose extraction takes longer than this.",
+    ),
+    "max-rss-mb": click.option(
+        "--max-rss-mb",
+        type=click.IntRange(min=1),
+        default=None,
+        metavar="MB",
+        help="Give up on a file whose worker process uses more memory than this.",
+    ),
+    "max-text-chars": click.option(
+        "--max-text-chars",
+        "max_text",
+        type=click.IntRange(min=0),
+        default=None,
+        metavar="N",
+        help="Keep at most N characters of each file's text in the cache.",
+    ),
+    "dedup": click.option(
+        "--dedup",
+        type=click.Choice(DEDUP_ACTIONS + ("off",)),
+        default="off",
+        show_default=True,
+        help="What to do with a file identical to one processed before: rename "
+        "it as usual ('report'), leave it alone, replace it with a hard link to "
+        "the first copy, or delete it. 'off' disables duplicate detection. "
+        "Detection remembers every file of the run, about 1 KB each.",
+    ),
+    "shard": click.option(
+        "--shard",
+        default=None,
+        metavar="I/N",
+        callback=_parse_shard,
+        help="Handle only shard I of N of the files, so that N hosts can share "
+        "a folder. Logs and plans are named after the shard by default.",
+    ),
+}
+
+
+def _analysis_options(func: Callable) -> Callable:
+    for option in reversed(_ANALYSIS_OPTIONS.values()):
+        func = option(func)
+    return func
+
+
+def _some_analysis_options(*names: str) -> Callable[[Callable], Callable]:
+    """Decorator applying the analysis options *names*, in that order."""
+
+    def decorate(func: Callable) -> Callable:
+        for name in reversed(names):
+            func = _ANALYSIS_OPTIONS[name](func)
+        return func
+
+    return decorate
+
+
+def _open_cache(
+    stack: contextlib.ExitStack,
+    no_cache: bool,
+    cache_dir: Optional[Path],
+    date_policy: str,
+    max_pages: Optional[int],
+    institutions_file: Optional[Path],
+    engine: str,
+    text_only: bool,
+) -> Optional[ExtractionCache]:
+    """Open the extraction cache on *stack*, unless *no_cache* is set."""
+    if no_cache:
+        return None
+    cache_dir = cache_dir or default_cache_dir()
+    return stack.enter_context(ExtractionCache(
+        cache_dir,
+        date_policy=date_policy,
+        max_pages=max_pages,
+        institutions=load_institutions(institutions_file, cache_dir),
+        engine=engine,
+        text_only=text_only,
+    ))
+
+
+def _report(r: dict[str, Any], dry_run: bool, counts: Counter) -> None:
+    """Print the line for result *r* and count it in *counts*."""
+    status = r["status"]
+    original = r["original_name"]
+    new = r["new_name"]
+    note = ""
+    if r["duplicate_of"]:
+        counts["duplicates"] += 1
+        note = f" (duplicate of {r['duplicate_of']})"
+
+    if status in ("renamed", "linked"):
+        label = "RENAME" if status == "renamed" else "LINK"
+        if dry_run:
+            label = f"WOULD {label}"
+        click.secho(f"  {label}: {original} -> {new}{note}", fg="green")
+        counts["renamed"] += 1
+    elif status in ("skipped", "duplicate"):
+        click.secho(f"  SKIP: {original}{note}", fg="yellow")
+        counts["skipped"] += 1
+    elif status == "deleted":
+        label = "DELETE" if not dry_run else "WOULD DELETE"
+        click.secho(f"  {label}: {original}{note}", fg="yellow")
+    elif status == "needs_ocr":
+        click.secho(f"  NEEDS OCR: {original}{note}", fg="yellow")
+        counts["needs_ocr"] += 1
+    elif status in ("timeout", "oom", "stale"):
+        click.secho(f"  {status.upper()}: {original}", fg="red")
+        counts[status] += 1
+    else:
+        click.secho(f"  ERROR: {original}", fg="red")
+        counts["error"] += 1
+
+
+def _echo_summary(counts: Counter) -> None:
+    click.echo()
+    click.secho(
+        f"Summary: {counts['renamed']} renamed, {counts['skipped']} skipped, "
+        f"{counts['error']} errors",
+        bold=True,
+    )
+    if counts["duplicates"]:
+        click.echo(f"Duplicates: {counts['duplicates']} (not extracted)")
+    if counts["needs_ocr"]:
+        click.echo(f"Needs OCR: {counts['needs_ocr']} (no text layer)")
+    if counts["timeout"] or counts["oom"]:
+        click.echo(
+            f"Gave up on: {counts['timeout']} timed out, "
+            f"{counts['oom']} over the memory limit"
+        )
+    if counts["stale"]:
+        click.echo(f"Left alone: {counts['stale']} changed since planned")
+
+
+@main.command()
+@_FOLDER
 @click.option(
     "--dry-run",
     is_flag=True,
     default=False,
     help="Preview renames without actually renaming files.",
 )
+@_log_options
+@_analysis_options
 @click.option(
-    "--output-csv",
-    default="rename_log.csv",
-    type=click.Path(path_type=Path),
-    help="Path for the CSV rename log.",
+    "--journal",
+    "journal_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Record every result in this JSONL journal as it happens.",
+)
+@click.option(
+    "--resume",
+    "resume_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Continue the run recorded in this journal, skipping finished files.",
+)
+@click.option(
+    "--undo",
+    "undo_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Reverse the renames recorded in this journal and exit.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    default=False,
+    help="Print a per-stage timing breakdown and the slowest files.",
+)
+@click.option(
+    "--profile-json",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also write the profile as JSON to this file (implies --profile).",
 )
-def main(folder: Path, dry_run: bool, output_csv: Path) -> None:
+@click.option(
+    "--profile-top",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    help="Number of slowest files listed by --profile.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    default=False,
+    help="After the first pass, keep renaming PDFs as they are added to "
+    "FOLDER, until interrupted.",
+)
+def run(
+    folder: Path,
+    dry_run: bool,
+    output_csv: Path,
+    log_format: str,
+    jobs: Optional[int],
+    no_cache: bool,
+    cache_dir: Optional[Path],
+    max_pages: Optional[int],
+    date_policy: str,
+    institutions_file: Optional[Path],
+    recursive: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    engine: str,
+    text_only: bool,
+    file_timeout: Optional[float],
+    max_rss_mb: Optional[int],
+    max_text: Optional[int],
+    dedup: str,
+    shard: Optional[tuple[int, int]],
+    journal_path: Optional[Path],
+    resume_path: Optional[Path],
+    undo_path: Optional[Path],
+    profile: bool,
+    profile_json: Optional[Path],
+    profile_top: int,
+    watch: bool,
+) -> None:
     """Scan FOLDER for PDFs, classify them, and rename intelligently."""
     if dry_run:
         click.secho("=== DRY RUN (no files will be renamed) ===", fg="yellow")
 
-    results = rename_files(folder, dry_run=dry_run)
+    if undo_path is not None:
+        _undo(undo_path, dry_run)
+        return
 
-    renamed = 0
-    skipped = 0
-    errors = 0
+    if resume_path is not None:
+        if journal_path is not None and journal_path != resume_path:
+            raise click.UsageError("--journal and --resume name different files.")
+        journal_path = resume_path
+    skip = completed_names(resume_path) if resume_path is not None else set()
+
+    if watch and recursive:
+        raise click.UsageError("--watch cannot be combined with --recursive.")
+    if watch and shard is not None:
+        raise click.UsageError("--watch cannot be combined with --shard.")
+    output_csv = _log_path(output_csv, log_format, shard)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    profiler = None
+    if profile or profile_json is not None:
+        profiler = Profiler(top=profile_top)
+
+    counts: Counter = Counter()
+    pages = 0
+
+    with contextlib.ExitStack() as stack:
+        cache = _open_cache(
+            stack, no_cache, cache_dir, date_policy, max_pages,
+            institutions_file, engine, text_only,
+        )
+        journal = None
+        if journal_path is not None:
+            try:
+                journal = stack.enter_context(
+                    Journal(journal_path, folder, dry_run=dry_run)
+                )
+            except ValueError as exc:
+                raise click.UsageError(str(exc))
+        log = None
+        if not dry_run:
+            log = _open_log(
+                stack, output_csv, log_format, folder, "run",
+                append=resume_path is not None,
+            )
 
-    for r in results:
-        status = r["status"]
-        original = r["original_name"]
-        new = r["new_name"]
-
-        if status == "renamed":
-            label = "RENAME" if not dry_run else "WOULD RENAME"
-            click.secho(f"  {label}: {original} -> {new}", fg="green")
-            renamed += 1
-        elif status == "skipped":
-            click.secho(f"  SKIP: {original}", fg="yellow")
-            skipped += 1
+        options = dict(
+            dry_run=dry_run,
+            jobs=jobs,
+            cache=cache,
+            max_pages=max_pages,
+            date_policy=date_policy,
+            institutions_file=institutions_file,
+            include=include,
+            exclude=exclude,
+            skip=skip,
+            profiler=profiler,
+            engine=engine,
+            text_only=text_only,
+            file_timeout=file_timeout,
+            max_rss_mb=max_rss_mb,
+            max_text=max_text,
+            dedup=None if dedup == "off" else dedup,
+        )
+        if watch:
+            click.echo(f"Watching {folder} for new PDFs; press Ctrl+C to stop.")
+            results = watch_renames(folder, **options)
         else:
-            click.secho(f"  ERROR: {original}", fg="red")
-            errors += 1
+            results = iter_renames(
+                folder, recursive=recursive, shard=shard, **options
+            )
 
-    click.echo()
-    click.secho(
-        f"Summary: {renamed} renamed, {skipped} skipped, {errors} errors",
-        bold=True,
-    )
+        try:
+            for r in results:
+                if journal is not None:
+                    journal.record(r)
+                if log is not None:
+                    log.write(r)
+                pages += r["pages"]
+                _report(r, dry_run, counts)
+        except KeyboardInterrupt:
+            # Ctrl+C is how watch mode ends; report what was done.
+            if not watch:
+                raise
+            results.close()
+
+    _echo_summary(counts)
+    click.echo(f"Pages parsed: {pages}")
+    if cache is not None:
+        click.echo(f"Cache: {cache.hits} hits, {cache.misses} misses")
+    if skip:
+        click.echo(f"Resumed: {len(skip)} files already done")
+    if profiler is not None:
+        profiler.finish()
+        click.echo("\n".join(profiler.report()))
+        if profile_json is not None:
+            profiler.write_json(profile_json)
+            click.echo(f"Profile written to {profile_json}")
+
+    if not dry_run:
+        _echo_log_written(output_csv, log)
+
+
+@main.command()
+@_FOLDER
+@click.option(
+    "--output",
+    "-o",
+    "plan_path",
+    default="rename_plan.jsonl",
+    show_default=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path for the rename plan.",
+)
+@_analysis_options
+def plan(
+    folder: Path,
+    plan_path: Path,
+    jobs: Optional[int],
+    no_cache: bool,
+    cache_dir: Optional[Path],
+    max_pages: Optional[int],
+    date_policy: str,
+    institutions_file: Optional[Path],
+    recursive: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    engine: str,
+    text_only: bool,
+    file_timeout: Optional[float],
+    max_rss_mb: Optional[int],
+    max_text: Optional[int],
+    dedup: str,
+    shard: Optional[tuple[int, int]],
+) -> None:
+    """Analyse FOLDER and write a rename plan, without renaming anything.
+
+    The plan records each file's classification, the name it would get and
+    a fingerprint of the file; ``apply`` carries it out later.
+    """
+    plan_path = _shard_default("plan_path", plan_path, shard)
+    counts: Counter = Counter()
+
+    def reported(results: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for r in results:
+            _report(r, True, counts)
+            yield r
+
+    with contextlib.ExitStack() as stack:
+        cache = _open_cache(
+            stack, no_cache, cache_dir, date_policy, max_pages,
+            institutions_file, engine, text_only,
+        )
+        results = iter_renames(
+            folder,
+            dry_run=True,
+            jobs=jobs or os.cpu_count() or 1,
+            cache=cache,
+            max_pages=max_pages,
+            date_policy=date_policy,
+            institutions_file=institutions_file,
+            recursive=recursive,
+            include=include,
+            exclude=exclude,
+            engine=engine,
+            text_only=text_only,
+            file_timeout=file_timeout,
+            max_rss_mb=max_rss_mb,
+            max_text=max_text,
+            dedup=None if dedup == "off" else dedup,
+            shard=shard,
+        )
+        write_plan(reported(results), plan_path, folder)
+
+    _echo_summary(counts)
+    click.echo(f"Plan written to {plan_path}")
+
+
+@main.command()
+@click.argument(
+    "plan_path",
+    metavar="PLAN",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    default=False,
+    help="Show what applying PLAN would do without renaming files.",
+)
+@_log_options
+@click.option(
+    "--journal",
+    "journal_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Record every result in this JSONL journal, for --undo.",
+)
+def apply(
+    plan_path: Path,
+    dry_run: bool,
+    output_csv: Path,
+    log_format: str,
+    journal_path: Optional[Path],
+) -> None:
+    """Rename files as recorded in PLAN, without analysing them again.
 
+    Files changed since the plan was written are left alone. If a rename
+    fails, the ones already made are undone.
+    """
+    if dry_run:
+        click.secho("=== DRY RUN (no files will be renamed) ===", fg="yellow")
+    output_csv = _log_path(output_csv, log_format)
+    try:
+        folder = plan_folder(plan_path)
+        results = apply_plan(plan_path, dry_run=dry_run)
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    except OSError as exc:
+        raise click.ClickException(f"{exc}; no files were renamed.")
+
+    counts: Counter = Counter()
+    with contextlib.ExitStack() as stack:
+        journal = None
+        if journal_path is not None:
+            try:
+                journal = stack.enter_context(
+                    Journal(journal_path, folder, dry_run=dry_run)
+                )
+            except ValueError as exc:
+                raise click.UsageError(str(exc))
+        log = None
+        if not dry_run:
+            log = _open_log(stack, output_csv, log_format, folder, "apply")
+        for r in results:
+            if journal is not None:
+                journal.record(r)
+            if log is not None:
+                log.write(r)
+            _report(r, dry_run, counts)
+
+    _echo_summary(counts)
     if not dry_run:
-        write_csv_log(results, output_csv)
-        click.echo(f"Log written to {output_csv}")
+        _echo_log_written(output_csv, log)
+
+
+@main.command("merge-logs")
+@click.argument(
+    "logs",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--output-csv",
+    default="rename_log.csv",
+    show_default=True,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Path for the merged CSV rename log.",
+)
+def merge_logs_command(logs: tuple[Path, ...], output_csv: Path) -> None:
+    """Merge the CSV logs of a sharded run into one log.
+
+    The rows are put in the order one run over the whole folder would have
+    logged them.
+    """
+    if output_csv.resolve() in {path.resolve() for path in logs}:
+        raise click.UsageError("--output-csv must not be one of the LOGS.")
+    try:
+        rows = merge_logs(logs, output_csv)
+    except KeyError:
+        raise click.UsageError("LOGS must be CSV rename logs.")
+    click.echo(f"Merged {rows} rows from {len(logs)} logs into {output_csv}")
+
+
+@main.command()
+@click.argument(
+    "log_path",
+    metavar="LOG",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option("--doc-type", default=None, help="Only this document type.")
+@click.option(
+    "--institution", default=None, help="Only this institution (any case)."
+)
+@click.option(
+    "--date",
+    default=None,
+    metavar="PREFIX",
+    help="Only dates starting with PREFIX, such as 2023 or 2023-04.",
+)
+@click.option(
+    "--name",
+    default=None,
+    help="Only this original or new name, relative to the scanned folder.",
+)
+@click.option("--run", "run_id", type=int, default=None, help="Only this run.")
+@click.option("--status", default=None, help="Only results with this status.")
+@click.option(
+    "--output-csv",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the matching rows to this CSV file instead of listing them.",
+)
+def query(
+    log_path: Path,
+    doc_type: Optional[str],
+    institution: Optional[str],
+    date: Optional[str],
+    name: Optional[str],
+    run_id: Optional[int],
+    status: Optional[str],
+    output_csv: Optional[Path],
+) -> None:
+    """Look up results in a SQLite run log written with --log-format sqlite."""
+    rows = query_log(
+        log_path,
+        doc_type=doc_type,
+        institution=institution,
+        date=date,
+        name=name,
+        run_id=run_id,
+        status=status,
+    )
+    try:
+        if output_csv is not None:
+            count = export_csv(rows, output_csv)
+            click.echo(f"Exported {count} rows to {output_csv}")
+            return
+        count = 0
+        for r in rows:
+            details = ", ".join(
+                v for v in (r["doc_type"], r["institution"], r["date"]) if v
+            )
+            click.echo(
+                f"  run {r['run_id']}: {r['original_name']} -> "
+                f"{r['new_name'] or '(deleted)'} [{r['status']}] {details}"
+            )
+            count += 1
+        click.echo(f"{count} matching rows")
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+
+
+@main.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help=f"Unix socket to listen on (default: {default_socket_path()}).",
+)
+@_some_analysis_options(
+    "jobs", "max-pages", "date-policy", "institutions", "engine", "text-only",
+    "file-timeout", "max-rss-mb",
+)
+def serve(
+    socket_path: Optional[Path],
+    jobs: Optional[int],
+    max_pages: Optional[int],
+    date_policy: str,
+    institutions_file: Optional[Path],
+    engine: str,
+    text_only: bool,
+    file_timeout: Optional[float],
+    max_rss_mb: Optional[int],
+) -> None:
+    """Classify and rename single files on request, until interrupted.
+
+    Listens on a Unix socket and keeps worker processes running, so each
+    request costs only its own extraction. Send requests with
+    ``pdf-organizer-client``.
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise click.UsageError("serve needs Unix domain sockets.")
+    # The server module can only be imported where Unix sockets exist.
+    from pdf_organizer.server import ClassificationServer
+
+    socket_path = socket_path or default_socket_path()
+    try:
+        server = ClassificationServer(
+            socket_path,
+            jobs=jobs or os.cpu_count() or 1,
+            max_pages=max_pages,
+            date_policy=date_policy,
+            institutions_file=institutions_file,
+            engine=engine,
+            text_only=text_only,
+            file_timeout=file_timeout,
+            max_rss=max_rss_mb * 1024 * 1024 if max_rss_mb else None,
+        )
+    except OSError as exc:
+        raise click.ClickException(f"Cannot listen on {socket_path}: {exc}")
+
+    def stop(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt
+
+    # A service manager stops the server with SIGTERM; clean up as for Ctrl+C.
+    signal.signal(signal.SIGTERM, stop)
+    with server:
+        click.echo(f"Listening on {socket_path}; press Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def _undo(journal_path: Path, dry_run: bool) -> None:
+    """Reverse the renames recorded in *journal_path*, printing each one."""
+    restored = 0
+    errors = 0
+    try:
+        for r in undo(journal_path, dry_run=dry_run):
+            original = r["original_name"]
+            new = r["new_name"]
+            if r["status"] == "restored":
+                label = "RESTORE" if not dry_run else "WOULD RESTORE"
+                click.secho(f"  {label}: {original} -> {new}", fg="green")
+                restored += 1
+            else:
+                click.secho(f"  ERROR: {original}", fg="red")
+                errors += 1
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+
+    click.echo()
+    click.secho(f"Summary: {restored} restored, {errors} errors", bold=True)
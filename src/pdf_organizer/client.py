@@ -0,0 +1,131 @@
+"""Thin client for ``pdf-organizer serve``.
+
+Only the standard library is imported, so a call costs little more than
+starting the interpreter; the PDF work happens in the server's warm
+workers. Run as ``pdf-organizer-client PATH...``.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+# Operations the server accepts.
+OPS = ("classify", "rename")
+
+# Result statuses that make the client exit non-zero.
+_FAILED = ("error", "timeout", "oom")
+
+
+class ServiceError(Exception):
+    """The server could not handle a request."""
+
+
+def default_socket_path() -> Path:
+    """Return the socket ``serve`` listens on unless told otherwise.
+
+    That is ``$XDG_RUNTIME_DIR/pdf-organizer.sock``, or ``serve.sock`` in
+    the cache directory where there is no runtime directory.
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return Path(runtime) / "pdf-organizer.sock"
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "pdf-organizer" / "serve.sock"
+
+
+class Client:
+    """Connection to a running ``pdf-organizer serve``.
+
+    Requests are sent one at a time over a single connection; open one
+    client per thread to use several of the server's workers at once.
+    """
+
+    def __init__(
+        self, socket_path: Optional[Path] = None, timeout: Optional[float] = None
+    ) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._sock.settimeout(timeout)
+            self._sock.connect(str(socket_path or default_socket_path()))
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def request(self, op: str, path: str) -> dict[str, Any]:
+        """Send one request and return the server's result.
+
+        *path* is made absolute here, since the server does not share the
+        caller's working directory.
+        """
+        message = {"op": op, "path": os.path.abspath(path)}
+        self._file.write(json.dumps(message).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ServiceError("server closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ServiceError(reply["error"])
+        return reply
+
+    def classify(self, path: str) -> dict[str, Any]:
+        """Classify *path* and return the result a dry run would report."""
+        return self.request("classify", path)
+
+    def rename(self, path: str) -> dict[str, Any]:
+        """Classify and rename *path*, returning its result."""
+        return self.request("rename", path)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="pdf-organizer-client",
+        description="Classify or rename PDFs through a running "
+        "'pdf-organizer serve'. Prints one JSON result per PATH.",
+    )
+    parser.add_argument("paths", nargs="+", metavar="PATH")
+    parser.add_argument(
+        "--rename", action="store_true",
+        help="Rename the files, instead of only reporting their new names.",
+    )
+    parser.add_argument(
+        "--socket", type=Path, default=None,
+        help=f"Server socket (default: {default_socket_path()}).",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        client = Client(args.socket)
+    except OSError as exc:
+        print(f"pdf-organizer-client: cannot connect to the server: {exc}",
+              file=sys.stderr)
+        return 2
+    failed = False
+    with client:
+        for path in args.paths:
+            try:
+                result = client.request("rename" if args.rename else "classify", path)
+            except ServiceError as exc:
+                result = {"path": os.path.abspath(path), "error": str(exc)}
+            failed = failed or result.get("status", "error") in _FAILED
+            print(json.dumps(result), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Detection of identical files, so that only one copy is extracted."""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from pdf_organizer.cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+# What to do with a duplicate:
+#   report -- rename it like any other file, noting what it duplicates
+#   skip   -- leave it alone
+#   link   -- replace it with a hard link to the first copy
+#   delete -- delete it
+DEDUP_ACTIONS: tuple[str, ...] = ("report", "skip", "link", "delete")
+
+# Bytes hashed from each end of a file before comparing whole files. The
+# end of a PDF holds its trailer and document ID, which tell most
+# same-sized files apart.
+_PARTIAL_BYTES = 8192
+
+
+def partial_digest(path: Path, size: int) -> str:
+    """Return a hash of the first and last few KiB of the file at *path*."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        h.update(fh.read(_PARTIAL_BYTES))
+        if size > 2 * _PARTIAL_BYTES:
+            fh.seek(-_PARTIAL_BYTES, os.SEEK_END)
+            h.update(fh.read(_PARTIAL_BYTES))
+        elif size > _PARTIAL_BYTES:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+class _File:
+    """What is known about one file seen by :class:`DuplicateFinder`."""
+
+    __slots__ = ("checked", "path", "size", "inode", "partial", "full", "result")
+
+    def __init__(self, path: Path, size: int, inode: tuple[int, int]) -> None:
+        self.checked = path  # the path given to check(); .path is where it is now
+        self.path = path
+        self.size = size
+        self.inode = inode
+        self.partial: Optional[str] = None
+        self.full: Optional[str] = None
+        self.result: Optional[tuple[dict[str, Any], str]] = None
+
+
+class DuplicateFinder:
+    """Recognize files identical to one seen before, in the order given.
+
+    Files are compared in three steps, each only when the previous one
+    matched: size, a hash of both ends (:func:`partial_digest`), and a
+    SHA-256 of the whole file. A file with a size no other file has is
+    never read. Hard links to a file seen before count as duplicates
+    without being read.
+
+    A file's path may change after :meth:`check` -- when it is renamed --
+    so callers report the new one with :meth:`moved`; it is used if the
+    file has to be read again later.
+
+    Any later file may duplicate any earlier one, so every first copy is
+    remembered, with its result, until the finder is dropped: memory grows
+    with the number of files checked. A duplicate is forgotten once its
+    :meth:`original` has been looked up.
+    """
+
+    def __init__(self) -> None:
+        self._by_size: dict[int, list[_File]] = {}
+        self._by_path: dict[Path, _File] = {}
+        self._originals: dict[Path, _File] = {}
+
+    def _digest(self, entry: _File, full: bool) -> Optional[str]:
+        """Hash *entry*'s file, following it if it was renamed meanwhile."""
+        for _ in range(2):
+            path = entry.path
+            try:
+                if full:
+                    return file_digest(path)
+                return partial_digest(path, entry.size)
+            except FileNotFoundError:
+                if entry.path == path:
+                    break
+            except OSError as exc:
+                logger.warning("Cannot read %s: %s", path, exc)
+                break
+        return None
+
+    def _same(self, a: _File, b: _File) -> bool:
+        if a.inode == b.inode:
+            return True
+        for entry in (a, b):
+            if entry.partial is None:
+                entry.partial = self._digest(entry, full=False)
+        if a.partial is None or a.partial != b.partial:
+            return False
+        for entry in (a, b):
+            if entry.full is None:
+                entry.full = self._digest(entry, full=True)
+        return a.full is not None and a.full == b.full
+
+    def check(self, path: Path) -> Optional[Path]:
+        """Return the path of an earlier file identical to *path*, if any.
+
+        The path returned is the one the earlier file was checked under.
+        """
+        try:
+            st = os.stat(path)
+        except OSError as exc:
+            logger.warning("Cannot stat %s: %s", path, exc)
+            return None
+        entry = _File(path, st.st_size, (st.st_dev, st.st_ino))
+        same_size = self._by_size.setdefault(st.st_size, [])
+        for earlier in same_size:
+            if self._same(earlier, entry):
+                self._originals[path] = earlier
+                return earlier.checked
+        same_size.append(entry)
+        self._by_path[path] = entry
+        return None
+
+    def is_duplicate(self, path: Path) -> bool:
+        """Whether :meth:`check` found *path* to duplicate an earlier file."""
+        return path in self._originals
+
+    def moved(self, path: Path, new_path: Path) -> None:
+        """Record that the file checked as *path* is now at *new_path*."""
+        entry = self._by_path.get(path)
+        if entry is not None:
+            entry.path = new_path
+
+    def record(self, path: Path, info: dict[str, Any], new_name: str) -> None:
+        """Store the classification and new name of *path* for its duplicates."""
+        entry = self._by_path.get(path)
+        if entry is not None:
+            entry.result = (info, new_name)
+
+    def original(self, path: Path) -> Optional[tuple[dict[str, Any], str]]:
+        """Return what :meth:`record` stored for the file *path* duplicates.
+
+        This is the last thing asked about a duplicate, so it is forgotten.
+        """
+        return self._originals.pop(path).result
@@ -1,26 +1,457 @@
-"""PDF text extraction using pdfplumber."""
+"""PDF text extraction using pdfplumber, with a layout-free fast path."""
 
+import contextlib
+import itertools
 import logging
+import re
+import time
+from collections.abc import Callable, Iterable, Iterator
 from pathlib import Path
+from typing import Optional
+from xml.etree import ElementTree
 
 import pdfplumber
+from pdfminer.pdfdevice import PDFDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import LITERAL_FORM, PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.utils import mult_matrix
+from pdfplumber.page import Page
+
+from pdf_organizer.mapped import MappedFile
 
 logger = logging.getLogger(__name__)
 
+# A TJ adjustment at least this large (in thousandths of an em) to the
+# right is treated as a word gap.
+_TJ_SPACE = 150
 
-def extract_text(pdf_path: Path) -> str:
-    """Open a PDF and concatenate text from all pages.
+# A run of text that starts more than this share of the font size to the
+# right of where the previous run ended is a new word.
+_WORD_GAP = 0.15
 
-    Returns empty string on extraction failure.
+# The fast engine's output is also rejected (in "auto" mode) if it has at
+# least _MIN_WORDS words and more than this share of them are one character
+# long, as when every glyph was placed on its own and spaced apart.
+_MAX_SINGLE_CHAR_WORDS = 0.5
+_MIN_WORDS = 8
+
+# The fast engine's output is rejected (in "auto" mode) if more than this
+# share of its characters could not be mapped to Unicode or are not
+# printable.
+_MAX_UNREADABLE = 0.1
+
+
+# Document information entries read by read_metadata, by the key they get.
+_INFO_KEYS = {
+    "title": "Title",
+    "subject": "Subject",
+    "keywords": "Keywords",
+    "author": "Author",
+    "creator": "Creator",
+    "producer": "Producer",
+    "created": "CreationDate",
+}
+
+_DC = "{http://purl.org/dc/elements/1.1/}"
+_PDF = "{http://ns.adobe.com/pdf/1.3/}"
+_XMP = "{http://ns.adobe.com/xap/1.0/}"
+
+# XMP properties read by read_metadata where the information dictionary
+# has no value, by the key they fill.
+_XMP_KEYS = {
+    "title": _DC + "title",
+    "subject": _DC + "description",
+    "keywords": _PDF + "Keywords",
+    "author": _DC + "creator",
+    "creator": _XMP + "CreatorTool",
+    "producer": _PDF + "Producer",
+    "created": _XMP + "CreateDate",
+}
+
+# XMP packets larger than this are not parsed.
+_MAX_XMP_BYTES = 1 << 20
+
+# The date of a PDF date string (D:YYYYMMDD...) or an XMP date (YYYY-MM-DD...).
+_METADATA_DATE = re.compile(r"(?:D:)?(\d{4})-?(\d{2})-?(\d{2})")
+
+
+def _xmp_values(pdf: pdfplumber.PDF) -> dict[str, str]:
+    """Return the properties of the document's XMP packet, by tag."""
+    stream = resolve1(pdf.doc.catalog.get("Metadata"))
+    if not isinstance(stream, PDFStream):
+        return {}
+    data = stream.get_data()
+    if len(data) > _MAX_XMP_BYTES:
+        return {}
+    values: dict[str, str] = {}
+    for element in ElementTree.fromstring(data).iter():
+        # Properties are attributes of rdf:Description or elements whose
+        # text may sit in rdf:Alt, rdf:Seq or rdf:Bag items.
+        for tag, value in element.attrib.items():
+            values.setdefault(tag, value)
+        text = " ".join(t.strip() for t in element.itertext() if t.strip())
+        if text:
+            values.setdefault(element.tag, text)
+    return values
+
+
+def read_metadata(pdf: pdfplumber.PDF) -> dict[str, str]:
+    """Return the title, author and other metadata of an open PDF.
+
+    Keys are ``title``, ``subject``, ``keywords``, ``author``, ``creator``,
+    ``producer`` and ``created``; each value comes from the document
+    information dictionary, or else from the XMP metadata, and missing ones
+    are left out. ``created`` is given as ``YYYY-MM-DD``.
+    Reading the metadata never touches a page.
+    """
+    metadata = {}
+    for key, name in _INFO_KEYS.items():
+        value = pdf.metadata.get(name)
+        if isinstance(value, str) and value.strip():
+            metadata[key] = value.strip()
+    if len(metadata) < len(_INFO_KEYS):
+        try:
+            xmp = _xmp_values(pdf)
+        except Exception as exc:
+            logger.debug("Cannot read XMP metadata: %s", exc)
+            xmp = {}
+        for key, tag in _XMP_KEYS.items():
+            if key not in metadata and xmp.get(tag):
+                metadata[key] = xmp[tag]
+    created = _METADATA_DATE.match(metadata.pop("created", ""))
+    if created:
+        metadata["created"] = "-".join(created.groups())
+    return metadata
+
+
+# The operator that begins a text object, as a token of a content stream.
+# Every glyph is drawn between BT and ET, so a page whose content never
+# says BT draws no text.
+_BEGIN_TEXT = re.compile(rb"(?:^|[\s\])>])BT(?:$|[\s\[(/<])")
+
+# How deeply nested form XObjects are searched for text before giving up
+# and treating the page as one that has text.
+_MAX_FORM_DEPTH = 4
+
+
+def _draws_text(resources: object, streams: list, depth: int = 0) -> bool:
+    """Return whether content *streams* with *resources* may draw text.
+
+    Text needs a font and a text object. Form XObjects are content of
+    their own and are searched too; a form without resources uses those
+    of the content that draws it.
+    """
+    resources = resolve1(resources) or {}
+    if resolve1(resources.get("Font")) and any(
+        _BEGIN_TEXT.search(resolve1(stream).get_data()) for stream in streams
+    ):
+        return True
+    for xobj in (resolve1(resources.get("XObject")) or {}).values():
+        xobj = resolve1(xobj)
+        if isinstance(xobj, PDFStream) and xobj.get("Subtype") is LITERAL_FORM:
+            if depth >= _MAX_FORM_DEPTH or _draws_text(
+                xobj.get("Resources", resources), [xobj], depth + 1
+            ):
+                return True
+    return False
+
+
+def has_text_layer(page: Page) -> bool:
+    """Return whether *page* may have any text, without interpreting it.
+
+    Only the page's resources and raw content streams are looked at, which
+    takes a fraction of the time of extracting text. A page that fails
+    this check, such as a scanned image, certainly has no text; a page
+    that passes may still turn out to have none. A page that cannot be
+    checked is assumed to have text.
+    """
+    page_obj = page.page_obj
+    try:
+        return _draws_text(page_obj.resources, page_obj.contents)
+    except Exception as exc:
+        logger.debug("Cannot check page %d for text: %s", page.page_number, exc)
+        return True
+
+
+# The text and width (in ems) of each glyph of a font that was seen, and
+# the glyphs that have no Unicode mapping.
+_Glyphs = tuple[dict[int, str], dict[int, float], set[int]]
+
+
+class _RawTextDevice(PDFDevice):
+    """pdfminer device that collects the text drawn on a page, in stream order.
+
+    Glyphs are only measured, never laid out: a run of text starts a new
+    line if it is drawn lower or higher than the previous run, and is
+    separated from it by a space if it starts more than a fraction of the
+    font size after the previous run ended (or well before it). That is
+    enough for keyword matching and far cheaper than layout analysis.
+    """
+
+    def __init__(self, rsrcmgr) -> None:
+        super().__init__(rsrcmgr)
+        self.parts: list[str] = []
+        self.chars = 0
+        self.missing = 0
+        self._end: Optional[tuple[float, float]] = None
+        # Glyphs by font, as pdfminer works each one out slowly.
+        self._glyphs: dict[object, _Glyphs] = {}
+
+    def _learn(self, font, cids: Iterable[int]) -> None:
+        chars, widths, unmapped = self._glyphs[font]
+        for cid in cids:
+            if cid not in chars:
+                try:
+                    chars[cid] = font.to_unichr(cid)
+                except PDFUnicodeNotDefined:
+                    chars[cid] = ""
+                    unmapped.add(cid)
+                widths[cid] = font.char_width(cid)
+
+    def render_string(self, textstate, seq, ncs, graphicstate) -> None:
+        font = textstate.font
+        parts = self.parts
+        size = textstate.fontsize
+        scaling = textstate.scaling * 0.01
+        charspace = textstate.charspace * scaling
+        wordspace = 0 if font.is_multibyte() else textstate.wordspace * scaling
+        a, b, c, d, e, f = mult_matrix(textstate.matrix, self.ctm)
+        x, y = textstate.linematrix
+        if self._end is not None:
+            em = size * (a * a + b * b) ** 0.5
+            gap = a * x + c * y + e - self._end[0]
+            if abs(b * x + d * y + f - self._end[1]) > 0.5:
+                parts.append("\n")
+            elif gap > _WORD_GAP * em or gap < -em:
+                parts.append(" ")
+
+        glyphs = self._glyphs.get(font)
+        if glyphs is None:
+            glyphs = self._glyphs[font] = ({}, {}, set())
+        chars, widths, unmapped = glyphs
+        # Advance through the run as pdfminer's layout does, in text space.
+        needcharspace = False
+        for obj in seq:
+            if isinstance(obj, bytes):
+                cids = font.decode(obj)
+                if not cids:
+                    continue
+                try:
+                    width = sum([widths[cid] for cid in cids])
+                except KeyError:
+                    self._learn(font, cids)
+                    width = sum([widths[cid] for cid in cids])
+                parts.append("".join([chars[cid] for cid in cids]))
+                self.chars += len(cids)
+                if unmapped:
+                    self.missing += sum(1 for cid in cids if cid in unmapped)
+                x += width * size * scaling
+                x += charspace * (len(cids) - 1 + needcharspace)
+                if wordspace:
+                    x += wordspace * cids.count(32)
+                needcharspace = True
+            elif isinstance(obj, (int, float)):
+                x -= obj * 0.001 * size * scaling
+                needcharspace = True
+                if obj <= -_TJ_SPACE:
+                    parts.append(" ")
+        textstate.linematrix = (x, y)
+        self._end = (a * x + c * y + e, b * x + d * y + f)
+
+
+def _layout_page_text(pdf: pdfplumber.PDF, page: Page) -> str:
+    return page.extract_text() or ""
+
+
+def _raw_page_text(pdf: pdfplumber.PDF, page: Page) -> tuple[str, bool]:
+    """Return the fast text of *page* and whether it looks readable.
+
+    Text is unreadable if too many of its characters are, or if most of
+    its words are single characters, as when glyphs placed one at a time
+    were spaced apart.
+    """
+    device = _RawTextDevice(pdf.rsrcmgr)
+    PDFPageInterpreter(pdf.rsrcmgr, device).process_page(page.page_obj)
+    text = "\n".join(
+        " ".join(line.split()) for line in "".join(device.parts).splitlines()
+    ).strip()
+    unreadable = device.missing + sum(
+        1 for ch in text if not (ch.isprintable() or ch == "\n") or ch == "\ufffd"
+    )
+    words = text.split()
+    spaced_out = len(words) >= _MIN_WORDS and sum(
+        1 for word in words if len(word) == 1
+    ) > _MAX_SINGLE_CHAR_WORDS * len(words)
+    readable = (
+        bool(text)
+        and unreadable <= _MAX_UNREADABLE * max(device.chars, 1)
+        and not spaced_out
+    )
+    return text, readable
+
+
+def _fast_page_text(pdf: pdfplumber.PDF, page: Page) -> str:
+    return _raw_page_text(pdf, page)[0]
+
+
+def _auto_page_text(pdf: pdfplumber.PDF, page: Page) -> str:
+    text, readable = _raw_page_text(pdf, page)
+    if readable:
+        return text
+    logger.debug("Fast text of page %d unusable; using layout", page.page_number)
+    return _layout_page_text(pdf, page)
+
+
+# Text extraction engines by name. Each takes the open document and one of
+# its pages and returns the page text.
+ENGINES: dict[str, Callable[[pdfplumber.PDF, Page], str]] = {
+    "auto": _auto_page_text,
+    "fast": _fast_page_text,
+    "layout": _layout_page_text,
+}
+
+
+def _add_time(timings: dict[str, float], stage: str, start: float) -> None:
+    timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+
+def _iter_pages(pdf: pdfplumber.PDF) -> Iterator[Page]:
+    """Yield the pages of *pdf* one at a time, without keeping them.
+
+    ``pdf.pages`` creates every page up front and keeps them all for the
+    life of the document, so whatever each page caches adds up.
+    """
+    doctop = 0.0
+    for number, page_obj in enumerate(PDFPage.create_pages(pdf.doc), start=1):
+        page = Page(pdf, page_obj, page_number=number, initial_doctop=doctop)
+        doctop += page.height
+        yield page
+
+
+def _release(pdf: pdfplumber.PDF, page: Page) -> None:
+    """Free what reading *page* cached, so long documents use flat memory."""
+    page.close()
+    # pdfminer also keeps every object it resolved, including the page's
+    # content and image streams. Later pages re-read what they need; fonts
+    # are cached separately, by the resource manager. The cache is private
+    # to pdfminer, so a version without it only costs memory.
+    cache = getattr(pdf.doc, "_cached_objs", None)
+    if cache is not None:
+        cache.clear()
+
+
+def iter_page_texts(
+    pdf_path: Path,
+    max_pages: Optional[int] = None,
+    timings: Optional[dict[str, float]] = None,
+    engine: str = "layout",
+    mapped: Optional[MappedFile] = None,
+    textless: Optional[list[int]] = None,
+    on_metadata: Optional[Callable[[dict[str, str]], bool]] = None,
+) -> Iterator[str]:
+    """Yield the text of each page of a PDF, parsing pages only on demand.
+
+    At most *max_pages* pages are parsed. Pages without text yield an empty
+    string. On extraction failure the generator logs a warning and stops.
+
+    Pages without a text layer (see :func:`has_text_layer`), typically
+    scanned images, yield an empty string without being extracted. Their
+    page numbers are appended to *textless* if given.
+
+    If *on_metadata* is given, it is called with the document's metadata
+    (see :func:`read_metadata`) as soon as the file is open; if it returns
+    True, no page is read.
+
+    *engine* names an entry of :data:`ENGINES`: ``"layout"`` runs
+    pdfplumber's full layout analysis, ``"fast"`` reads the text straight
+    from the content stream, and ``"auto"`` uses the fast text unless it
+    is empty or garbled, in which case that page is laid out instead.
+
+    The file is read through a memory map of it: *mapped* if given (for
+    instance one already used to hash the file), otherwise a new one.
+
+    If *timings* is given, the seconds spent opening the file and
+    extracting page text are added to its ``"open"`` and ``"extract"``
+    entries.
     """
+    page_text = ENGINES[engine]
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            pages = []
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    pages.append(text)
-            return "\n".join(pages)
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            if mapped is None:
+                mapped = stack.enter_context(MappedFile(pdf_path))
+            pdf = stack.enter_context(pdfplumber.open(mapped))
+            done = on_metadata is not None and on_metadata(read_metadata(pdf))
+            if timings is not None:
+                _add_time(timings, "open", start)
+            if done:
+                return
+            for page in itertools.islice(_iter_pages(pdf), max_pages):
+                start = time.perf_counter()
+                if has_text_layer(page):
+                    text = page_text(pdf, page)
+                else:
+                    text = ""
+                    if textless is not None:
+                        textless.append(page.page_number)
+                _release(pdf, page)
+                if timings is not None:
+                    _add_time(timings, "extract", start)
+                yield text
     except Exception as exc:
         logger.warning("Failed to extract text from %s: %s", pdf_path, exc)
-        return ""
+
+
+def extract_text(
+    pdf_path: Path,
+    max_pages: Optional[int] = None,
+    engine: str = "layout",
+    max_chars: Optional[int] = None,
+) -> str:
+    """Open a PDF and concatenate text from all pages.
+
+    Only the first *max_pages* pages are read if given. See
+    :func:`iter_page_texts` for *engine*. With *max_chars*, reading stops
+    once that much text has been collected and the result is cut to it.
+    Returns empty string on extraction failure.
+    """
+    texts = TextBuffer(max_chars)
+    for text in iter_page_texts(pdf_path, max_pages, engine=engine):
+        if not texts.add(text):
+            break
+    return texts.text()
+
+
+class TextBuffer:
+    """Page texts joined by newlines, keeping at most *max_chars* characters.
+
+    Blank pages are left out. Once the cap is reached, :attr:`truncated`
+    is set and :meth:`add` keeps nothing more.
+    """
+
+    def __init__(self, max_chars: Optional[int] = None) -> None:
+        self.max_chars = max_chars
+        self.truncated = False
+        self._texts: list[str] = []
+        self._size = 0
+
+    def add(self, text: str) -> bool:
+        """Append *text*; return False once the buffer is full."""
+        if self.truncated:
+            return False
+        if text:
+            if self.max_chars is not None:
+                room = self.max_chars - self._size - bool(self._texts)
+                if len(text) >= room:
+                    self.truncated = True
+                    if room <= 0:
+                        return False
+                    text = text[:room]
+            self._texts.append(text)
+            self._size += len(text) + (len(self._texts) > 1)
+        return not self.truncated
+
+    def text(self) -> str:
+        return "\n".join(self._texts)
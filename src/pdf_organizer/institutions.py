@@ -0,0 +1,241 @@
+"""Single-pass institution name matching with an Aho-Corasick automaton."""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from array import array
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached layout of InstitutionMatcher changes.
+_FORMAT_VERSION = 3
+
+# The arrays of a cached matcher, in file order: the keys and target nodes
+# of the transitions, the failure links, the nodes that have outputs, how
+# many each has, and the outputs themselves, four integers apiece.
+_ARRAYS = ("goto_keys", "goto_nodes", "fail", "out_nodes", "out_counts", "outputs")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class InstitutionMatcher:
+    """Find known institution names in text with one pass over it.
+
+    Matching is case-insensitive and word-boundary aware: a name does not
+    match inside a longer word, so "Chase" is not found in "purchase". When
+    several names occur, the one listed first wins, regardless of where it
+    appears in the text.
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = list(names)
+        self.fingerprint = names_fingerprint(self.names)
+
+        # Transitions are kept in one flat dict keyed by (node << 21 | code
+        # point), failure links in an int array, and outputs only for the
+        # nodes that have them. An output is (name index, length, check start
+        # boundary, check end boundary). This layout is stored as flat arrays
+        # (see _dump), which load far faster than a dict per trie node.
+        goto: dict[int, int] = {}
+        children: list[list[tuple[int, int]]] = [[]]
+        out: dict[int, list[tuple[int, int, bool, bool]]] = {}
+        for index, name in enumerate(self.names):
+            key = name.lower()
+            if not key:
+                continue
+            node = 0
+            for ch in key:
+                edge = node << 21 | ord(ch)
+                nxt = goto.get(edge)
+                if nxt is None:
+                    nxt = len(children)
+                    goto[edge] = nxt
+                    children[node].append((ord(ch), nxt))
+                    children.append([])
+                node = nxt
+            out.setdefault(node, []).append(
+                (index, len(key), _is_word(key[0]), _is_word(key[-1]))
+            )
+
+        fail = array("q", [0]) * len(children)
+        queue = deque(child for _, child in children[0])
+        while queue:
+            node = queue.popleft()
+            for code, child in children[node]:
+                queue.append(child)
+                f = fail[node]
+                while f and (f << 21 | code) not in goto:
+                    f = fail[f]
+                fail[child] = goto.get(f << 21 | code, 0)
+                # Names ending at the fallback state also end here.
+                if fail[child] in out:
+                    out[child] = out.get(child, []) + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = {node: tuple(outputs) for node, outputs in out.items()}
+
+    def find_index(self, text: str) -> int:
+        """Return the list index of the best name found in *text*, or -1."""
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        end = len(text)
+        best = -1
+        node = 0
+        for pos, ch in enumerate(text):
+            code = ord(ch)
+            nxt = goto.get(node << 21 | code)
+            while nxt is None and node:
+                node = fail[node]
+                nxt = goto.get(node << 21 | code)
+            node = nxt or 0
+            if node not in out:
+                continue
+            for index, length, check_start, check_end in out[node]:
+                if best != -1 and index >= best:
+                    continue
+                start = pos - length + 1
+                if check_start and start > 0 and _is_word(text[start - 1]):
+                    continue
+                if check_end and pos + 1 < end and _is_word(text[pos + 1]):
+                    continue
+                best = index
+                if best == 0:
+                    return 0
+        return best
+
+    def find(self, text: str) -> str:
+        """Return the best name found in *text*, or an empty string."""
+        index = self.find_index(text)
+        return self.names[index] if index >= 0 else ""
+
+    def _dump(self, fh: BinaryIO) -> None:
+        """Write the matcher to *fh*: a JSON header line, then raw arrays."""
+        outputs = array("q")
+        for node_outputs in self._out.values():
+            for output in node_outputs:
+                outputs.extend(output)
+        arrays = (
+            array("q", self._goto.keys()),
+            array("q", self._goto.values()),
+            self._fail,
+            array("q", self._out.keys()),
+            array("q", map(len, self._out.values())),
+            outputs,
+        )
+        header = {
+            "version": _FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "names": self.names,
+            "lengths": [len(a) for a in arrays],
+        }
+        fh.write(json.dumps(header).encode("utf-8") + b"\n")
+        for a in arrays:
+            a.tofile(fh)
+
+    @classmethod
+    def _load(cls, fh: BinaryIO) -> "InstitutionMatcher":
+        """Read a matcher written by :meth:`_dump`.
+
+        The file holds only data, so reading one written by someone else
+        can at worst give wrong matches. Raises ValueError (or EOFError)
+        if it is not a complete matcher of this version.
+        """
+        header = json.loads(fh.readline())
+        if (
+            header.get("version") != _FORMAT_VERSION
+            or header.get("byteorder") != sys.byteorder
+        ):
+            raise ValueError("written by another version or platform")
+        arrays = {}
+        for name, length in zip(_ARRAYS, header["lengths"]):
+            arrays[name] = array("q")
+            arrays[name].fromfile(fh, length)
+        out_counts, outputs = arrays["out_counts"], arrays["outputs"]
+        if len(arrays) != len(_ARRAYS) or 4 * sum(out_counts) != len(outputs):
+            raise ValueError("inconsistent arrays")
+
+        matcher = cls.__new__(cls)
+        matcher.names = [str(name) for name in header["names"]]
+        matcher.fingerprint = names_fingerprint(matcher.names)
+        # Lists convert to ints in bulk, far faster than indexing arrays.
+        matcher._goto = dict(
+            zip(arrays["goto_keys"].tolist(), arrays["goto_nodes"].tolist())
+        )
+        matcher._fail = arrays["fail"]
+        items = outputs.tolist()
+        outs = list(zip(
+            items[::4], items[1::4], map(bool, items[2::4]), map(bool, items[3::4])
+        ))
+        out = {}
+        pos = 0
+        for node, count in zip(arrays["out_nodes"].tolist(), out_counts.tolist()):
+            out[node] = tuple(outs[pos:pos + count])
+            pos += count
+        matcher._out = out
+        return matcher
+
+
+def names_fingerprint(names: Iterable[str]) -> str:
+    """Return a short hash identifying an ordered list of names."""
+    h = hashlib.sha256(str(_FORMAT_VERSION).encode())
+    for name in names:
+        h.update(b"\0" + name.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def read_dictionary(path: Path) -> list[str]:
+    """Read institution names from *path*, one per line.
+
+    Blank lines and lines starting with ``#`` are ignored.
+    """
+    with open(path, encoding="utf-8") as fh:
+        lines = (line.strip() for line in fh)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def build_matcher(
+    names: Iterable[str],
+    cache_dir: Optional[Path] = None,
+) -> InstitutionMatcher:
+    """Return a matcher for *names*, reusing a stored copy in *cache_dir*.
+
+    Building the automaton for tens of thousands of names takes a while,
+    so the result is stored under *cache_dir* keyed by the name list and
+    loaded on later runs. Without *cache_dir* the matcher is always built.
+    The stored copy is plain data, never code, since the cache directory
+    may be shared with other users or hosts.
+    """
+    names = list(names)
+    if cache_dir is None:
+        return InstitutionMatcher(names)
+
+    path = Path(cache_dir) / f"institutions-{names_fingerprint(names)}.matcher"
+    try:
+        with open(path, "rb") as fh:
+            matcher = InstitutionMatcher._load(fh)
+        if matcher.names == names:
+            return matcher
+    except (OSError, ValueError, EOFError, KeyError, TypeError) as exc:
+        if not isinstance(exc, FileNotFoundError):
+            logger.warning("Ignoring unreadable matcher cache %s: %s", path, exc)
+
+    matcher = InstitutionMatcher(names)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            matcher._dump(fh)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("Cannot cache institution matcher: %s", exc)
+    return matcher
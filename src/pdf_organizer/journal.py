@@ -0,0 +1,187 @@
+"""Append-only JSONL journal of rename results, for resuming and undoing runs."""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from pdf_organizer.renamer import _rename_noreplace
+
+logger = logging.getLogger(__name__)
+
+# Bump if the record layout changes incompatibly.
+_JOURNAL_VERSION = 1
+
+# Records are flushed to the OS immediately, but only forced to disk every
+# this many records or seconds, whichever comes first.
+_FSYNC_EVERY = 100
+_FSYNC_INTERVAL = 2.0
+
+
+class Journal:
+    """Append one JSON line per rename result to *path* as it happens.
+
+    The first line is a header recording the absolute *folder* the names
+    are relative to and whether the run was a dry run. Opening an existing
+    journal appends to it, which is how ``--resume`` continues a run; the
+    header must then match.
+
+    Every record is flushed as soon as it is written, so a crash of this
+    process loses nothing. Records are fsynced in batches, bounding what a
+    power loss can cost.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        folder: Path,
+        dry_run: bool = False,
+        fsync_every: int = _FSYNC_EVERY,
+    ) -> None:
+        self.path = Path(path)
+        self.folder = Path(folder).resolve()
+        self.fsync_every = fsync_every
+        header = {
+            "version": _JOURNAL_VERSION,
+            "folder": str(self.folder),
+            "dry_run": dry_run,
+        }
+        if self.path.exists() and self.path.stat().st_size:
+            existing = read_header(self.path)
+            if existing != header:
+                raise ValueError(
+                    f"{self.path} belongs to a different run "
+                    f"(folder {existing.get('folder')!r}, "
+                    f"dry run {existing.get('dry_run')!r})"
+                )
+            self._fh = open(self.path, "a", encoding="utf-8")
+            self._terminate_partial_line()
+        else:
+            self._fh = open(self.path, "w", encoding="utf-8")
+            self._write_line(header)
+            self._sync()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def record(self, result: dict[str, Any]) -> None:
+        """Append *result* to the journal."""
+        self._write_line(result)
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= _FSYNC_INTERVAL
+        ):
+            self._sync()
+
+    def close(self) -> None:
+        """Force outstanding records to disk and close the file."""
+        if not self._fh.closed:
+            self._sync()
+            self._fh.close()
+
+    def _write_line(self, obj: dict[str, Any]) -> None:
+        self._fh.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self._fh.flush()
+
+    def _sync(self) -> None:
+        os.fsync(self._fh.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _terminate_partial_line(self) -> None:
+        # A crash mid-write can leave a partial last line; start a new one
+        # so the next record is not glued onto it.
+        with open(self.path, "rb") as fh:
+            fh.seek(-1, os.SEEK_END)
+            if fh.read(1) != b"\n":
+                self._fh.write("\n")
+
+
+def read_header(path: Path) -> dict[str, Any]:
+    """Return the header of the journal at *path*."""
+    with open(path, encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+    if header.get("version") != _JOURNAL_VERSION:
+        raise ValueError(f"{path} is not a supported journal")
+    return header
+
+
+def iter_records(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield the result records of the journal at *path*, oldest first.
+
+    Lines that cannot be parsed (such as one cut short by a crash) are
+    skipped with a warning.
+    """
+    with open(path, encoding="utf-8") as fh:
+        fh.readline()
+        for lineno, line in enumerate(fh, start=2):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping damaged line %d of %s", lineno, path)
+
+
+def completed_names(path: Path) -> set[str]:
+    """Return the names of files a run recorded in *path* has finished with.
+
+    These are the current names of renamed and skipped files, of files
+    that need OCR, and of duplicates that were left alone or linked,
+    relative to the journal folder. Files that failed, timed out or ran out
+    of memory are not included, so a resumed run tries them again. A dry
+    run renamed nothing, so for one its files' original names are returned
+    (deleted duplicates included, since they were not deleted either).
+    """
+    done = ["renamed", "skipped", "needs_ocr", "duplicate", "linked"]
+    name = "new_name"
+    if read_header(path).get("dry_run"):
+        done.append("deleted")
+        name = "original_name"
+    return {
+        record[name]
+        for record in iter_records(path)
+        if record.get("status") in done
+    }
+
+
+def undo(path: Path, dry_run: bool = False) -> Iterator[dict[str, Any]]:
+    """Reverse the renames recorded in the journal at *path*, newest first.
+
+    Yields one dict per renamed file with ``original_name`` (its current
+    name), ``new_name`` (the name it is restored to) and ``status``
+    (``"restored"`` or ``"error"``). A file is never moved onto an existing
+    one. With *dry_run* nothing is renamed. Duplicates replaced by a hard
+    link get their name back but stay links; deleted ones are not restored.
+    """
+    header = read_header(path)
+    if header["dry_run"]:
+        raise ValueError(f"{path} was written by a dry run; nothing to undo")
+    folder = Path(header["folder"])
+    renamed = [
+        r
+        for r in iter_records(path)
+        if r.get("status") in ("renamed", "linked")
+        and r["new_name"] != r["original_name"]
+    ]
+
+    for record in reversed(renamed):
+        current, original = record["new_name"], record["original_name"]
+        status = "restored"
+        if not dry_run:
+            try:
+                _rename_noreplace(folder / current, folder / original)
+            except OSError as exc:
+                logger.error("Failed to restore %s: %s", current, exc)
+                status = "error"
+        yield {"original_name": current, "new_name": original, "status": status}
+
@@ -0,0 +1,107 @@
+"""Read-only memory maps of PDFs, shared by hashing and parsing."""
+
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Union
+
+# Bytes hashed per update; slices of the map are hashed without copying.
+_HASH_CHUNK = 1 << 20
+
+
+class MappedFile:
+    """A read-only memory map of one file, usable as a binary stream.
+
+    The content hash (:meth:`digest`) and the PDF parser, which reads the
+    file through :meth:`read`, :meth:`seek` and :meth:`tell`, share the
+    one mapping, so each page of the file is fetched from storage at most
+    once however often it is read. The kernel is told that the file will
+    be read sequentially, so it reads ahead in large blocks.
+
+    :attr:`bytes_read` is how much of the file has been read through the
+    mapping, counting every page of the file once. A file that cannot be
+    mapped (an empty one, or one on a filesystem without mmap) is read
+    into memory instead.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        with open(path, "rb") as fh:
+            self.size = os.fstat(fh.fileno()).st_size
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            try:
+                self._data: Union[mmap.mmap, bytes] = mmap.mmap(
+                    fh.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except (OSError, ValueError):
+                self._data = fh.read()
+        if isinstance(self._data, mmap.mmap) and hasattr(self._data, "madvise"):
+            self._data.madvise(mmap.MADV_SEQUENTIAL)
+        self._pos = 0
+        # One flag per page of the file, set once the page has been read.
+        self._read = bytearray(-(-self.size // mmap.PAGESIZE))
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    @property
+    def bytes_read(self) -> int:
+        pages = self._read.count(1)
+        if pages and self._read[-1]:
+            # The last page is only partly covered by the file.
+            return (pages - len(self._read)) * mmap.PAGESIZE + self.size
+        return pages * mmap.PAGESIZE
+
+    def _mark(self, start: int, end: int) -> None:
+        if end > start:
+            first, last = start // mmap.PAGESIZE, (end - 1) // mmap.PAGESIZE + 1
+            self._read[first:last] = b"\1" * (last - first)
+
+    def digest(self) -> str:
+        """Return the SHA-256 hex digest of the whole file."""
+        h = hashlib.sha256()
+        with memoryview(self._data) as view:
+            for start in range(0, self.size, _HASH_CHUNK):
+                with view[start:start + _HASH_CHUNK] as chunk:
+                    h.update(chunk)
+        self._mark(0, self.size)
+        return h.hexdigest()
+
+    # The stream interface pdfminer uses.
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(self._pos + size, self.size)
+        data = self._data[self._pos:end]
+        self._mark(self._pos, end)
+        self._pos = max(self._pos, end)
+        return data
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self._pos = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
@@ -0,0 +1,263 @@
+"""Stages connected by bounded queues, each running in its own thread."""
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any, Optional
+
+# Items a queue between two stages holds before its producer has to wait.
+DEFAULT_DEPTH = 32
+
+# How often a blocked stage checks whether the pipeline was closed, in seconds.
+_CLOSE_CHECK = 0.1
+
+_DONE = object()
+
+
+class _Failure:
+    """Carries an exception raised in a stage thread to the consumer."""
+
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+class StageStats:
+    """Where one stage spent its time.
+
+    *busy* is time spent working, *starved* time spent waiting for input
+    and *blocked* time spent waiting for room in the next queue, all in
+    seconds. A stage that is busy most of the run is the bottleneck.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_s": self.busy,
+            "starved_s": self.starved,
+            "blocked_s": self.blocked,
+        }
+
+
+class QueueStats:
+    """Depth of one queue, sampled every time an item is put into it."""
+
+    def __init__(self, name: str, maxsize: int) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.max_depth = 0
+        self._depth_total = 0
+        self._samples = 0
+
+    def sample(self, depth: int) -> None:
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._samples += 1
+
+    @property
+    def mean_depth(self) -> float:
+        return self._depth_total / self._samples if self._samples else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "maxsize": self.maxsize,
+            "mean_depth": self.mean_depth,
+            "max_depth": self.max_depth,
+        }
+
+
+class PipelineStats:
+    """Stage and queue statistics, added up over one or more pipeline runs."""
+
+    def __init__(self) -> None:
+        self.stages: list[StageStats] = []
+        self.queues: list[QueueStats] = []
+        self.wall = 0.0
+
+    def stage(self, name: str) -> StageStats:
+        """Return the stats of stage *name*, adding them if new."""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        self.stages.append(StageStats(name))
+        return self.stages[-1]
+
+    def queue(self, name: str, maxsize: int) -> QueueStats:
+        """Return the stats of queue *name*, adding them if new."""
+        for q in self.queues:
+            if q.name == name:
+                return q
+        self.queues.append(QueueStats(name, maxsize))
+        return self.queues[-1]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "wall_s": self.wall,
+            "stages": {stage.name: stage.to_dict() for stage in self.stages},
+            "queues": {q.name: q.to_dict() for q in self.queues},
+        }
+
+    def report(self) -> list[str]:
+        """Return stage utilization and queue depths as lines of text."""
+        wall = self.wall or 1.0
+        lines = [
+            "  Pipeline (share of wall time):",
+            f"    {'stage':<10} {'items':>7} {'busy':>7} {'starved':>8} "
+            f"{'blocked':>8}",
+        ]
+        for stage in self.stages:
+            lines.append(
+                f"    {stage.name:<10} {stage.items:>7} {stage.busy / wall:>7.1%} "
+                f"{stage.starved / wall:>8.1%} {stage.blocked / wall:>8.1%}"
+            )
+        for q in self.queues:
+            lines.append(
+                f"    queue {q.name:<16} mean depth {q.mean_depth:5.1f}, "
+                f"max {q.max_depth}/{q.maxsize}"
+            )
+        return lines
+
+
+class Pipeline:
+    """A chain of stages, each one a generator fed by the one before.
+
+    Every stage but the last runs in a thread of its own and hands its
+    output to the next through a queue of at most *depth* items, so a
+    stage that runs ahead of its consumer waits instead of piling up
+    results. The last stage runs in the caller's thread, as the iterator
+    returned by :meth:`run`; its *blocked* time is the time the caller
+    spent between items.
+
+    An exception raised in any stage is re-raised to the caller. Closing
+    the iterator returned by :meth:`run` stops every stage once it has
+    finished the item in hand.
+    """
+
+    def __init__(
+        self,
+        depth: int = DEFAULT_DEPTH,
+        stats: Optional[PipelineStats] = None,
+    ) -> None:
+        self.depth = depth
+        self.stats = stats if stats is not None else PipelineStats()
+        self._closed = threading.Event()
+
+    def _read(self, q: queue.Queue, stats: StageStats) -> Iterator[Any]:
+        """Yield the items of *q*, counting the wait as *stats* starved time."""
+        while True:
+            start = time.perf_counter()
+            try:
+                item = q.get(timeout=_CLOSE_CHECK)
+            except queue.Empty:
+                item = None
+                if self._closed.is_set():
+                    item = _DONE
+            stats.starved += time.perf_counter() - start
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            if item is not None:
+                yield item[0]
+
+    def _put(
+        self, q: queue.Queue, qstats: QueueStats, stats: StageStats, item: Any
+    ) -> bool:
+        """Put *item* into *q*; return False if the pipeline was closed."""
+        start = time.perf_counter()
+        try:
+            while not self._closed.is_set():
+                try:
+                    q.put(item, timeout=_CLOSE_CHECK)
+                except queue.Full:
+                    continue
+                qstats.sample(q.qsize())
+                return True
+            return False
+        finally:
+            stats.blocked += time.perf_counter() - start
+
+    def _run_stage(
+        self,
+        func: Callable[[Iterable[Any]], Iterator[Any]],
+        items: Iterable[Any],
+        out: queue.Queue,
+        qstats: QueueStats,
+        stats: StageStats,
+    ) -> None:
+        start = time.perf_counter()
+        starved, blocked = stats.starved, stats.blocked
+        try:
+            for item in func(items):
+                stats.items += 1
+                # Items are wrapped so that None and the markers pass safely.
+                if not self._put(out, qstats, stats, (item,)):
+                    return
+            self._put(out, qstats, stats, _DONE)
+        except BaseException as exc:
+            self._put(out, qstats, stats, _Failure(exc))
+        finally:
+            stats.busy += time.perf_counter() - start - (
+                stats.starved - starved + stats.blocked - blocked
+            )
+
+    def run(
+        self,
+        source: Iterable[Any],
+        stages: Sequence[tuple[str, Callable[[Iterable[Any]], Iterator[Any]]]],
+    ) -> Iterator[Any]:
+        """Feed *source* through *stages* and yield what the last one yields.
+
+        Each stage is a ``(name, function)`` pair; the function takes the
+        items of the previous stage (or *source*, for the first one) and
+        returns an iterator of its own output.
+        """
+        start = time.perf_counter()
+        all_stats = [self.stats.stage(name) for name, _ in stages]
+        threads = []
+        items: Iterable[Any] = source
+        try:
+            for (name, func), stats, consumer in zip(
+                stages, all_stats, all_stats[1:]
+            ):
+                q: queue.Queue = queue.Queue(self.depth)
+                qstats = self.stats.queue(f"{name}->{consumer.name}", self.depth)
+                thread = threading.Thread(
+                    target=self._run_stage,
+                    args=(func, items, q, qstats, stats),
+                    name=f"pdf-organizer-{name}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+                items = self._read(q, consumer)
+
+            stats = all_stats[-1]
+            results = iter(stages[-1][1](items))
+            while True:
+                begin = time.perf_counter()
+                starved = stats.starved
+                try:
+                    item = next(results)
+                except StopIteration:
+                    break
+                finally:
+                    stats.busy += time.perf_counter() - begin - (
+                        stats.starved - starved
+                    )
+                stats.items += 1
+                begin = time.perf_counter()
+                yield item
+                stats.blocked += time.perf_counter() - begin
+        finally:
+            self._closed.set()
+            for thread in threads:
+                thread.join()
+            self.stats.wall += time.perf_counter() - start
@@ -0,0 +1,194 @@
+"""Rename plans: analysis results written by ``plan`` and carried out by ``apply``."""
+
+import json
+import logging
+import os
+import posixpath
+from collections.abc import Iterable
+from pathlib import Path, PurePath
+from typing import IO, Any, Union
+
+from pdf_organizer.renamer import (
+    DirectoryIndex,
+    _rename_noreplace,
+    _replace_with_link,
+    build_new_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump if the record layout changes incompatibly.
+_PLAN_VERSION = 1
+
+# Planned statuses that change the file system when applied.
+_ACTIONS = ("renamed", "linked", "deleted")
+
+
+def fingerprint(path: Union[str, Path]) -> list[int]:
+    """Return the ``[inode, size, mtime_ns]`` of *path*, to spot later changes."""
+    st = os.stat(path)
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def write_plan(results: Iterable[dict[str, Any]], path: Path, folder: Path) -> int:
+    """Write a plan of *results* (from a dry run of *folder*) to *path*.
+
+    The plan is a JSONL file: a header naming the absolute *folder*, then
+    one line per result with the fingerprint of its file. It is written
+    under a temporary name and moved into place once complete, so an
+    interrupted run never leaves half a plan. Returns the number of results.
+    """
+    path = Path(path)
+    folder = Path(folder).resolve()
+    temp = path.with_name(f".{path.name}.tmp")
+    count = 0
+    with open(temp, "w", encoding="utf-8") as fh:
+        header = {"version": _PLAN_VERSION, "folder": str(folder)}
+        fh.write(json.dumps(header) + "\n")
+        for result in results:
+            record = dict(result)
+            try:
+                record["fingerprint"] = fingerprint(folder / result["original_name"])
+            except OSError:
+                record["fingerprint"] = None
+            fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    os.replace(temp, path)
+    return count
+
+
+def _read_header(fh: IO[str], path: Path) -> Path:
+    try:
+        header = json.loads(fh.readline())
+    except json.JSONDecodeError:
+        header = {}
+    if header.get("version") != _PLAN_VERSION:
+        raise ValueError(f"{path} is not a supported rename plan")
+    return Path(header["folder"])
+
+
+def plan_folder(path: Path) -> Path:
+    """Return the folder the plan at *path* was made for."""
+    with open(path, encoding="utf-8") as fh:
+        return _read_header(fh, path)
+
+
+def read_plan(path: Path) -> tuple[Path, list[dict[str, Any]]]:
+    """Return the folder and the records of the plan at *path*."""
+    with open(path, encoding="utf-8") as fh:
+        folder = _read_header(fh, path)
+        records = [json.loads(line) for line in fh if line.strip()]
+    return folder, records
+
+
+def _is_current(path: str, record: dict[str, Any]) -> bool:
+    """Whether the file at *path* is unchanged since *record* was planned."""
+    try:
+        return fingerprint(path) == record["fingerprint"]
+    except OSError:
+        return False
+
+
+def apply_plan(path: Path, dry_run: bool = False) -> list[dict[str, Any]]:
+    """Carry out the renames of the plan at *path* without analysing anything.
+
+    Files whose fingerprint changed since the plan was written are left
+    alone with status ``"stale"``. Target names are resolved for all
+    files up front, against one snapshot of each directory, the same way
+    a run resolves collisions; then the renames are made. If one fails,
+    the renames already made are reversed and the error is raised, so the
+    folder is left as it was. Duplicates are linked or deleted only once
+    every rename succeeded, and only if their first copy is unchanged.
+
+    Returns result dicts like :func:`~pdf_organizer.renamer.iter_renames`
+    for every file the plan would change. With *dry_run* nothing is
+    changed.
+    """
+    folder, records = read_plan(path)
+    # Paths are plain strings here; pathlib dominates the cost otherwise.
+    root = str(folder)
+    indexes: dict[str, DirectoryIndex] = {}
+    # Planned name -> name after apply, for every file that is unchanged.
+    names: dict[str, str] = {}
+    moves: list[tuple[str, str]] = []
+    results: list[dict[str, Any]] = []
+    for record in records:
+        status = record.get("status")
+        if status != "skipped" and status not in _ACTIONS:
+            continue
+        original = record["original_name"]
+        result = {**record, "pages": 0}
+        del result["fingerprint"]
+        if not _is_current(os.path.join(root, original), record):
+            if status != "skipped":
+                logger.warning("%s changed since it was planned", original)
+                result.update(new_name=original, status="stale")
+                results.append(result)
+            continue
+        if status == "skipped":
+            names[record["new_name"]] = original
+            continue
+
+        # The first copy of a duplicate comes earlier in the plan.
+        first = names.get(record.get("duplicate_of", ""))
+        if status != "renamed" and first is None:
+            logger.warning("%s: its first copy changed", original)
+            if status == "deleted":
+                result.update(new_name=original, status="stale")
+                results.append(result)
+                continue
+            result["status"] = status = "renamed"
+        if first is not None:
+            result["duplicate_of"] = first
+        if status != "deleted":
+            # A deleted file's name stays taken in case deleting it fails.
+            parent, name = posixpath.split(original)
+            directory = os.path.join(root, parent)
+            index = indexes.get(directory)
+            if index is None:
+                index = indexes[directory] = DirectoryIndex(Path(directory))
+            new_name = index.resolve(build_new_name(record, PurePath(name)))
+            index.discard(name)
+            index.add(new_name)
+            moves.append(
+                (os.path.join(directory, name), os.path.join(directory, new_name))
+            )
+            result["new_name"] = posixpath.join(parent, new_name)
+            names[record["new_name"]] = result["new_name"]
+        results.append(result)
+
+    if dry_run:
+        return results
+    _move_all(moves)
+    for result in results:
+        try:
+            if result["status"] == "deleted":
+                os.unlink(folder / result["original_name"])
+            elif result["status"] == "linked":
+                _replace_with_link(
+                    folder / result["duplicate_of"], folder / result["new_name"]
+                )
+        except OSError as exc:
+            logger.error("Failed to apply %s: %s", result["original_name"], exc)
+            if result["status"] == "deleted":
+                result.update(new_name=result["original_name"], status="error")
+            else:
+                result["status"] = "renamed"
+    return results
+
+
+def _move_all(moves: list[tuple[str, str]]) -> None:
+    """Make every ``(source, target)`` rename, or none of them."""
+    done: list[tuple[str, str]] = []
+    try:
+        for src, dst in moves:
+            _rename_noreplace(src, dst)
+            done.append((src, dst))
+    except OSError:
+        for src, dst in reversed(done):
+            try:
+                _rename_noreplace(dst, src)
+            except OSError as exc:
+                logger.error("Failed to roll back %s: %s", dst, exc)
+        raise
+
@@ -0,0 +1,200 @@
+"""Per-stage timing of a rename run, with hooks for external metrics."""
+
+import heapq
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from pdf_organizer.pipeline import PipelineStats
+
+# Stages timed for every file, in pipeline order. "open" and "extract" are
+# measured by iter_page_texts, "classify" is the rest of the analysis, and
+# "rename" covers collision resolution and the rename itself.
+STAGES = ("open", "extract", "classify", "rename")
+
+
+class FileStats(NamedTuple):
+    """Timings for one file; *timings* maps stage name to seconds.
+
+    *peak_rss* is the most memory, in bytes, the process analysing the
+    file used while doing so; None if unknown or served from the cache.
+    *bytes_read* is how much of the file was read to hash and parse it;
+    None if unknown.
+    """
+
+    name: str
+    pages: int
+    size: int
+    timings: dict[str, float]
+    peak_rss: Optional[int] = None
+    bytes_read: Optional[int] = None
+
+    @property
+    def total(self) -> float:
+        return sum(self.timings.values())
+
+
+Hook = Callable[[FileStats], None]
+
+
+class Profiler:
+    """Collect per-file stage timings and summarize them.
+
+    Pass one to :func:`~pdf_organizer.renamer.iter_renames` to turn timing
+    on; without a profiler nothing is measured. Every *hook* is called
+    with the :class:`FileStats` of each file as soon as it is done, which
+    is the way to forward the same numbers to another metrics system.
+
+    Stage totals add up time spent in every worker process, so with
+    several jobs they can exceed the wall time of the run. *pipeline*
+    collects how busy each pipeline stage was and how full the queues
+    between them ran.
+    """
+
+    def __init__(self, top: int = 10, hooks: tuple[Hook, ...] = ()) -> None:
+        self.top = top
+        self.hooks = list(hooks)
+        self.files = 0
+        self.pages = 0
+        self.bytes = 0
+        self.bytes_read = 0
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.maxima = dict.fromkeys(STAGES, 0.0)
+        self._slowest: list[tuple[float, int, FileStats]] = []
+        self.peak_rss: Optional[FileStats] = None
+        self.pipeline = PipelineStats()
+        self._started = time.perf_counter()
+        self._finished: Optional[float] = None
+
+    def add_hook(self, hook: Hook) -> None:
+        """Call *hook* with the stats of every file recorded from now on."""
+        self.hooks.append(hook)
+
+    def record(self, stats: FileStats) -> None:
+        """Add one file's stats to the summary and pass them to the hooks."""
+        self.files += 1
+        self.pages += stats.pages
+        self.bytes += stats.size
+        self.bytes_read += stats.bytes_read or 0
+        for stage, seconds in stats.timings.items():
+            self.totals[stage] = self.totals.get(stage, 0.0) + seconds
+            self.maxima[stage] = max(self.maxima.get(stage, 0.0), seconds)
+        if stats.peak_rss is not None and (
+            self.peak_rss is None or stats.peak_rss > self.peak_rss.peak_rss
+        ):
+            self.peak_rss = stats
+        # Min-heap of the slowest files; the counter breaks ties stably.
+        entry = (stats.total, self.files, stats)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, entry)
+        elif self.top:
+            heapq.heappushpop(self._slowest, entry)
+        for hook in self.hooks:
+            hook(stats)
+
+    def finish(self) -> None:
+        """Stop the wall clock."""
+        self._finished = time.perf_counter()
+
+    @property
+    def wall_time(self) -> float:
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return end - self._started
+
+    def slowest(self) -> list[FileStats]:
+        """Return the slowest files recorded, slowest first."""
+        return [stats for _, _, stats in sorted(self._slowest, reverse=True)]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the summary as JSON-serializable data."""
+        return {
+            "files": self.files,
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "bytes_read": self.bytes_read,
+            "wall_s": self.wall_time,
+            "stages": {
+                stage: {
+                    "total_s": total,
+                    "mean_ms": total / self.files * 1000 if self.files else 0.0,
+                    "max_ms": self.maxima[stage] * 1000,
+                }
+                for stage, total in self.totals.items()
+            },
+            "slowest": [
+                {
+                    "name": stats.name,
+                    "pages": stats.pages,
+                    "bytes": stats.size,
+                    "total_ms": stats.total * 1000,
+                    "stages_ms": {k: v * 1000 for k, v in stats.timings.items()},
+                    "peak_rss_bytes": stats.peak_rss,
+                    "bytes_read": stats.bytes_read,
+                }
+                for stats in self.slowest()
+            ],
+            "peak_rss": None if self.peak_rss is None else {
+                "name": self.peak_rss.name,
+                "bytes": self.peak_rss.peak_rss,
+            },
+            "pipeline": self.pipeline.to_dict(),
+        }
+
+    def write_json(self, path: Path) -> None:
+        """Write :meth:`to_dict` to *path*."""
+        Path(path).write_text(
+            json.dumps(self.to_dict(), indent=2) + "\n", encoding="utf-8"
+        )
+
+    def report(self) -> list[str]:
+        """Return a human-readable breakdown as lines of text."""
+        busy = sum(self.totals.values())
+        lines = [
+            f"Profile: {self.files} files, {self.pages} pages, "
+            f"{self.wall_time:.2f}s wall",
+            f"  {'stage':<10} {'total s':>9} {'mean ms':>9} {'max ms':>9} "
+            f"{'share':>6}",
+        ]
+        for stage, total in self.totals.items():
+            mean = total / self.files * 1000 if self.files else 0.0
+            share = total / busy if busy else 0.0
+            lines.append(
+                f"  {stage:<10} {total:>9.3f} {mean:>9.2f} "
+                f"{self.maxima[stage] * 1000:>9.2f} {share:>6.1%}"
+            )
+        if self.bytes:
+            lines.append(
+                f"  Read: {_mb(self.bytes_read)} MB of {_mb(self.bytes)} MB "
+                f"({self.bytes_read / self.bytes:.0%})"
+            )
+        if self.peak_rss is not None:
+            lines.append(
+                f"  Peak memory: {_mb(self.peak_rss.peak_rss)} MB "
+                f"({self.peak_rss.name})"
+            )
+        if self.pipeline.stages:
+            lines.extend(self.pipeline.report())
+        slowest = self.slowest()
+        if slowest:
+            lines.append(f"  Slowest {len(slowest)} files:")
+            lines.append(
+                f"    {'ms':>9} {'pages':>5} {'bytes':>10} {'read':>10} "
+                f"{'peak MB':>8}  name"
+            )
+            for stats in slowest:
+                lines.append(
+                    f"    {stats.total * 1000:>9.2f} {stats.pages:>5} "
+                    f"{stats.size:>10} {_dash(stats.bytes_read):>10} "
+                    f"{_mb(stats.peak_rss):>8}  {stats.name}"
+                )
+        return lines
+
+
+def _dash(value: Optional[int]) -> str:
+    return "-" if value is None else str(value)
+
+
+def _mb(size: Optional[int]) -> str:
+    return "-" if size is None else f"{size / 2**20:.1f}"
@@ -1,15 +1,50 @@
 """File renaming logic, collision handling, and CSV logging."""
 
+import contextlib
 import csv
+import errno
+import functools
+import itertools
 import logging
+import os
 import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Container, Iterable, Iterator, Sequence
 from pathlib import Path
+from typing import Any, Optional
 
-from pdf_organizer.classifier import classify
-from pdf_organizer.extractor import extract_text
+from pdf_organizer.cache import ExtractionCache
+from pdf_organizer.classifier import (
+    IncrementalClassifier,
+    format_sources,
+    load_institutions,
+)
+from pdf_organizer.dedup import DEDUP_ACTIONS, DuplicateFinder
+from pdf_organizer.extractor import TextBuffer, iter_page_texts
+from pdf_organizer.mapped import MappedFile
+from pdf_organizer.pipeline import Pipeline
+from pdf_organizer.profiling import FileStats, Profiler
+from pdf_organizer.scanner import iter_pdfs
+from pdf_organizer.sharding import shard_key, shard_of
+from pdf_organizer.supervisor import (
+    SupervisedPool,
+    WorkerFailed,
+    peak_rss,
+    reset_peak_rss,
+)
+from pdf_organizer.watcher import SETTLE_SECONDS, FolderWatcher
 
 logger = logging.getLogger(__name__)
 
+# Tasks kept in flight per worker process. Enough to keep every worker busy
+# while the main process renames, small enough to keep memory bounded.
+_TASKS_PER_WORKER = 4
+
+# How often watch mode checks whether it has been told to stop, in seconds.
+_WATCH_STOP_CHECK = 0.5
+
 
 def _sanitize(name: str) -> str:
     """Remove special characters and replace spaces with underscores."""
@@ -56,51 +91,764 @@ def _resolve_collision(target: Path) -> Path:
         counter += 1
 
 
-def rename_files(
+class DirectoryIndex:
+    """In-memory snapshot of the names in one directory.
+
+    Built from a single ``os.scandir`` call, it answers collision queries
+    the way :func:`_resolve_collision` does, without a ``stat`` per
+    candidate. For every stem it remembers the next suffix that may be
+    free, so resolving many files to the same name stays linear. Callers
+    keep it current with :meth:`add` and :meth:`discard` as they rename.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        with os.scandir(folder) as entries:
+            self._names = {entry.name for entry in entries}
+        self._next_suffix: dict[tuple[str, str], int] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def resolve(self, name: str) -> str:
+        """Return *name*, or the first free ``{stem}_{n}{suffix}`` variant."""
+        if name not in self._names:
+            return name
+        stem, suffix = os.path.splitext(name)
+        counter = self._next_suffix.get((stem, suffix), 2)
+        while f"{stem}_{counter}{suffix}" in self._names:
+            counter += 1
+        self._next_suffix[(stem, suffix)] = counter
+        return f"{stem}_{counter}{suffix}"
+
+    def add(self, name: str) -> None:
+        """Record that *name* now exists."""
+        self._names.add(name)
+
+    def discard(self, name: str) -> None:
+        """Record that *name* no longer exists."""
+        self._names.discard(name)
+        stem, suffix = os.path.splitext(name)
+        base, _, counter = stem.rpartition("_")
+        key = (base, suffix)
+        if base and counter.isdigit() and int(counter) < self._next_suffix.get(key, 0):
+            self._next_suffix[key] = int(counter)
+
+
+# errno values meaning "this filesystem cannot hard-link", not a real failure.
+_NO_HARD_LINKS = {
+    errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK, errno.EXDEV
+}
+
+
+def _rename_noreplace(src: Path, dst: Path) -> None:
+    """Rename *src* to *dst*, raising FileExistsError instead of overwriting.
+
+    On POSIX a plain rename silently replaces *dst*, so the new name is
+    created with a hard link (which fails atomically if it exists) before
+    the old one is removed. Where hard links are not supported, the name
+    is claimed by creating an empty file exclusively, which the rename then
+    replaces. Either way another process can never get the same name.
+    """
+    if os.name == "nt":
+        os.rename(src, dst)  # Never overwrites on Windows.
+        return
+    try:
+        os.link(src, dst, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except OSError as exc:
+        if exc.errno not in _NO_HARD_LINKS:
+            raise
+        # No hard links on this filesystem: claim the name, then move over it.
+        os.close(os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL))
+        try:
+            os.replace(src, dst)
+        except OSError:
+            os.unlink(dst)
+            raise
+        return
+    os.unlink(src)
+
+
+def _rename_into(pdf_path: Path, wanted: str, index: DirectoryIndex) -> str:
+    """Rename *pdf_path* to *wanted*, or a free variant of it, in its folder.
+
+    The free name comes from *index*; the filesystem is only consulted
+    again if the rename fails because the name was taken since the index
+    snapshot (or differs only in case on a case-insensitive filesystem).
+    Returns the name used.
+    """
+    while True:
+        new_name = index.resolve(wanted)
+        try:
+            _rename_noreplace(pdf_path, index.folder / new_name)
+        except FileExistsError:
+            logger.debug("%s appeared on disk; trying the next name", new_name)
+            index.add(new_name)
+            continue
+        index.discard(pdf_path.name)
+        index.add(new_name)
+        return new_name
+
+
+# Metadata entries that describe a document, searched by the metadata tier.
+# The creator and producer name the software that made the file.
+_DESCRIPTIVE_METADATA = ("title", "subject", "keywords", "author")
+
+
+def _name_text(pdf_path: Path) -> str:
+    """Return the words of a file name; underscores separate them too."""
+    return pdf_path.stem.replace("_", " ")
+
+
+def _analyze(
+    pdf_path: Path,
+    keep_text: bool = False,
+    max_pages: Optional[int] = None,
+    date_policy: str = "latest",
+    institutions_file: Optional[Path] = None,
+    matcher_cache_dir: Optional[Path] = None,
+    profile: bool = False,
+    engine: str = "layout",
+    max_text: Optional[int] = None,
+    mapped: Optional[MappedFile] = None,
+    text_only: bool = False,
+) -> tuple[dict[str, Any], Optional[str], bool]:
+    """Extract and classify a single PDF (runs in a worker when jobs > 1).
+
+    Pages are parsed one at a time and extraction stops as soon as the
+    classification is settled or *max_pages* pages have been read.
+    The institution matcher is loaded once per process.
+
+    The file is parsed from *mapped* if it is already mapped, otherwise
+    from a new map of it.
+
+    Unless *text_only* is set, the classification is tiered: the PDF's
+    metadata (title, subject, keywords and author, each on its own), then
+    the file name, settle whatever fields they give with confidence (see
+    :meth:`~pdf_organizer.classifier.IncrementalClassifier.hint`), and
+    pages are only read for the fields that are left, if any. What they
+    merely mention, and the creation date, being when the file was made
+    rather than the document's own date, are used only for fields the
+    pages leave empty. The ``source`` of each
+    field is reported, as :func:`~pdf_organizer.classifier.format_sources`
+    describes it.
+
+    Returns the classification (with the number of ``pages`` parsed and
+    the ``bytes_read`` from the file), the extracted text if *keep_text*
+    is set, and whether that text alone gives the classification: it
+    covers every page and no field came from elsewhere. At most *max_text*
+    characters of text are kept; the classification still sees every
+    page read.
+    A file none of whose pages read has a text layer, such as a scan that
+    was never OCRed, gets the status ``"needs_ocr"``.
+    With *profile*, the classification also holds stage ``timings``;
+    "classify" is whatever analysis time was not spent in the PDF parser.
+    It also holds the ``peak_rss`` of the process while handling the file,
+    in bytes, where the platform reports it.
+    """
+    timings: Optional[dict[str, float]] = None
+    if profile:
+        timings = {}
+        start = time.perf_counter()
+        reset_peak_rss()
+    clf = IncrementalClassifier(
+        date_policy,
+        institutions=load_institutions(institutions_file, matcher_cache_dir),
+    )
+    texts = TextBuffer(max_text)
+    textless: list[int] = []
+    metadata: dict[str, str] = {}
+
+    def hint(found: dict[str, str]) -> bool:
+        metadata.update(found)
+        for key in _DESCRIPTIVE_METADATA:
+            if found.get(key):
+                clf.hint("metadata", found[key])
+        return clf.hint("filename", _name_text(pdf_path))
+
+    with contextlib.ExitStack() as stack:
+        if mapped is None:
+            try:
+                mapped = stack.enter_context(MappedFile(pdf_path))
+            except OSError:
+                pass  # iter_page_texts reports it
+        for page_text in iter_page_texts(
+            pdf_path, max_pages, timings, engine, mapped, textless,
+            None if text_only else hint,
+        ):
+            if keep_text:
+                texts.add(page_text)
+            if clf.feed(page_text):
+                complete = False
+                break
+        else:
+            complete = max_pages is None or clf.pages < max_pages
+
+    info: dict[str, Any] = clf.result()
+    if not info["date"] and "created" in metadata:
+        clf.hint("metadata", metadata["created"])
+        info = clf.result()
+    sources = clf.sources()
+    info["source"] = format_sources(info, sources)
+    if sources:
+        complete = False
+    if textless and len(textless) == clf.pages:
+        info["status"] = "needs_ocr"
+    info["pages"] = clf.pages
+    info["bytes_read"] = mapped.bytes_read if mapped is not None else 0
+    if timings is not None:
+        parsing = timings.get("open", 0.0) + timings.get("extract", 0.0)
+        timings["classify"] = time.perf_counter() - start - parsing
+        info["timings"] = timings
+        info["peak_rss"] = peak_rss()
+    if not keep_text:
+        return info, None, complete
+    return info, texts.text(), complete and not texts.truncated
+
+
+@contextlib.contextmanager
+def _open_mapped(pdf_path: Path) -> Iterator[Optional[MappedFile]]:
+    """Map *pdf_path* for the duration of the block.
+
+    Yields None instead if the file cannot be mapped; the error is reported
+    by whatever reads the file next.
+    """
+    mapped = None
+    try:
+        mapped = MappedFile(pdf_path)
+    except OSError:
+        pass
+    try:
+        yield mapped
+    finally:
+        if mapped is not None:
+            mapped.close()
+
+
+def _failed(status: str) -> dict[str, Any]:
+    """Return the classification of a file whose analysis failed with *status*."""
+    return {
+        "doc_type": "", "institution": "", "date": "", "pages": 0, "status": status,
+        "source": "",
+    }
+
+
+# Placeholder classification of a file _iter_analyzed passes through.
+_PASSED: dict[str, Any] = {}
+
+
+def _iter_analyzed(
+    pdf_files: Iterable[Path],
+    analyze: Callable[..., tuple[dict[str, Any], Optional[str], bool]],
+    jobs: int,
+    cache: Optional[ExtractionCache] = None,
+    file_timeout: Optional[float] = None,
+    max_rss: Optional[int] = None,
+    passthrough: Optional[Callable[[Path], bool]] = None,
+) -> Iterator[tuple[Path, Optional[dict[str, Any]]]]:
+    """Yield ``(path, classification)`` pairs in the order of *pdf_files*.
+
+    *pdf_files* is consumed lazily, a few files ahead of the consumer.
+
+    Files for which *passthrough* returns True are not looked at; their
+    classification is None. Files found in *cache* are answered without
+    extraction. The rest is passed to *analyze*, spread over a process pool
+    when *jobs* > 1. Only a small window of tasks is submitted ahead of the
+    consumer, so results stream back as soon as the next file in order is
+    ready.
+
+    With *file_timeout* (seconds) or *max_rss* (bytes), analysis always
+    runs in supervised worker processes, even for one job. A file whose
+    worker exceeds a limit or dies gets a classification with a ``status``
+    of ``"timeout"``, ``"oom"`` or ``"error"`` instead.
+    """
+
+    def lookup(pdf_path: Path, stack: contextlib.ExitStack):
+        # An unchanged file is only stat'ed. Otherwise it is mapped on
+        # *stack* and hashed from the map, which the parser then reads.
+        if passthrough is not None and passthrough(pdf_path):
+            return None, _PASSED, None
+        if cache is None:
+            return None, None, None
+        mapped = None
+        key = cache.known_key(pdf_path)
+        if key is None:
+            mapped = stack.enter_context(_open_mapped(pdf_path))
+            key = cache.key(pdf_path, mapped)
+        info = cache.get(key, pdf_path.name) if key else None
+        if info is not None:
+            info["pages"] = 0
+            info["bytes_read"] = mapped.bytes_read if mapped is not None else 0
+        return key, info, mapped
+
+    def store(pdf_path, key, analyzed):
+        info, text, complete = analyzed
+        if key is not None:
+            cache.put(key, text, info, complete, pdf_path.name)
+        return info
+
+    if jobs <= 1 and file_timeout is None and max_rss is None:
+        for pdf_path in pdf_files:
+            with contextlib.ExitStack() as stack:
+                key, info, mapped = lookup(pdf_path, stack)
+                if info is None:
+                    info = store(pdf_path, key, analyze(pdf_path, mapped=mapped))
+            yield pdf_path, None if info is _PASSED else info
+        return
+
+    pool = SupervisedPool(analyze, jobs, timeout=file_timeout, max_rss=max_rss)
+    try:
+        remaining = iter(pdf_files)
+        pending: deque = deque()
+
+        def fill() -> None:
+            # Cache hits are queued as ready results; misses as futures.
+            for pdf_path in itertools.islice(
+                remaining, jobs * _TASKS_PER_WORKER - len(pending)
+            ):
+                with contextlib.ExitStack() as stack:
+                    key, info, mapped = lookup(pdf_path, stack)
+                    hashed = mapped.bytes_read if mapped is not None else 0
+                if info is None:
+                    info = pool.submit(pdf_path)
+                pending.append((pdf_path, key, info, hashed))
+
+        fill()
+        while pending:
+            pdf_path, key, info, hashed = pending.popleft()
+            if info is _PASSED:
+                info = None
+            elif not isinstance(info, dict):
+                try:
+                    info = store(pdf_path, key, info.result())
+                    # The worker maps the file again; after hashing, that is
+                    # usually served from the page cache but counted anyway.
+                    info["bytes_read"] = info.get("bytes_read", 0) + hashed
+                except WorkerFailed as exc:
+                    logger.error("Failed to analyze %s: %s", pdf_path.name, exc)
+                    info = _failed(exc.status)
+            fill()
+            yield pdf_path, info
+    finally:
+        pool.shutdown()
+
+
+def iter_renames(
     folder: Path,
     dry_run: bool = False,
-) -> list[dict[str, str]]:
+    jobs: int = 1,
+    cache: Optional[ExtractionCache] = None,
+    max_pages: Optional[int] = None,
+    date_policy: str = "latest",
+    institutions_file: Optional[Path] = None,
+    recursive: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Container[str] = frozenset(),
+    profiler: Optional[Profiler] = None,
+    engine: str = "layout",
+    file_timeout: Optional[float] = None,
+    max_rss_mb: Optional[int] = None,
+    paths: Optional[Iterable[Path]] = None,
+    dedup: Optional[str] = None,
+    max_text: Optional[int] = None,
+    shard: Optional[tuple[int, int]] = None,
+    text_only: bool = False,
+) -> Iterator[dict[str, Any]]:
     """Scan *folder* for PDFs, classify each, and rename (or preview).
 
-    Returns a list of result dicts suitable for CSV logging.
+    Yields one result dict per file as soon as it has been handled.
+    Extraction and classification run in up to *jobs* processes, but renames
+    and collision resolution always happen here, in sorted file order, so
+    the output is identical to a serial run. Scanning, extraction and
+    renaming are stages of a :class:`~pdf_organizer.pipeline.Pipeline`, each
+    in its own thread, so slow directory listings, reads and renames
+    overlap with parsing. Files already present in
+    *cache* are not extracted again. Collisions are resolved against a
+    :class:`DirectoryIndex` snapshot of the file's own directory.
+
+    Files are found by :func:`~pdf_organizer.scanner.iter_pdfs`, which
+    also takes *recursive*, *include* and *exclude*. The tree is walked
+    lazily, so the first results arrive before the scan is finished. File
+    names in the results are relative to *folder*. Files whose relative
+    name is in *skip* (for example, ones finished by an interrupted run)
+    are passed over without being opened. If *paths* is given, those files
+    in *folder* are handled, in that order, instead of scanning it. With
+    *shard* ``(I, N)``, only the files :func:`~pdf_organizer.sharding.
+    shard_of` assigns to shard I of N are handled, so that N instances can
+    share a folder. A file's shard follows it when it is renamed (see
+    :func:`~pdf_organizer.sharding.shard_key`), so no two instances handle
+    it, and their renames never take the same name, since a name is only
+    ever claimed atomically (see :func:`_rename_noreplace`).
+
+    With a *profiler*, the time each file spends in every stage is
+    measured and handed to :meth:`Profiler.record`, together with the peak
+    memory of the process that analysed it, and the pipeline's stage
+    utilization and queue depths are added to ``profiler.pipeline``.
+
+    *engine* selects the text extraction engine; see
+    :func:`~pdf_organizer.extractor.iter_page_texts`. At most *max_text*
+    characters of each file's text are kept for the *cache*.
+
+    A file whose analysis takes longer than *file_timeout* seconds, or
+    whose worker process grows beyond *max_rss_mb* MiB of resident memory,
+    is left alone and reported with status ``"timeout"`` or ``"oom"``; its
+    worker is killed and replaced and the run carries on.
+
+    At most *max_pages* pages are parsed per file, and parsing stops early
+    once the classification can no longer change under *date_policy*. The
+    ``pages`` field of each result is the number of pages actually parsed.
+    Fields the PDF's metadata or the file name settle are not looked for
+    in the pages at all, unless *text_only* is set; each result's
+    ``source`` says where its fields came from (see :func:`_analyze`).
+
+    Names listed in *institutions_file* are matched in addition to the
+    built-in KNOWN_INSTITUTIONS.
+
+    With *dedup* set to one of :data:`~pdf_organizer.dedup.DEDUP_ACTIONS`,
+    a file identical to one handled earlier in the run is not extracted:
+    it reuses that file's classification, its result names the first copy
+    in ``duplicate_of``, and it is renamed as usual (``"report"``), left
+    alone (``"skip"``, status ``"duplicate"``), replaced by a hard link to
+    the first copy (``"link"``, status ``"linked"``) or deleted
+    (``"delete"``, status ``"deleted"``).
     """
-    results: list[dict[str, str]] = []
-    pdf_files = sorted(folder.glob("*.pdf"))
+    if dedup is not None and dedup not in DEDUP_ACTIONS:
+        raise ValueError(f"Unknown dedup action: {dedup!r}")
+    if paths is None:
+        pdf_files = iter_pdfs(folder, recursive, include, exclude)
+    else:
+        pdf_files = iter(paths)
+    if skip:
+        pdf_files = (
+            p for p in pdf_files if p.relative_to(folder).as_posix() not in skip
+        )
+    if shard is not None:
+        index, count = shard
+        pdf_files = (
+            p
+            for p in pdf_files
+            if shard_of(shard_key(p, folder), count) == index
+        )
+    analyze = functools.partial(
+        _analyze,
+        keep_text=cache is not None,
+        max_pages=max_pages,
+        date_policy=date_policy,
+        institutions_file=institutions_file,
+        matcher_cache_dir=cache.cache_dir if cache is not None else None,
+        profile=profiler is not None,
+        engine=engine,
+        max_text=max_text,
+        text_only=text_only,
+    )
 
-    for pdf_path in pdf_files:
-        text = extract_text(pdf_path)
-        info = classify(text)
-        new_name = build_new_name(info, pdf_path)
+    finder = DuplicateFinder() if dedup is not None else None
 
-        status = "renamed"
-        if new_name == pdf_path.name:
-            status = "skipped"
-        else:
-            target = _resolve_collision(folder / new_name)
-            new_name = target.name
-            if not dry_run:
+    def find_duplicates(files: Iterable[Path]) -> Iterator[Path]:
+        for pdf_path in files:
+            finder.check(pdf_path)
+            yield pdf_path
+
+    def extract(
+        files: Iterable[Path],
+    ) -> Iterator[tuple[Path, Optional[dict[str, Any]]]]:
+        return _iter_analyzed(
+            files,
+            analyze,
+            jobs,
+            cache,
+            file_timeout=file_timeout,
+            max_rss=max_rss_mb * 1024 * 1024 if max_rss_mb else None,
+            passthrough=finder.is_duplicate if finder is not None else None,
+        )
+
+    rename = functools.partial(
+        _rename_stage,
+        folder=folder,
+        dry_run=dry_run,
+        profiler=profiler,
+        finder=finder,
+        dedup=dedup,
+    )
+    stages = [("scan", iter), ("extract", extract), ("rename", rename)]
+    if finder is not None:
+        stages.insert(1, ("dedup", find_duplicates))
+    pipeline = Pipeline(stats=profiler.pipeline if profiler is not None else None)
+    yield from pipeline.run(pdf_files, stages)
+
+
+def _replace_with_link(source: Path, path: Path) -> None:
+    """Replace the file at *path* with a hard link to *source*."""
+    temp = path.with_name(f".{path.name}.{os.getpid()}.link")
+    os.link(source, temp)
+    try:
+        os.replace(temp, path)
+    except OSError:
+        os.unlink(temp)
+        raise
+
+
+def _rename_stage(
+    analyzed: Iterable[tuple[Path, Optional[dict[str, Any]]]],
+    folder: Path,
+    dry_run: bool,
+    profiler: Optional[Profiler],
+    finder: Optional[DuplicateFinder] = None,
+    dedup: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """Rename each analyzed file in turn and yield its result dict.
+
+    Files passed through without a classification are duplicates found by
+    *finder*; they take the classification of their first copy and are
+    handled according to *dedup*.
+    """
+    index: Optional[DirectoryIndex] = None
+    for pdf_path, info in analyzed:
+        if index is None or index.folder != pdf_path.parent:
+            # Files arrive grouped by directory; only one index is kept.
+            index = DirectoryIndex(pdf_path.parent)
+
+        if profiler is not None:
+            try:
+                size = pdf_path.stat().st_size
+            except OSError:
+                size = 0
+            start = time.perf_counter()
+
+        duplicate_of = ""
+        if info is None:
+            # The first copy was handled earlier, so its result is stored.
+            first, duplicate_of = finder.original(pdf_path)
+            info = {**first, "pages": 0}
+
+        # Analysis that failed (timeout, oom or error) arrives with a status.
+        status = info.get("status", "renamed")
+        new_name = pdf_path.name
+        if status == "renamed" and duplicate_of and dedup == "skip":
+            status = "duplicate"
+        elif status == "renamed" and duplicate_of and dedup == "delete":
+            status = "deleted"
+            new_name = ""
+            try:
+                if not dry_run:
+                    pdf_path.unlink()
+                index.discard(pdf_path.name)
+            except OSError as exc:
+                logger.error("Failed to delete %s: %s", pdf_path.name, exc)
+                status = "error"
+                new_name = pdf_path.name
+        elif status == "renamed":
+            new_name = build_new_name(info, pdf_path)
+            if new_name == pdf_path.name:
+                status = "skipped"
+            elif dry_run:
+                # Track the would-be renames so the preview matches a real run.
+                new_name = index.resolve(new_name)
+                index.discard(pdf_path.name)
+                index.add(new_name)
+            else:
                 try:
-                    pdf_path.rename(target)
+                    new_name = _rename_into(pdf_path, new_name, index)
                 except OSError as exc:
                     logger.error("Failed to rename %s: %s", pdf_path.name, exc)
                     status = "error"
+            if duplicate_of and dedup == "link" and status != "error":
+                status = "linked"
+                if not dry_run:
+                    try:
+                        _replace_with_link(
+                            folder / duplicate_of, pdf_path.with_name(new_name)
+                        )
+                    except OSError as exc:
+                        logger.error("Failed to link %s: %s", new_name, exc)
+                        status = "renamed" if new_name != pdf_path.name else "skipped"
 
-        results.append({
-            "original_name": pdf_path.name,
-            "new_name": new_name,
+        original = pdf_path.relative_to(folder)
+        renamed_to = original.with_name(new_name).as_posix() if new_name else ""
+        if finder is not None and not duplicate_of:
+            first = {
+                k: v
+                for k, v in info.items()
+                if k not in ("pages", "timings", "peak_rss", "bytes_read")
+            }
+            finder.record(pdf_path, first, renamed_to)
+            if not dry_run and new_name != pdf_path.name:
+                finder.moved(pdf_path, pdf_path.with_name(new_name))
+        if profiler is not None:
+            timings = info.get("timings", {})
+            timings["rename"] = time.perf_counter() - start
+            profiler.record(
+                FileStats(
+                    original.as_posix(), info["pages"], size, timings,
+                    info.get("peak_rss"), info.get("bytes_read"),
+                )
+            )
+        yield {
+            "original_name": original.as_posix(),
+            "new_name": renamed_to,
             "doc_type": info["doc_type"],
             "institution": info["institution"],
             "date": info["date"],
+            "pages": info["pages"],
             "status": status,
-        })
+            "duplicate_of": duplicate_of,
+            "source": info.get("source", ""),
+        }
+
+
+def rename_files(
+    folder: Path,
+    dry_run: bool = False,
+    jobs: int = 1,
+    cache: Optional[ExtractionCache] = None,
+    max_pages: Optional[int] = None,
+    date_policy: str = "latest",
+    institutions_file: Optional[Path] = None,
+    recursive: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Container[str] = frozenset(),
+    profiler: Optional[Profiler] = None,
+    engine: str = "layout",
+    file_timeout: Optional[float] = None,
+    max_rss_mb: Optional[int] = None,
+    dedup: Optional[str] = None,
+    max_text: Optional[int] = None,
+    shard: Optional[tuple[int, int]] = None,
+    text_only: bool = False,
+) -> list[dict[str, Any]]:
+    """Scan *folder* for PDFs, classify each, and rename (or preview).
+
+    Returns a list of result dicts suitable for CSV logging.
+    See :func:`iter_renames` for the arguments.
+    """
+    return list(iter_renames(
+        folder,
+        dry_run=dry_run,
+        jobs=jobs,
+        cache=cache,
+        max_pages=max_pages,
+        date_policy=date_policy,
+        institutions_file=institutions_file,
+        recursive=recursive,
+        include=include,
+        exclude=exclude,
+        skip=skip,
+        profiler=profiler,
+        engine=engine,
+        file_timeout=file_timeout,
+        max_rss_mb=max_rss_mb,
+        dedup=dedup,
+        max_text=max_text,
+        shard=shard,
+        text_only=text_only,
+    ))
+
+
+def watch_renames(
+    folder: Path,
+    dry_run: bool = False,
+    jobs: int = 1,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    skip: Container[str] = frozenset(),
+    stop: Optional[threading.Event] = None,
+    settle: float = SETTLE_SECONDS,
+    use_inotify: bool = True,
+    **options: Any,
+) -> Iterator[dict[str, Any]]:
+    """Rename the PDFs in *folder*, then keep renaming new ones as they arrive.
+
+    The folder is scanned once; after that a :class:`FolderWatcher`
+    reports each PDF that is dropped into it once the file has been quiet
+    for *settle* seconds, and every batch of such files goes through
+    :func:`iter_renames`. The names our own renames create are not picked
+    up again. Subfolders are not watched.
+
+    Runs until *stop* is set, checking it at least every half second. The
+    other arguments, and any further *options*, are passed to
+    :func:`iter_renames`; *skip* only applies to the first scan.
+    """
+    if options.get("recursive"):
+        raise ValueError("watching subfolders is not supported")
+    with FolderWatcher(folder, settle, include, exclude, use_inotify) as watcher:
+        batch: Optional[list[Path]] = None
+        while True:
+            results = iter_renames(
+                folder,
+                dry_run=dry_run,
+                jobs=min(jobs, len(batch)) if batch else jobs,
+                include=include,
+                exclude=exclude,
+                skip=skip if batch is None else frozenset(),
+                paths=batch,
+                **options,
+            )
+            for result in results:
+                if result["status"] == "renamed" and not dry_run:
+                    watcher.ignore(result["new_name"])
+                yield result
+            batch = []
+            while not batch:
+                if stop is not None and stop.is_set():
+                    return
+                batch = watcher.wait(_WATCH_STOP_CHECK)
+
+
+_CSV_FIELDS = [
+    "original_name", "new_name", "doc_type", "institution", "date", "pages",
+    "status", "duplicate_of", "source",
+]
+
+
+class CsvLog:
+    """CSV rename log written one row at a time.
+
+    Each row is flushed as it is written, so the log is complete up to the
+    last finished file even if the run is interrupted. With *append*, rows
+    are added to an existing log, such as that of the interrupted run a
+    resumed one continues, if it has the same columns.
+    """
+
+    def __init__(self, output_path: Path, append: bool = False) -> None:
+        append = append and output_path.exists() and output_path.stat().st_size > 0
+        if append:
+            with open(output_path, newline="", encoding="utf-8") as fh:
+                if next(csv.reader(fh), None) != _CSV_FIELDS:
+                    raise ValueError(
+                        f"{output_path} has other columns; cannot append to it"
+                    )
+        self._fh = open(
+            output_path, "a" if append else "w", newline="", encoding="utf-8"
+        )
+        self._writer = csv.DictWriter(
+            self._fh, fieldnames=_CSV_FIELDS, extrasaction="ignore"
+        )
+        if not append:
+            self._writer.writeheader()
+
+    def __enter__(self) -> "CsvLog":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def write(self, result: dict[str, Any]) -> None:
+        """Append one result row."""
+        self._writer.writerow(result)
+        self._fh.flush()
 
-    return results
+    def close(self) -> None:
+        """Close the log file."""
+        self._fh.close()
 
 
-def write_csv_log(results: list[dict[str, str]], output_path: Path) -> None:
+def write_csv_log(results: Iterable[dict[str, Any]], output_path: Path) -> None:
     """Write rename results to a CSV file."""
-    fieldnames = ["original_name", "new_name", "doc_type", "institution", "date"]
     with open(output_path, "w", newline="", encoding="utf-8") as fh:
-        writer = csv.DictWriter(fh, fieldnames=fieldnames, extrasaction="ignore")
+        writer = csv.DictWriter(fh, fieldnames=_CSV_FIELDS, extrasaction="ignore")
         writer.writeheader()
         writer.writerows(results)
@@ -0,0 +1,218 @@
+"""Rename log kept in SQLite, with every run appended and indexed."""
+
+import csv
+import sqlite3
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from pdf_organizer.renamer import _CSV_FIELDS
+
+# Rows inserted per transaction. With keys in no particular order, every
+# row dirties an index page of its own, so small batches rewrite the same
+# pages over and over. Together with the larger page cache below, batches
+# of ten thousand write a million-row log twice as fast as batches of a
+# thousand.
+_BATCH_SIZE = 10_000
+
+# Page cache, in KiB (SQLite's negative cache_size), big enough to hold the
+# hot part of the indexes of a log with millions of rows.
+_CACHE_KIB = 64 * 1024
+
+# Identifies the database layout; a log written by an incompatible version
+# is refused rather than rebuilt, since it cannot be recreated.
+_SCHEMA_VERSION = 2
+
+# Statements that upgrade a log from each older version to the next.
+_MIGRATIONS = {
+    1: "ALTER TABLE results ADD COLUMN source TEXT NOT NULL DEFAULT ''",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY,
+    command     TEXT NOT NULL,
+    folder      TEXT NOT NULL,
+    started     REAL NOT NULL,
+    finished    REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id        INTEGER NOT NULL REFERENCES runs(id),
+    original_name TEXT NOT NULL,
+    new_name      TEXT NOT NULL,
+    doc_type      TEXT NOT NULL,
+    institution   TEXT NOT NULL,
+    date          TEXT NOT NULL,
+    pages         INTEGER NOT NULL,
+    status        TEXT NOT NULL,
+    duplicate_of  TEXT NOT NULL,
+    source        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_doc_type ON results(doc_type);
+CREATE INDEX IF NOT EXISTS results_institution
+    ON results(institution COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS results_date ON results(date);
+CREATE INDEX IF NOT EXISTS results_original_name ON results(original_name);
+CREATE INDEX IF NOT EXISTS results_new_name ON results(new_name);
+"""
+
+# Columns of an exported or queried row: the CSV log's plus the run.
+QUERY_FIELDS = ["run_id", *_CSV_FIELDS]
+
+_INSERT = (
+    f"INSERT INTO results ({', '.join(QUERY_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(QUERY_FIELDS))})"
+)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """Open the run log at *path*, refusing any other database or file.
+
+    A log written by an older version is upgraded.
+    """
+    db = sqlite3.connect(path)
+    try:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        foreign = not 0 < version <= _SCHEMA_VERSION and (
+            version != 0
+            or db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0]
+        )
+    except sqlite3.DatabaseError:
+        foreign = True
+    if foreign:
+        db.close()
+        raise ValueError(f"{path} is not a supported pdf-organizer run log")
+    for old in range(version, _SCHEMA_VERSION) if version else ():
+        with db:
+            db.execute(_MIGRATIONS[old])
+            db.execute(f"PRAGMA user_version = {old + 1}")
+    return db
+
+
+class SqliteLog:
+    """Rename log that appends one run to a SQLite database.
+
+    Every log opened on the same *path* adds a run with its own
+    :attr:`run_id`. Rows are inserted in transactions of ten thousand, so a
+    run with millions of files is written as fast as SQLite allows; an
+    interrupted run keeps everything up to the last full batch. The
+    columns :func:`query_log` filters on are indexed.
+    """
+
+    def __init__(self, path: Path, folder: Path, command: str = "run") -> None:
+        self._db = _connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"PRAGMA cache_size=-{_CACHE_KIB}")
+        self._db.executescript(
+            _SCHEMA + f"PRAGMA user_version = {_SCHEMA_VERSION};"
+        )
+        with self._db:
+            self.run_id: int = self._db.execute(
+                "INSERT INTO runs (command, folder, started) VALUES (?, ?, ?)",
+                (command, str(Path(folder).resolve()), time.time()),
+            ).lastrowid
+        self._rows: list[tuple] = []
+
+    def __enter__(self) -> "SqliteLog":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def write(self, result: dict[str, Any]) -> None:
+        """Append one result row."""
+        self._rows.append(
+            (self.run_id, *(result.get(field, "") for field in _CSV_FIELDS))
+        )
+        if len(self._rows) >= _BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._db:
+            self._db.executemany(_INSERT, self._rows)
+        self._rows.clear()
+
+    def close(self) -> None:
+        """Write the remaining rows, mark the run finished and close."""
+        self._flush()
+        with self._db:
+            self._db.execute(
+                "UPDATE runs SET finished = ? WHERE id = ?",
+                (time.time(), self.run_id),
+            )
+        self._db.close()
+
+
+def _prefix_range(prefix: str) -> tuple[str, str]:
+    """Return bounds matching every string that starts with *prefix*."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def query_log(
+    path: Path,
+    doc_type: Optional[str] = None,
+    institution: Optional[str] = None,
+    date: Optional[str] = None,
+    name: Optional[str] = None,
+    run_id: Optional[int] = None,
+    status: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield the rows of the run log at *path* matching every filter given.
+
+    *institution* is matched regardless of case; *date* is a prefix such as
+    ``2023`` or ``2023-04``; *name* matches either the original or the new
+    name, so it finds what a file was called before and after each run.
+    Rows come in the order they were logged.
+    """
+    clauses, params = [], []
+    if doc_type is not None:
+        clauses.append("doc_type = ?")
+        params.append(doc_type)
+    if institution is not None:
+        clauses.append("institution = ? COLLATE NOCASE")
+        params.append(institution)
+    if date:
+        clauses.append("date >= ? AND date < ?")
+        params.extend(_prefix_range(date))
+    if name is not None:
+        # Two indexed lookups rather than one OR, which SQLite may scan.
+        clauses.append(
+            "rowid IN (SELECT rowid FROM results WHERE original_name = ? "
+            "UNION SELECT rowid FROM results WHERE new_name = ?)"
+        )
+        params.extend([name, name])
+    if run_id is not None:
+        clauses.append("run_id = ?")
+        params.append(run_id)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+
+    if not Path(path).exists():
+        raise ValueError(f"{path} does not exist")
+    db = _connect(path)
+    try:
+        cursor = db.execute(
+            f"SELECT {', '.join(QUERY_FIELDS)} FROM results "
+            f"{where}ORDER BY rowid",
+            params,
+        )
+        for row in cursor:
+            yield dict(zip(QUERY_FIELDS, row))
+    finally:
+        db.close()
+
+
+def export_csv(rows: Iterator[dict[str, Any]], output: Path) -> int:
+    """Write *rows* from :func:`query_log` to a CSV file; return how many."""
+    count = 0
+    with open(output, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=QUERY_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
@@ -0,0 +1,102 @@
+"""Lazy discovery of PDF files in a folder or a directory tree."""
+
+import fnmatch
+import logging
+import os
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(rel_path: str, name: str, patterns: Sequence[str]) -> bool:
+    """Return True if any glob in *patterns* matches the path or the name."""
+    return any(
+        fnmatch.fnmatchcase(rel_path, pattern) or fnmatch.fnmatchcase(name, pattern)
+        for pattern in patterns
+    )
+
+
+def _list_dir(path: Path) -> tuple[list[str], list[str]]:
+    """Return the sorted file names and subdirectory names in *path*.
+
+    Symlinked directories are listed as files would be, and so are never
+    descended into; that keeps the walk free of cycles.
+    """
+    files: list[str] = []
+    dirs: list[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append(entry.name)
+    except OSError as exc:
+        logger.warning("Cannot list %s: %s", path, exc)
+    files.sort()
+    dirs.sort()
+    return files, dirs
+
+
+def iter_pdfs(
+    folder: Path,
+    recursive: bool = False,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+) -> Iterator[Path]:
+    """Yield the PDF files under *folder*, sorted within each directory.
+
+    Files whose name ends in ``.pdf`` in any letter case are yielded. With
+    *recursive*, subdirectories are walked depth-first after the files of
+    their parent, so all files of one directory are yielded together.
+
+    *include* and *exclude* are glob patterns matched against both the file
+    name and its path relative to *folder* (with ``/`` separators). If
+    *include* is given, a file must match one of its patterns; a file or
+    directory matching an *exclude* pattern is skipped.
+
+    Only one directory listing per level of the tree is held at a time, so
+    memory does not grow with the number of files.
+    """
+    # Each stack entry is (directory, its path relative to folder, the
+    # subdirectory names still to visit).
+    stack: list[tuple[Path, str, Iterator[str]]] = []
+    current: tuple[Path, str] = (folder, "")
+    while True:
+        path, rel = current
+        files, dirs = _list_dir(path)
+        for name in files:
+            if not name.lower().endswith(".pdf"):
+                continue
+            rel_path = rel + name
+            if include and not _matches(rel_path, name, include):
+                continue
+            if exclude and _matches(rel_path, name, exclude):
+                continue
+            yield path / name
+
+        if recursive:
+            stack.append((path, rel, iter(dirs)))
+        while stack:
+            parent, parent_rel, remaining = stack[-1]
+            name = next(remaining, None)
+            if name is None:
+                stack.pop()
+                continue
+            if exclude and _matches(parent_rel + name, name, exclude):
+                continue
+            current = (parent / name, f"{parent_rel}{name}/")
+            break
+        else:
+            return
+
+
+def scan_order_key(rel_path: str) -> tuple[tuple[int, str], ...]:
+    """Sort key that orders relative paths the way :func:`iter_pdfs` yields them.
+
+    Within a directory, files come first, then each subdirectory in turn.
+    """
+    *dirs, name = rel_path.split("/")
+    return tuple((1, d) for d in dirs) + ((0, name),)
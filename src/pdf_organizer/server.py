@@ -0,0 +1,148 @@
+"""Long-running classification service on a Unix domain socket.
+
+``pdf-organizer serve`` keeps worker processes with everything imported
+and compiled, so a request costs only the extraction itself. The protocol
+is one JSON object per line in each direction: a request
+``{"op": "classify" | "rename", "path": "/abs/file.pdf"}`` is answered with
+the result a run would report for that file, plus its ``path``, or with
+``{"path": ..., "error": "message"}``.
+"""
+
+import contextlib
+import errno
+import functools
+import json
+import logging
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import Any, Optional
+
+from pdf_organizer.classifier import load_institutions
+from pdf_organizer.client import OPS
+from pdf_organizer.renamer import _analyze, _failed, _rename_stage
+from pdf_organizer.supervisor import SupervisedPool, WorkerFailed
+
+logger = logging.getLogger(__name__)
+
+
+def _claim_socket(path: Path) -> None:
+    """Remove a socket left at *path* by a server that is no longer running.
+
+    Raises FileExistsError if a server is still listening there.
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+    except FileNotFoundError:
+        return
+    except ConnectionRefusedError:
+        logger.info("Removing stale socket %s", path)
+        path.unlink()
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(errno.EADDRINUSE, "a server is already listening", str(path))
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                path = request["path"]
+            except (ValueError, TypeError, KeyError):
+                reply = {"error": "expected a JSON object with a 'path'"}
+            else:
+                reply = {"path": path, **self.server.answer(request)}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class ClassificationServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    """Answer classify and rename requests with a pool of warm workers.
+
+    Each connection is served by its own thread, one request at a time, so
+    up to *jobs* files from different clients are extracted in parallel.
+    Files are renamed in their own folder exactly as a run over that
+    folder would rename them. The socket is only accessible to the user
+    running the server.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        socket_path: Path,
+        jobs: int = 1,
+        max_pages: Optional[int] = None,
+        date_policy: str = "latest",
+        institutions_file: Optional[Path] = None,
+        engine: str = "layout",
+        text_only: bool = False,
+        file_timeout: Optional[float] = None,
+        max_rss: Optional[int] = None,
+    ) -> None:
+        # Load the matcher before the workers start, so they inherit it.
+        load_institutions(institutions_file)
+        analyze = functools.partial(
+            _analyze,
+            max_pages=max_pages,
+            date_policy=date_policy,
+            institutions_file=institutions_file,
+            engine=engine,
+            text_only=text_only,
+        )
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        _claim_socket(socket_path)
+        self.socket_path = socket_path
+        self._bound = False
+        super().__init__(str(socket_path), _Handler)
+        self._pool = SupervisedPool(
+            analyze, jobs, timeout=file_timeout, max_rss=max_rss
+        )
+
+    def server_bind(self) -> None:
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+            self._bound = True
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if hasattr(self, "_pool"):
+            self._pool.shutdown()
+        if self._bound:
+            with contextlib.suppress(FileNotFoundError):
+                self.socket_path.unlink()
+
+    def answer(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handle one request and return its result."""
+        op = request.get("op", "classify")
+        if op not in OPS:
+            return {"error": f"unknown op {op!r}"}
+        pdf_path = Path(request["path"])
+        if not pdf_path.is_absolute():
+            return {"error": "path must be absolute"}
+        if not pdf_path.is_file():
+            return {"error": "no such file"}
+
+        try:
+            info = self._pool.submit(pdf_path).result()[0]
+        except WorkerFailed as exc:
+            logger.error("Failed to analyze %s: %s", pdf_path, exc)
+            info = _failed(exc.status)
+        except Exception as exc:
+            logger.error("Failed to analyze %s: %s", pdf_path, exc)
+            info = _failed("error")
+        analyzed = [(pdf_path, info)]
+        return next(
+            _rename_stage(
+                analyzed, pdf_path.parent, dry_run=op != "rename", profiler=None
+            )
+        )
@@ -0,0 +1,93 @@
+"""Splitting one folder between several instances, and merging their logs."""
+
+import csv
+import hashlib
+import heapq
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+from pdf_organizer.scanner import scan_order_key
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse ``"I/N"`` into ``(I, N)``; shards are numbered from 1."""
+    index, sep, count = spec.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not sep or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"{spec!r} is not a shard like 1/4")
+    return shard
+
+
+def shard_key(path: Path, folder: Path) -> str:
+    """Return the key that decides which shard the file *path* belongs to.
+
+    The key is the file's inode number, which every host sees the same on
+    a shared mount and which a rename keeps, so a file stays in its shard
+    when another host renames it. Where there is none (the file is gone,
+    or the filesystem reports 0), the path relative to *folder* is used.
+    """
+    try:
+        inode = path.stat().st_ino
+    except OSError:
+        inode = 0
+    if inode:
+        return f"inode:{inode}"
+    return path.relative_to(folder).as_posix()
+
+
+def shard_of(key: str, count: int) -> int:
+    """Return the shard, from 1 to *count*, that the file *key* belongs to.
+
+    *key* comes from :func:`shard_key`. The shard depends only on it, so
+    every host agrees on it without talking to the others.
+    """
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def shard_path(path: Path, shard: tuple[int, int]) -> Path:
+    """Return *path* with the shard worked into its name.
+
+    ``rename_log.csv`` becomes ``rename_log.shard-2-of-4.csv``.
+    """
+    index, count = shard
+    return path.with_name(f"{path.stem}.shard-{index}-of-{count}{path.suffix}")
+
+
+def _read_log(path: Path) -> tuple[list[str], Iterator[dict[str, Any]]]:
+    fh = open(path, newline="", encoding="utf-8")
+    reader = csv.DictReader(fh)
+    fields = list(reader.fieldnames or [])
+
+    def rows() -> Iterator[dict[str, Any]]:
+        with fh:
+            yield from reader
+
+    return fields, rows()
+
+
+def merge_logs(paths: Sequence[Path], output: Path) -> int:
+    """Merge the CSV logs at *paths* into one log at *output*.
+
+    Each shard's log lists its files in scan order, so the logs are merged
+    as they are read, into the order a single run over the whole folder
+    would have logged them. The columns are those of the first log. Returns
+    the number of rows written.
+    """
+    logs = [_read_log(path) for path in paths]
+    rows = heapq.merge(
+        *(rows for _, rows in logs),
+        key=lambda row: scan_order_key(row["original_name"]),
+    )
+    count = 0
+    with open(output, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=logs[0][0], extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
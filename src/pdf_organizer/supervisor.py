@@ -0,0 +1,297 @@
+"""Process pool that kills and replaces workers exceeding per-task limits."""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from multiprocessing.connection import Connection, wait
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often the memory of busy workers is sampled, in seconds.
+_RSS_POLL_INTERVAL = 0.1
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class WorkerFailed(Exception):
+    """A task did not finish because its worker process was lost.
+
+    ``status`` is the result status to report for the task.
+    """
+
+    status = "error"
+
+
+class WorkerTimeout(WorkerFailed):
+    """The task ran longer than the per-task timeout."""
+
+    status = "timeout"
+
+
+class WorkerOutOfMemory(WorkerFailed):
+    """The worker's resident memory exceeded the limit."""
+
+    status = "oom"
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Return the resident set size of process *pid*, if it can be read."""
+    try:
+        with open(f"/proc/{pid}/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def reset_peak_rss() -> None:
+    """Reset this process's peak resident set size, where Linux allows it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss() -> Optional[int]:
+    """Return this process's peak resident set size in bytes, if known.
+
+    The peak covers the time since :func:`reset_peak_rss`, or since the
+    process started where the peak cannot be reset.
+    """
+    try:
+        with open("/proc/self/status", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return None
+
+
+def _worker_main(conn: Connection, func: Callable[[Any], Any]) -> None:
+    """Run *func* on every argument received over *conn* until told to stop."""
+    while True:
+        try:
+            arg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if arg is None:
+            return
+        try:
+            reply = (True, func(arg))
+        except MemoryError:
+            reply = (False, WorkerOutOfMemory("MemoryError"))
+        except Exception as exc:
+            reply = (False, exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:  # e.g. an unpicklable exception
+            conn.send((False, RuntimeError(repr(exc))))
+
+
+class _Worker:
+    def __init__(self, ctx: Any, func: Callable[[Any], Any]) -> None:
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, func))
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.future: Optional[Future] = None
+        self.deadline = float("inf")
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+class SupervisedPool:
+    """Run *func* in *workers* processes, enforcing limits on every task.
+
+    A task running longer than *timeout* seconds, or whose worker's resident
+    memory grows beyond *max_rss* bytes, fails with :class:`WorkerTimeout`
+    or :class:`WorkerOutOfMemory`; a worker that dies fails its task with
+    :class:`WorkerFailed`. In each case the worker is killed and replaced
+    at once, so the other workers and the remaining tasks are unaffected.
+
+    :meth:`submit` returns a :class:`concurrent.futures.Future`, as with an
+    executor. A background thread dispatches tasks and watches the workers.
+    Memory is sampled every 100 ms from ``/proc``; where that is not
+    available only the timeout is enforced.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[Any], Any],
+        workers: int,
+        timeout: Optional[float] = None,
+        max_rss: Optional[int] = None,
+    ) -> None:
+        self._func = func
+        self._timeout = timeout
+        self._max_rss = max_rss
+        self._ctx = multiprocessing.get_context()
+        self._workers = [_Worker(self._ctx, func) for _ in range(workers)]
+        self._tasks: deque[tuple[Future, Any]] = deque()
+        self._lock = threading.Lock()
+        self._closing = False
+        self._wake_r, self._wake_w = self._ctx.Pipe(duplex=False)
+        self._thread = threading.Thread(
+            target=self._supervise, name="pdf-organizer-supervisor", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> "SupervisedPool":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+
+    def submit(self, arg: Any) -> Future:
+        """Queue ``func(arg)`` and return a future for its result."""
+        future: Future = Future()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("pool is shut down")
+            self._tasks.append((future, arg))
+        self._wake()
+        return future
+
+    def shutdown(self) -> None:
+        """Cancel queued tasks, kill busy workers and stop the rest."""
+        with self._lock:
+            if self._closing:
+                return
+            self._closing = True
+        self._wake()
+        self._thread.join()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send_bytes(b"")
+        except OSError:
+            pass
+
+    def _replace(self, worker: _Worker, error: WorkerFailed) -> None:
+        worker.kill()
+        if worker.future is not None:
+            worker.future.set_exception(error)
+        self._workers[self._workers.index(worker)] = _Worker(self._ctx, self._func)
+
+    def _dispatch(self) -> None:
+        for worker in self._workers:
+            if worker.future is not None:
+                continue
+            while True:
+                with self._lock:
+                    if not self._tasks:
+                        return
+                    future, arg = self._tasks.popleft()
+                if future.set_running_or_notify_cancel():
+                    break
+            try:
+                worker.conn.send(arg)
+            except OSError as exc:
+                worker.future = future
+                self._replace(worker, WorkerFailed(f"cannot reach worker: {exc}"))
+                continue
+            worker.future = future
+            worker.deadline = (
+                time.monotonic() + self._timeout if self._timeout else float("inf")
+            )
+
+    def _collect(self, worker: _Worker) -> None:
+        try:
+            ok, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            code = worker.process.exitcode
+            self._replace(worker, WorkerFailed(f"worker exited (code {code})"))
+            return
+        future, worker.future = worker.future, None
+        worker.deadline = float("inf")
+        if isinstance(payload, WorkerOutOfMemory):
+            # The worker survived the MemoryError, but its heap is suspect.
+            worker.future = future
+            self._replace(worker, payload)
+        elif ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+
+    def _enforce_limits(self) -> None:
+        now = time.monotonic()
+        for worker in list(self._workers):
+            if worker.future is None:
+                continue
+            if now >= worker.deadline:
+                logger.debug("Killing worker %d: timeout", worker.process.pid)
+                self._replace(
+                    worker, WorkerTimeout(f"no result after {self._timeout}s")
+                )
+            elif self._max_rss is not None:
+                rss = _rss_bytes(worker.process.pid)
+                if rss is not None and rss > self._max_rss:
+                    logger.debug(
+                        "Killing worker %d: %d bytes", worker.process.pid, rss
+                    )
+                    self._replace(
+                        worker, WorkerOutOfMemory(f"resident memory {rss} bytes")
+                    )
+
+    def _supervise(self) -> None:
+        try:
+            while not self._closing:
+                self._dispatch()
+                busy = [w for w in self._workers if w.future is not None]
+                # Wake up for the next deadline or memory sample, if any.
+                waits = []
+                if busy and self._timeout:
+                    next_deadline = min(w.deadline for w in busy)
+                    waits.append(max(next_deadline - time.monotonic(), 0.0))
+                if busy and self._max_rss is not None:
+                    waits.append(_RSS_POLL_INTERVAL)
+
+                ready = wait(
+                    [self._wake_r] + [w.conn for w in busy],
+                    min(waits) if waits else None,
+                )
+                if self._wake_r in ready:
+                    while self._wake_r.poll():
+                        self._wake_r.recv_bytes()
+                for worker in busy:
+                    if worker.conn in ready:
+                        self._collect(worker)
+                self._enforce_limits()
+        except BaseException as exc:
+            logger.error("Worker supervisor failed: %s", exc)
+            raise
+        finally:
+            # Never leave a caller waiting on a future that cannot finish.
+            self._closing = True
+            with self._lock:
+                pending, self._tasks = list(self._tasks), deque()
+            for future, _ in pending:
+                future.cancel()
+            for worker in self._workers:
+                if worker.future is None:
+                    worker.stop()
+                    continue
+                worker.kill()
+                if not worker.future.done():
+                    worker.future.set_exception(WorkerFailed("pool shut down"))
@@ -0,0 +1,229 @@
+"""Notification of PDF files arriving in a folder, for watch mode."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from pdf_organizer.scanner import _matches
+
+logger = logging.getLogger(__name__)
+
+# A file is handed out once it has seen no event and kept the same size and
+# mtime for this many seconds, so files still being copied are left alone.
+SETTLE_SECONDS = 0.5
+
+# How often the polling backend checks the folder, in seconds.
+_POLL_INTERVAL = 0.25
+
+# Names a rename of ours produced are ignored for this long, in seconds, if
+# their event never arrives.
+_IGNORE_TTL = 30.0
+
+# inotify(7) event masks.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Names of files created, written or moved into a folder, via inotify."""
+
+    def __init__(self, folder: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), _WATCH_MASK) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"cannot watch {folder}")
+
+    def read(self, timeout: float) -> Optional[set[str]]:
+        """Wait up to *timeout* seconds; return the names seen.
+
+        Returns None if the kernel dropped events, so the caller should
+        look at the folder itself.
+        """
+        if not select.select([self.fd], [], [], max(timeout, 0.0))[0]:
+            return set()
+        names: set[str] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = data[pos:pos + length].rstrip(b"\0")
+                pos += length
+                if mask & _IN_Q_OVERFLOW:
+                    overflow = True
+                elif name:
+                    names.add(os.fsdecode(name))
+        return None if overflow else names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Poller:
+    """Names of files appearing in a folder, found by listing it on change.
+
+    The folder is only listed again when its mtime changes, which is what
+    creating, removing or renaming an entry does.
+    """
+
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+        self._mtime = os.stat(folder).st_mtime_ns
+        self._names = set(os.listdir(folder))
+
+    def read(self, timeout: float) -> Optional[set[str]]:
+        time.sleep(max(min(timeout, _POLL_INTERVAL), 0.0))
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            return set()
+        if mtime == self._mtime:
+            return set()
+        self._mtime = mtime
+        names = set(os.listdir(self.folder))
+        new, self._names = names - self._names, names
+        return new
+
+    def close(self) -> None:
+        pass
+
+
+def _signature(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class FolderWatcher:
+    """Report PDF files that arrive in *folder* once they are complete.
+
+    Uses inotify on Linux and falls back to polling elsewhere, or when
+    *use_inotify* is False. Only the folder itself is watched, not its
+    subfolders. Files that exist when the watcher starts are not reported.
+
+    An arriving file is held back until it has been quiet for *settle*
+    seconds: no events and an unchanged size and mtime. *include* and
+    *exclude* filter names as in :func:`~pdf_organizer.scanner.iter_pdfs`.
+    Names passed to :meth:`ignore` -- the results of our own renames -- are
+    not reported when they show up.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        settle: float = SETTLE_SECONDS,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        use_inotify: bool = True,
+    ) -> None:
+        self.folder = Path(folder)
+        self.settle = settle
+        self.include = include
+        self.exclude = exclude
+        self._source = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._source = _Inotify(self.folder)
+            except (OSError, AttributeError) as exc:
+                logger.warning("inotify unavailable, polling instead: %s", exc)
+        if self._source is None:
+            self._source = _Poller(self.folder)
+        self.backend = "inotify" if isinstance(self._source, _Inotify) else "polling"
+        # name -> (time of the last event or change, signature at that time)
+        self._pending: dict[str, tuple[float, Optional[tuple[int, int]]]] = {}
+        self._ignored: dict[str, float] = {}
+
+    def __enter__(self) -> "FolderWatcher":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._source.close()
+
+    def ignore(self, name: str) -> None:
+        """Do not report the next arrival of *name*."""
+        self._ignored[name] = time.monotonic() + _IGNORE_TTL
+
+    def _wanted(self, name: str) -> bool:
+        if not name.lower().endswith(".pdf"):
+            return False
+        if self.include and not _matches(name, name, self.include):
+            return False
+        return not (self.exclude and _matches(name, name, self.exclude))
+
+    def _note(self, names: set[str], now: float) -> None:
+        for name in names:
+            if name in self._ignored:
+                del self._ignored[name]
+                continue
+            if self._wanted(name):
+                self._pending[name] = (now, _signature(self.folder / name))
+
+    def _settled(self, now: float) -> list[Path]:
+        ready = []
+        for name, (since, signature) in list(self._pending.items()):
+            if now - since < self.settle:
+                continue
+            path = self.folder / name
+            current = _signature(path)
+            if current is None:
+                del self._pending[name]  # gone again, e.g. a temporary file
+            elif current != signature:
+                self._pending[name] = (now, current)  # still being written
+            elif path.is_file():
+                del self._pending[name]
+                ready.append(path)
+            else:
+                del self._pending[name]
+        return sorted(ready)
+
+    def wait(self, timeout: float) -> list[Path]:
+        """Return the files that settled within *timeout* seconds, sorted.
+
+        Returns as soon as at least one file is ready, or an empty list
+        once *timeout* has passed.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            if self._pending:
+                next_due = min(since for since, _ in self._pending.values())
+                wait_for = min(next_due + self.settle - now, deadline - now)
+            else:
+                wait_for = deadline - now
+            names = self._source.read(wait_for)
+            now = time.monotonic()
+            if names is None:
+                logger.warning("Missed events in %s; listing it", self.folder)
+                names = set(os.listdir(self.folder))
+            self._note(names, now)
+            self._ignored = {n: t for n, t in self._ignored.items() if t > now}
+            ready = self._settled(now)
+            if ready or now >= deadline:
+                return ready
@@ -1,8 +1,16 @@
 """Shared fixtures for pdf-organizer tests."""
 
+import zlib
+
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the extraction cache out of the real home directory."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("xdg-cache")))
+
+
 @pytest.fixture()
 def tax_text():
     return (
@@ -54,3 +62,136 @@ def invoice_text():
 @pytest.fixture()
 def unknown_text():
     return "Some random text with no identifiable patterns."
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(path, pages, info=None, xmp=None):
+    """Write a PDF with one Helvetica text page per entry in *pages*.
+
+    *info* is a dict of document information entries, such as
+    ``{"Title": "..."}``; *xmp* the XML of an XMP metadata packet.
+    """
+    catalog = b"<</Type/Catalog/Pages 2 0 R%s>>" % (
+        b"/Metadata 4 0 R" if xmp else b""
+    )
+    objects = [
+        catalog,
+        None,  # page tree, filled in below
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+    ]
+    if xmp:
+        data = xmp.encode("utf-8")
+        objects.append(_stream(data, b"/Type/Metadata/Subtype/XML"))
+    kids = []
+    for page_text in pages:
+        ops = ["BT /F1 11 Tf 72 740 Td 14 TL"]
+        for line in page_text.splitlines():
+            ops.append(f"({_pdf_string(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(
+            b"<</Length %d>>stream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_num = len(objects)
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>" % content_num
+        )
+        kids.append(len(objects))
+    objects[1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+    if info:
+        objects.append(b"<<%s>>" % b"".join(
+            b"/%s(%s)" % (key.encode(), _pdf_string(value).encode("latin-1"))
+            for key, value in info.items()
+        ))
+        return write_objects(path, objects, info=len(objects))
+    return write_objects(path, objects)
+
+
+def write_objects(path, objects, info=None):
+    """Write a PDF of *objects*, numbered from 1; object 1 is the catalog.
+
+    *info* is the number of the document information dictionary, if any.
+    """
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % num + body + b"\nendobj\n"
+    xref_pos = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer<</Size %d/Root 1 0 R%s>>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        b"/Info %d 0 R" % info if info else b"",
+        xref_pos,
+    )
+    path.write_bytes(bytes(out))
+    return path
+
+
+def _stream(data, extra=b""):
+    return b"<<%s/Length %d>>stream\n" % (extra, len(data)) + data + b"\nendstream"
+
+
+def write_scan_pdf(path, pages=1, font=False):
+    """Write a PDF of *pages* pages that each only draw a (tiny) image.
+
+    With *font*, the pages also list a font they never use, as some
+    scanners' output does.
+    """
+    pixels = zlib.compress(bytes(range(256)) * 16)
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        None,  # page tree, filled in below
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+        _stream(
+            pixels,
+            b"/Type/XObject/Subtype/Image/Width 64/Height 64"
+            b"/ColorSpace/DeviceGray/BitsPerComponent 8/Filter/FlateDecode",
+        ),
+        _stream(b"q 612 0 0 792 0 0 cm /Im1 Do Q"),
+    ]
+    fonts = b"/Font<</F1 3 0 R>>" if font else b""
+    kids = []
+    for _ in range(pages):
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<<%s/XObject<</Im1 4 0 R>>>>/Contents 5 0 R>>" % fonts
+        )
+        kids.append(len(objects))
+    objects[1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (
+        b" ".join(b"%d 0 R" % k for k in kids),
+        len(kids),
+    )
+    return write_objects(path, objects)
+
+
+@pytest.fixture()
+def make_objects_pdf():
+    """Factory fixture: ``make_objects_pdf(path, objects)``, see write_objects."""
+    return write_objects
+
+
+@pytest.fixture()
+def make_scan_pdf():
+    """Factory fixture: ``make_scan_pdf(path, pages=1, font=False)``."""
+    return write_scan_pdf
+
+
+@pytest.fixture()
+def make_pdf():
+    """Factory fixture: ``make_pdf(path, "page 1 text", "page 2 text", ...)``.
+
+    Takes the *info* and *xmp* metadata of :func:`write_text_pdf` too.
+    """
+    def _make(path, *pages, info=None, xmp=None):
+        return write_text_pdf(path, pages or ("",), info, xmp)
+    return _make
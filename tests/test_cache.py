@@ -0,0 +1,115 @@
+"""Tests for the extraction cache."""
+
+import os
+import shutil
+
+from pdf_organizer import classifier
+from pdf_organizer.cache import ExtractionCache
+
+INFO = {"doc_type": "Receipt", "institution": "Amazon", "date": "2024-06-01"}
+
+
+class TestExtractionCache:
+    def test_miss_then_hit(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            key = cache.key(pdf)
+            assert cache.get(key) is None
+            cache.put(key, "Amazon receipt 06/01/2024", INFO)
+            assert cache.get(cache.key(pdf)) == INFO
+            assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_persists_across_instances(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "text", INFO)
+        with ExtractionCache(tmp_path / "cache") as cache:
+            key = cache.key(pdf)
+            assert cache.get(key) == INFO
+            assert cache.get_text(key) == "text"
+
+    def test_content_hash_fallback_for_copies(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        copy = tmp_path / "copy.pdf"
+        shutil.copy(pdf, copy)
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "text", INFO)
+            assert cache.get(cache.key(copy)) == INFO
+
+    def test_modified_file_misses(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "text", INFO)
+            make_pdf(pdf, "Something else entirely")
+            st = pdf.stat()
+            os.utime(pdf, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+            assert cache.get(cache.key(pdf)) is None
+
+    def test_rule_change_reclassifies_cached_text(
+        self, tmp_path, make_pdf, monkeypatch
+    ):
+        pdf = make_pdf(tmp_path / "a.pdf", "x")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "Gadget order 06/01/2024", INFO)
+        monkeypatch.setattr(
+            classifier, "DOC_TYPE_RULES", [("Order", [r"\border\b"])]
+        )
+        with ExtractionCache(tmp_path / "cache") as cache:
+            info = cache.get(cache.key(pdf))
+        assert info["doc_type"] == "Order"
+        assert info["date"] == "2024-06-01"
+
+    def test_status_is_kept(self, tmp_path, make_pdf, monkeypatch):
+        pdf = make_pdf(tmp_path / "a.pdf", "x")
+        info = {"doc_type": "Unknown", "institution": "", "date": "",
+                "status": "needs_ocr"}
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "", info)
+            assert cache.get(cache.key(pdf)) == info
+        monkeypatch.setattr(
+            classifier, "DOC_TYPE_RULES", [("Order", [r"\border\b"])]
+        )
+        with ExtractionCache(tmp_path / "cache") as cache:
+            assert cache.get(cache.key(pdf))["status"] == "needs_ocr"
+
+    def test_other_engine_misses(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        with ExtractionCache(tmp_path / "cache", engine="fast") as cache:
+            cache.put(cache.key(pdf), "text", INFO)
+        with ExtractionCache(tmp_path / "cache", engine="layout") as cache:
+            key = cache.key(pdf)
+            assert cache.get(key) is None
+            cache.put(key, "layout text", INFO)
+            assert cache.get(key) == INFO
+
+    def test_lru_eviction(self, tmp_path, make_pdf):
+        pdfs = [make_pdf(tmp_path / f"{i}.pdf", f"doc {i}") for i in range(3)]
+        payload = os.urandom(3000).hex()  # incompressible
+        with ExtractionCache(tmp_path / "cache", max_bytes=8000) as cache:
+            keys = [cache.key(p) for p in pdfs]
+            cache.put(keys[0], payload, INFO)
+            cache.put(keys[1], payload[::-1], INFO)
+            cache.get(keys[0])  # keys[1] is now least recently used
+            cache.put(keys[2], payload[1:], INFO)
+            assert cache.get(keys[0]) == INFO
+            assert cache.get(keys[1]) is None
+            assert cache.get(keys[2]) == INFO
+
+    def test_file_name_sources_bind_the_name(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "x")
+        named = {**INFO, "source": "doc_type:filename institution:text date:text"}
+        read = {**INFO, "source": "doc_type:metadata institution:text date:text"}
+        with ExtractionCache(tmp_path / "cache") as cache:
+            key = cache.key(pdf)
+            cache.put(key, "", named, complete=False, name="Receipt.pdf")
+            assert cache.get(key, "Receipt.pdf") == named
+            assert cache.get(key, "a.pdf") is None
+            cache.put(key, "", read, complete=False, name="Receipt.pdf")
+            assert cache.get(key, "a.pdf") == read
+
+    def test_text_only_misses(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "Amazon receipt")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            cache.put(cache.key(pdf), "text", INFO, complete=False)
+        with ExtractionCache(tmp_path / "cache", text_only=True) as cache:
+            assert cache.get(cache.key(pdf)) is None
@@ -1,6 +1,28 @@
 """Tests for the classifier module."""
 
-from pdf_organizer.classifier import classify
+import random
+import re
+
+import pytest
+
+from pdf_organizer.classifier import (
+    DOC_TYPE_RULES,
+    IncrementalClassifier,
+    classify,
+    classify_many,
+    compile_rules,
+    format_sources,
+)
+
+
+def _sequential_doc_type(text, rules):
+    """Reference implementation: try each pattern of the ordered table."""
+    text_lower = text.lower()
+    for doc_type, patterns in rules:
+        for pattern in patterns:
+            if re.search(pattern, text_lower):
+                return doc_type
+    return "Unknown"
 
 
 class TestDocTypeDetection:
@@ -40,6 +62,75 @@ class TestDocTypeDetection:
         assert result["doc_type"] == "Unknown"
 
 
+class TestCompiledRules:
+    def test_priority_beats_position(self):
+        # Receipt appears first in the text, but Invoice has higher priority.
+        text = "Receipt for your order. Invoice attached."
+        assert classify(text)["doc_type"] == "Invoice"
+
+    def test_overlapping_matches(self):
+        rules = compile_rules([("A", [r"ab\w+c"]), ("B", [r"xab"])])
+        assert rules.match("xabzzc") == "A"
+
+    def test_leading_boundary_respected(self):
+        assert classify("unpaid overstatement")["doc_type"] == "Unknown"
+        assert classify("(paid)")["doc_type"] == "Receipt"
+
+    def test_name_rank(self):
+        rules = compile_rules(DOC_TYPE_RULES)
+        assert rules.doc_types[rules.name_rank("Insurance Aetna 2024")] == "Insurance"
+        assert rules.doc_types[rules.name_rank("x Bank_Statement")] == "Bank_Statement"
+        assert rules.name_rank("Reinsurance") == -1
+
+    def test_split_name(self):
+        rules = compile_rules(DOC_TYPE_RULES)
+        assert rules.split_name("Invoice_Aetna_2024-03-15_2") == (
+            "Invoice", "Aetna", "2024-03-15"
+        )
+        assert rules.split_name("Bank Statement - Chase - January 31, 2024") == (
+            "Bank Statement", "Chase", "January 31, 2024"
+        )
+        assert rules.split_name("Tax_Return_2024-04-15") == (
+            "Tax_Return", "", "2024-04-15"
+        )
+        assert rules.split_name("Unknown_Chase") == ("", "Chase", "")
+        assert rules.split_name("target 2019-05-01 download") is None
+
+    def test_custom_rules(self):
+        rules = compile_rules([("Payslip", [r"\bnet\s+pay\b"]), ("Memo", [r"memo"])])
+        assert classify("MEMO: net pay 2024-01-31", rules=rules) == {
+            "doc_type": "Payslip",
+            "institution": "",
+            "date": "2024-01-31",
+        }
+        assert rules.match("nothing here") == "Unknown"
+
+    def test_uncombinable_patterns_fall_back(self):
+        rules = compile_rules([("A", [r"(?P<x>foo)"]), ("B", [r"(?P<x>bar)"])])
+        assert rules.match("bar foo") == "A"
+        assert rules.match("bar") == "B"
+
+    def test_replaced_rule_table_is_recompiled(self, monkeypatch):
+        from pdf_organizer import classifier
+
+        monkeypatch.setattr(classifier, "DOC_TYPE_RULES", [("Memo", [r"memo"])])
+        assert classify("memo re: invoice")["doc_type"] == "Memo"
+
+    def test_matches_sequential_search(self):
+        rng = random.Random(4)
+        vocab = [
+            "statement", "paid", "invoice", "tax", "return", "bill", "to",
+            "health", "policy", "hereby", "unpaid", "1040", "w-2", "irs", "the",
+            "premium", "agreement", "receipt", "thank", "you", "for", "your",
+            "purchase", "adjusted", "gross", "amount", "due", "\n", "x",
+        ]
+        for _ in range(300):
+            text = " ".join(rng.choice(vocab) for _ in range(rng.randint(0, 12)))
+            assert classify(text)["doc_type"] == _sequential_doc_type(
+                text, DOC_TYPE_RULES
+            ), text
+
+
 class TestInstitutionDetection:
     def test_known_institution_chase(self, bank_text):
         result = classify(bank_text)
@@ -59,6 +150,22 @@ class TestInstitutionDetection:
         result = classify(invoice_text)
         assert result["institution"] == "Acme Corporation"
 
+    def test_known_name_inside_word_ignored(self):
+        result = classify("Thank you for your purchase at the Store\nreceipt")
+        assert result["institution"] == ""
+
+    def test_custom_institutions(self, tmp_path):
+        from pdf_organizer.classifier import load_institutions
+
+        path = tmp_path / "payees.txt"
+        path.write_text("Acme Widgets\n", encoding="utf-8")
+        matcher = load_institutions(path, tmp_path)
+        text = "ACME WIDGETS LLC\nChase card payment"
+        assert classify(text, institutions=matcher)["institution"] == "Chase"
+        assert classify("acme widgets", institutions=matcher)["institution"] == (
+            "Acme Widgets"
+        )
+
     def test_no_institution(self, unknown_text):
         result = classify(unknown_text)
         assert result["institution"] == ""
@@ -87,3 +194,271 @@ class TestDateExtraction:
         text = "Date: 01/01/2020\nUpdated: 06/15/2023\nFiled: 12/31/2022"
         result = classify(text)
         assert result["date"] == "2023-06-15"
+
+
+class TestDatePolicy:
+    def test_first(self):
+        text = "Date: 06/15/2023\nUpdated: 01/01/2020\nFiled: 12/31/2024"
+        assert classify(text, date_policy="first")["date"] == "2023-06-15"
+
+    def test_first_across_formats(self):
+        text = "Period: March 3, 2024 - 2024-04-01\nPrinted 01/02/2020"
+        assert classify(text, date_policy="first")["date"] == "2024-03-03"
+
+    def test_period_end(self, bank_text):
+        text = "Printed 03/02/2024\n" + bank_text
+        assert classify(text, date_policy="period_end")["date"] == "2024-01-31"
+
+    def test_period_end_separators(self):
+        for sep in (" to ", " through ", "\u2013", " thru\n"):
+            text = f"Coverage 01/01/2023{sep}12/31/2023. Issued 2024-01-05"
+            assert classify(text, date_policy="period_end")["date"] == "2023-12-31"
+
+    def test_period_end_falls_back_to_latest(self, tax_text):
+        assert classify(tax_text, date_policy="period_end")["date"] == "2024-04-15"
+
+
+class TestDateValidation:
+    def test_invalid_dates_skipped(self):
+        text = "02/30/2024 13/01/2024 2023-02-29 00/10/2024 0000-01-01 04/31/2024"
+        assert classify(text)["date"] == ""
+
+    def test_leap_day(self):
+        assert classify("Due 02/29/2024")["date"] == "2024-02-29"
+        assert classify("Due 1900-02-29, 2000-02-29")["date"] == "2000-02-29"
+
+    def test_month_name_case(self):
+        assert classify("DECEMBER 5 2023")["date"] == "2023-12-05"
+
+    def test_matches_datetime_reference(self):
+        from datetime import datetime
+
+        rng = random.Random(6)
+        months = ["January", "June", "february", "SEPTEMBER"]
+        for _ in range(200):
+            dates, parts = [], []
+            for _ in range(rng.randint(0, 6)):
+                y = rng.randint(1000, 2099)
+                m, d = rng.randint(0, 13), rng.randint(0, 32)
+                fmt = rng.randrange(3)
+                if fmt == 0:
+                    parts.append(f"{m}/{d}/{y:04d}")
+                elif fmt == 1 and 1 <= m <= 4:
+                    parts.append(f"{months[m - 1]} {d}, {y:04d}")
+                    m = [1, 6, 2, 9][m - 1]
+                else:
+                    parts.append(f"{y:04d}-{m:02d}-{d:02d}")
+                try:
+                    dates.append(datetime(y, m, d))
+                except ValueError:
+                    pass
+            expected = max(dates).strftime("%Y-%m-%d") if dates else ""
+            assert classify(" ; ".join(parts))["date"] == expected, parts
+
+
+class TestIncrementalClassifier:
+    def test_matches_classify_when_all_pages_fed(self, bank_text, invoice_text):
+        pages = [bank_text, "Transaction list\n02/14/2024", invoice_text]
+        clf = IncrementalClassifier()
+        for page in pages:
+            clf.feed(page)
+        assert clf.result() == classify("\n".join(pages))
+        assert clf.pages == 3
+
+    def test_latest_policy_never_settles(self, tax_text):
+        clf = IncrementalClassifier()
+        assert not clf.feed(tax_text + "x" * 600)
+
+    def test_first_policy_settles(self, tax_text):
+        clf = IncrementalClassifier(date_policy="first")
+        assert not clf.feed("")  # blank cover page
+        assert clf.feed(tax_text + "x" * 500)
+        assert clf.result() == {
+            "doc_type": "Tax_Return",
+            "institution": "Internal Revenue Service",
+            "date": "2024-04-15",
+        }
+        assert clf.pages == 2
+
+    def test_lower_priority_type_does_not_settle(self):
+        clf = IncrementalClassifier(date_policy="first")
+        first = "Chase balance 01/05/2024\n" + "word " * 400
+        second = "Form 1040 adjusted gross"
+        # Only the top-priority type is final; a later page may outrank it.
+        assert not clf.feed(first)
+        assert clf.feed(second)
+        assert clf.result() == classify(first + "\n" + second, "first")
+        assert clf.result()["doc_type"] == "Tax_Return"
+
+    def test_waits_for_full_header(self, tax_text):
+        clf = IncrementalClassifier(date_policy="first")
+        assert not clf.feed("Chase\n" + tax_text)
+        assert clf.feed("Wells Fargo " + "x" * 500)
+        # Header spans both pages; list order decides between known names.
+        assert clf.result()["institution"] == "Chase"
+
+    def test_higher_priority_type_on_later_page(self, bank_text, tax_text):
+        clf = IncrementalClassifier()
+        clf.feed(bank_text)
+        clf.feed(tax_text)
+        assert clf.result()["doc_type"] == "Tax_Return"
+
+    def test_period_end_policy_settles(self, bank_text):
+        clf = IncrementalClassifier(date_policy="period_end")
+        assert not clf.feed("Chase\nForm 1040\nPrinted 03/02/2024\n" + "x" * 500)
+        assert clf.feed(bank_text)
+        assert clf.result()["date"] == "2024-01-31"
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            IncrementalClassifier(date_policy="median")
+
+
+class TestHints:
+    def test_full_name_settles_fields(self):
+        clf = IncrementalClassifier()
+        assert clf.hint("metadata", "Bank_Statement_Chase_2024-01-31_2")
+        assert clf.result() == {
+            "doc_type": "Bank_Statement",
+            "institution": "Chase",
+            "date": "2024-01-31",
+        }
+        assert clf.sources() == dict.fromkeys(
+            ("doc_type", "institution", "date"), "metadata"
+        )
+
+    def test_unknown_institution_is_not_a_full_name(self):
+        clf = IncrementalClassifier(date_policy="first")
+        assert not clf.hint("filename", "Invoice Acme Corp 2024-01-31")
+        clf.feed("Acme Corp\nDate: 02/01/2024")
+        assert clf.result()["date"] == "2024-02-01"
+        assert clf.sources() == {"doc_type": "filename"}
+
+    def test_exact_name_settles_institution(self):
+        clf = IncrementalClassifier(date_policy="first")
+        clf.hint("metadata", "Chase Bank Statement, January 31, 2024")
+        clf.hint("metadata", "chase")  # an Author field
+        assert clf.feed("Bank of America\nStatement period 02/29/2024")
+        assert clf.result() == {
+            "doc_type": "Bank_Statement",
+            "institution": "Chase",
+            "date": "2024-02-29",
+        }
+        assert clf.sources() == {"doc_type": "metadata", "institution": "metadata"}
+
+    def test_first_hint_wins(self):
+        clf = IncrementalClassifier()
+        assert not clf.hint("metadata", "Aetna invoice")
+        assert not clf.hint("filename", "amazon receipt 2024-02-01")
+        assert clf.result() == {
+            "doc_type": "Invoice", "institution": "Aetna", "date": "2024-02-01",
+        }
+        assert clf.sources() == {
+            "doc_type": "metadata", "institution": "metadata", "date": "filename",
+        }
+
+    def test_pages_decide_the_rest(self, tax_text):
+        clf = IncrementalClassifier(date_policy="first")
+        clf.hint("filename", "Invoice 2023-12-01")
+        assert clf.feed(tax_text + "x" * 500)
+        # The hinted doc type and date stand; the institution is the text's.
+        assert clf.result() == {
+            "doc_type": "Invoice",
+            "institution": "Internal Revenue Service",
+            "date": "2023-12-01",
+        }
+        assert clf.sources() == {"doc_type": "filename", "date": "filename"}
+
+    def test_misleading_file_name(self, bank_text):
+        clf = IncrementalClassifier(date_policy="period_end")
+        assert not clf.hint("filename", "target 2019-05-01 download")
+        assert not clf.hint("filename", "progressive tax plan")
+        clf.feed(bank_text)
+        assert clf.result() == {
+            "doc_type": "Bank_Statement",
+            "institution": "Chase",
+            "date": "2024-01-31",
+        }
+        assert clf.sources() == {}
+
+    def test_misleading_title(self, bank_text):
+        clf = IncrementalClassifier(date_policy="period_end")
+        assert not clf.hint("metadata", "Scanned 2020-01-01")
+        clf.feed(bank_text)
+        assert clf.result()["date"] == "2024-01-31"
+        assert clf.sources() == {}
+
+    def test_keywords_do_not_settle(self, bank_text):
+        clf = IncrementalClassifier(date_policy="first")
+        assert not clf.hint("filename", "IMG 1040 2024-05-01")
+        clf.feed(bank_text)
+        assert clf.result()["doc_type"] == "Bank_Statement"
+        assert clf.sources() == {}
+
+    def test_keywords_are_a_fallback(self):
+        clf = IncrementalClassifier()
+        clf.hint("metadata", "Health insurance card")  # names Insurance
+        assert clf.sources() == {"doc_type": "metadata"}
+        clf = IncrementalClassifier()
+        clf.hint("metadata", "Member card, health plan")
+        clf.hint("filename", "scan 1040")
+        clf.feed("Member ID 12345")
+        assert clf.result()["doc_type"] == "Medical"
+        assert clf.sources() == {"doc_type": "metadata"}
+
+    def test_only_known_institutions(self):
+        clf = IncrementalClassifier()
+        clf.hint("metadata", "Microsoft Word Document")
+        assert clf.sources() == {}
+        assert clf.result()["institution"] == ""
+
+    def test_format_sources(self):
+        info = {"doc_type": "Invoice", "institution": "", "date": "2024-01-01"}
+        assert format_sources(info, {"doc_type": "filename"}) == (
+            "doc_type:filename date:text"
+        )
+        assert format_sources({**info, "doc_type": "Unknown", "date": ""}, {}) == ""
+
+
+class TestClassifyMany:
+    @pytest.fixture()
+    def texts(self, tax_text, bank_text, insurance_text, invoice_text, unknown_text):
+        return [
+            tax_text, bank_text, insurance_text, invoice_text, unknown_text, "",
+            "Acme Widgets\nreceipt 02/30/2024 paid",
+        ] * 5
+
+    def test_matches_classify(self, texts):
+        table = classify_many(texts)
+        assert len(table) == len(texts)
+        assert list(table) == [classify(text) for text in texts]
+
+    @pytest.mark.parametrize("policy", ["first", "period_end"])
+    def test_date_policy(self, texts, policy):
+        table = classify_many(texts, date_policy=policy)
+        assert table.column("date") == [classify(t, policy)["date"] for t in texts]
+
+    def test_columns_are_compact(self, texts):
+        table = classify_many(texts)
+        assert table.column("doc_type")[:2] == ["Tax_Return", "Bank_Statement"]
+        assert table.doc_type_labels[table.doc_types[4]] == "Unknown"
+        # Each distinct institution is stored once.
+        assert len(table.institution_labels) == len(set(table.column("institution")))
+        assert table.dates[1] == 20240131
+
+    def test_custom_rules(self, texts):
+        rules = compile_rules([("Receipt", [r"\breceipt\b"])])
+        table = classify_many(texts, rules=rules)
+        assert list(table) == [classify(text, rules=rules) for text in texts]
+
+    def test_parallel_chunks(self, texts):
+        table = classify_many(iter(texts), jobs=2, chunk_size=4)
+        assert list(table) == [classify(text) for text in texts]
+
+    def test_empty(self):
+        assert len(classify_many([])) == 0
+        assert len(classify_many([], jobs=2)) == 0
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            classify_many(["x"], date_policy="median")
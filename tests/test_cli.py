@@ -1,12 +1,29 @@
 """CLI integration tests using Click's CliRunner."""
 
+import csv
+import json
+import socket
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 from click.testing import CliRunner
 
+from pdf_organizer import renamer
 from pdf_organizer.cli import main
 
+# Mocked extraction only takes effect in this process and without the cache.
+_IN_PROCESS = ["--jobs", "1", "--no-cache"]
+
+_REAL_ANALYZE = renamer._analyze
+
+
+def _slow_on_hang(pdf_path, *args, **kwargs):
+    """Stand-in for ``_analyze`` that never finishes on ``hang.pdf``."""
+    if pdf_path.name == "hang.pdf":
+        time.sleep(60)
+    return _REAL_ANALYZE(pdf_path, *args, **kwargs)
+
 
 def _make_dummy_pdf(path: Path) -> None:
     """Create a minimal valid PDF file."""
@@ -42,14 +59,14 @@ class TestCliDryRun:
     def test_dry_run_shows_would_rename(self, tmp_path):
         _make_dummy_pdf(tmp_path / "report.pdf")
 
-        # Mock extract_text to return classifiable text.
-        with patch("pdf_organizer.renamer.extract_text") as mock_extract:
-            mock_extract.return_value = (
+        # Mock page extraction to return classifiable text.
+        with patch("pdf_organizer.renamer.iter_page_texts") as mock_extract:
+            mock_extract.return_value = [
                 "Chase Bank\nAccount Summary\nBalance: $1000\n"
                 "Date: 03/15/2024\n"
-            )
+            ]
             runner = CliRunner()
-            result = runner.invoke(main, [str(tmp_path), "--dry-run"])
+            result = runner.invoke(main, [str(tmp_path), "--dry-run", *_IN_PROCESS])
 
         assert result.exit_code == 0
         assert "WOULD RENAME" in result.output
@@ -61,17 +78,17 @@ class TestCliNormalMode:
     def test_renames_and_creates_csv(self, tmp_path):
         _make_dummy_pdf(tmp_path / "doc.pdf")
 
-        with patch("pdf_organizer.renamer.extract_text") as mock_extract:
-            mock_extract.return_value = (
+        with patch("pdf_organizer.renamer.iter_page_texts") as mock_extract:
+            mock_extract.return_value = [
                 "Aetna Insurance Company\n"
                 "Policy Number: HLT-999\n"
                 "Coverage Effective: 01/01/2024\n"
                 "Premium: $300/month\n"
-            )
+            ]
             csv_path = tmp_path / "log.csv"
             runner = CliRunner()
             result = runner.invoke(
-                main, [str(tmp_path), "--output-csv", str(csv_path)]
+                main, [str(tmp_path), "--output-csv", str(csv_path), *_IN_PROCESS]
             )
 
         assert result.exit_code == 0
@@ -84,20 +101,512 @@ class TestCliNormalMode:
         _make_dummy_pdf(tmp_path / "a.pdf")
         _make_dummy_pdf(tmp_path / "b.pdf")
 
-        with patch("pdf_organizer.renamer.extract_text") as mock_extract:
+        with patch("pdf_organizer.renamer.iter_page_texts") as mock_extract:
             # First file classifiable, second returns empty text -> Unknown
             mock_extract.side_effect = [
-                "Invoice #001\nBill To: Someone\nAmount Due: $100\nDate: 05/01/2024\n",
-                "",
+                [
+                    "Invoice #001\nBill To: Someone\nAmount Due: $100\n"
+                    "Date: 05/01/2024\n"
+                ],
+                [""],
             ]
+            # The two dummy files are identical; classify both regardless.
             runner = CliRunner()
-            result = runner.invoke(main, [str(tmp_path), "--dry-run"])
+            result = runner.invoke(
+                main, [str(tmp_path), "--dry-run", "--dedup", "off", *_IN_PROCESS]
+            )
 
         assert result.exit_code == 0
         assert "1 renamed" in result.output
         assert "1 skipped" in result.output
 
 
+class TestCliJobs:
+    def test_parallel_run_renames(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice #1\namount due: $5\n05/01/2024")
+        make_pdf(tmp_path / "b.pdf", "Receipt\nPaid: $9\n06/01/2024")
+        csv_path = tmp_path / "log.csv"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, [str(tmp_path), "--jobs", "2", "--output-csv", str(csv_path)]
+        )
+
+        assert result.exit_code == 0
+        assert "2 renamed" in result.output
+        assert (tmp_path / "Invoice_2024-05-01.pdf").exists()
+        assert (tmp_path / "Receipt_2024-06-01.pdf").exists()
+
+    def test_rejects_zero_jobs(self, tmp_path):
+        runner = CliRunner()
+        result = runner.invoke(main, [str(tmp_path), "--jobs", "0"])
+        assert result.exit_code != 0
+
+
+class TestCliCache:
+    def test_second_run_hits_cache(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Receipt\npaid: $9\n06/01/2024")
+        cache_dir = tmp_path / "cache"
+        args = [str(tmp_path), "--dry-run", "--cache-dir", str(cache_dir)]
+
+        runner = CliRunner()
+        first = runner.invoke(main, args)
+        with patch("pdf_organizer.renamer.iter_page_texts") as mock_extract:
+            second = runner.invoke(main, args + ["--jobs", "1"])
+
+        assert "0 hits, 1 misses" in first.output
+        assert "1 hits, 0 misses" in second.output
+        assert "Receipt_2024-06-01.pdf" in second.output
+        mock_extract.assert_not_called()
+
+    def test_no_cache_skips_cache(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Receipt")
+        runner = CliRunner()
+        result = runner.invoke(main, [str(tmp_path), "--dry-run", "--no-cache"])
+        assert result.exit_code == 0
+        assert "Cache:" not in result.output
+
+
+class TestCliPages:
+    def test_reports_pages_parsed(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Receipt", "page 2", "page 3")
+        csv_path = tmp_path / "log.csv"
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [str(tmp_path), "--max-pages", "2", "--output-csv", str(csv_path)],
+        )
+        assert result.exit_code == 0
+        assert "Pages parsed: 2" in result.output
+        assert "pages" in csv_path.read_text().splitlines()[0]
+
+
+class TestCliInstitutions:
+    def test_dictionary_file(self, tmp_path, make_pdf):
+        folder = tmp_path / "in"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", "paid to globex\nreceipt 06/01/2024")
+        names = tmp_path / "payees.txt"
+        names.write_text("Globex\n", encoding="utf-8")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, [str(folder), "--dry-run", "--institutions", str(names)]
+        )
+
+        assert result.exit_code == 0
+        assert "Receipt_Globex_2024-06-01.pdf" in result.output
+
+
+class TestCliRecursive:
+    def test_recursive_with_filters(self, tmp_path, make_pdf):
+        for rel in ("top.pdf", "2024/a.pdf", "2024/drafts/b.pdf"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            make_pdf(tmp_path / rel, "Receipt\n06/01/2024")
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [str(tmp_path), "--dry-run", "-r", "--exclude", "drafts", *_IN_PROCESS],
+        )
+
+        assert result.exit_code == 0
+        assert "top.pdf -> Receipt_2024-06-01.pdf" in result.output
+        assert "2024/a.pdf -> 2024/Receipt_2024-06-01.pdf" in result.output
+        assert "drafts" not in result.output
+
+
+class TestCliJournal:
+    def _args(self, tmp_path, folder, *args):
+        log = str(tmp_path / "log.csv")
+        return [str(folder), "--output-csv", log, *args, *_IN_PROCESS]
+
+    def _folder(self, tmp_path, make_pdf):
+        folder = tmp_path / "in"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", "Receipt\n06/01/2024")
+        make_pdf(folder / "b.pdf", "Invoice\n07/01/2024")
+        return folder
+
+    def test_resume_skips_finished_files(self, tmp_path, make_pdf):
+        folder = self._folder(tmp_path, make_pdf)
+        journal = tmp_path / "run.jsonl"
+        runner = CliRunner()
+        first = runner.invoke(
+            main, self._args(tmp_path, folder, "--journal", str(journal))
+        )
+        assert first.exit_code == 0
+        assert len(journal.read_text().splitlines()) == 3
+
+        make_pdf(folder / "c.pdf", "Receipt\n08/01/2024")
+        second = runner.invoke(
+            main, self._args(tmp_path, folder, "--resume", str(journal))
+        )
+
+        assert second.exit_code == 0
+        assert "Resumed: 2 files already done" in second.output
+        assert "c.pdf -> Receipt_2024-08-01.pdf" in second.output
+        assert "Receipt_2024-06-01" not in second.output
+        assert len(journal.read_text().splitlines()) == 4
+        # The resumed run adds to the interrupted run's log.
+        with open(tmp_path / "log.csv", newline="") as fh:
+            logged = [row["original_name"] for row in csv.DictReader(fh)]
+        assert logged == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_resume_dry_run(self, tmp_path, make_pdf):
+        folder = self._folder(tmp_path, make_pdf)
+        journal = tmp_path / "run.jsonl"
+        runner = CliRunner()
+        args = self._args(tmp_path, folder, "--dry-run")
+        runner.invoke(main, [*args, "--journal", str(journal)])
+        result = runner.invoke(main, [*args, "--resume", str(journal)])
+
+        assert result.exit_code == 0, result.output
+        assert "Resumed: 2 files already done" in result.output
+        assert "a.pdf" not in result.output
+        assert len(journal.read_text().splitlines()) == 3
+
+    def test_undo_restores_names(self, tmp_path, make_pdf):
+        folder = self._folder(tmp_path, make_pdf)
+        journal = tmp_path / "run.jsonl"
+        runner = CliRunner()
+        runner.invoke(main, self._args(tmp_path, folder, "--journal", str(journal)))
+        assert sorted(p.name for p in folder.iterdir()) == [
+            "Invoice_2024-07-01.pdf", "Receipt_2024-06-01.pdf",
+        ]
+
+        result = runner.invoke(main, ["--undo", str(journal)])
+
+        assert result.exit_code == 0
+        assert "Summary: 2 restored, 0 errors" in result.output
+        assert sorted(p.name for p in folder.iterdir()) == ["a.pdf", "b.pdf"]
+
+    def test_resume_rejects_other_folder(self, tmp_path, make_pdf):
+        folder = self._folder(tmp_path, make_pdf)
+        journal = tmp_path / "run.jsonl"
+        runner = CliRunner()
+        runner.invoke(
+            main, [str(folder), "--dry-run", "--journal", str(journal), *_IN_PROCESS]
+        )
+        result = runner.invoke(main, [str(tmp_path), "--resume", str(journal)])
+        assert result.exit_code != 0
+        assert "different run" in result.output
+
+
+class TestCliWorkerLimits:
+    def test_reports_timed_out_files(self, tmp_path, make_pdf):
+        folder = tmp_path / "in"
+        folder.mkdir()
+        make_pdf(folder / "hang.pdf", "Invoice\n01/15/2024")
+        make_pdf(folder / "ok.pdf", "Receipt\n02/01/2024")
+        log = tmp_path / "log.csv"
+
+        with patch("pdf_organizer.renamer._analyze", _slow_on_hang):
+            result = CliRunner().invoke(main, [
+                str(folder), "--file-timeout", "1", "--output-csv", str(log),
+                *_IN_PROCESS,
+            ])
+
+        assert result.exit_code == 0
+        assert "TIMEOUT: hang.pdf" in result.output
+        assert "1 timed out" in result.output
+        with open(log, newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        statuses = {row["original_name"]: row["status"] for row in rows}
+        assert statuses == {"hang.pdf": "timeout", "ok.pdf": "renamed"}
+
+    def test_rejects_non_positive_timeout(self, tmp_path):
+        result = CliRunner().invoke(main, [str(tmp_path), "--file-timeout", "0"])
+        assert result.exit_code != 0
+
+
+class TestCliDedup:
+    def test_duplicate_reported_and_not_extracted(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice #1\namount due: $5\n05/01/2024")
+        (tmp_path / "b.pdf").write_bytes((tmp_path / "a.pdf").read_bytes())
+        log = tmp_path / "log.csv"
+
+        result = CliRunner().invoke(main, [
+            str(tmp_path), "--dedup", "report", "--output-csv", str(log),
+            *_IN_PROCESS,
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert "(duplicate of Invoice_2024-05-01.pdf)" in result.output
+        assert "Duplicates: 1" in result.output
+        assert "Pages parsed: 1" in result.output
+        with open(log, newline="") as fh:
+            rows = {row["original_name"]: row for row in csv.DictReader(fh)}
+        assert rows["a.pdf"]["duplicate_of"] == ""
+        assert rows["b.pdf"]["duplicate_of"] == "Invoice_2024-05-01.pdf"
+
+    def test_delete(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice #1\namount due: $5\n05/01/2024")
+        (tmp_path / "b.pdf").write_bytes((tmp_path / "a.pdf").read_bytes())
+
+        result = CliRunner().invoke(main, [
+            str(tmp_path), "--dedup", "delete",
+            "--output-csv", str(tmp_path / "log.csv"), *_IN_PROCESS,
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert "DELETE: b.pdf" in result.output
+        assert sorted(p.name for p in tmp_path.glob("*.pdf")) == [
+            "Invoice_2024-05-01.pdf"
+        ]
+
+    def test_off_by_default(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice #1\namount due: $5\n05/01/2024")
+        (tmp_path / "b.pdf").write_bytes((tmp_path / "a.pdf").read_bytes())
+
+        result = CliRunner().invoke(main, [
+            str(tmp_path), "--output-csv", str(tmp_path / "log.csv"), *_IN_PROCESS,
+        ])
+
+        assert result.exit_code == 0
+        assert "duplicate of" not in result.output
+        assert "Pages parsed: 2" in result.output
+
+
+class TestCliNeedsOcr:
+    def test_scans_are_reported(self, tmp_path, make_scan_pdf):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        make_scan_pdf(folder / "scan.pdf")
+        log = tmp_path / "log.csv"
+        result = CliRunner().invoke(
+            main, [str(folder), "--output-csv", str(log), *_IN_PROCESS]
+        )
+        assert result.exit_code == 0, result.output
+        assert "NEEDS OCR: scan.pdf" in result.output
+        assert "Needs OCR: 1 (no text layer)" in result.output
+        with open(log, newline="") as fh:
+            [row] = csv.DictReader(fh)
+        assert (row["new_name"], row["status"]) == ("scan.pdf", "needs_ocr")
+
+
+class TestCliTiers:
+    def _run(self, tmp_path, make_pdf, *args):
+        folder = tmp_path / "docs"
+        folder.mkdir(exist_ok=True)
+        make_pdf(folder / "a.pdf", "Chase statement 01/31/2024",
+                 info={"Title": "Aetna invoice"})
+        log = tmp_path / "log.csv"
+        result = CliRunner().invoke(
+            main,
+            [str(folder), "--output-csv", str(log), *_IN_PROCESS,
+             *args],
+        )
+        assert result.exit_code == 0, result.output
+        with open(log, newline="") as fh:
+            [row] = csv.DictReader(fh)
+        return row
+
+    def test_source_column(self, tmp_path, make_pdf):
+        row = self._run(tmp_path, make_pdf)
+        assert row["new_name"] == "Invoice_Chase_2024-01-31.pdf"
+        assert row["source"] == "doc_type:metadata institution:text date:text"
+
+    def test_text_only(self, tmp_path, make_pdf):
+        row = self._run(tmp_path, make_pdf, "--text-only")
+        assert row["new_name"] == "Bank_Statement_Chase_2024-01-31.pdf"
+        assert row["source"] == "doc_type:text institution:text date:text"
+
+
+class TestCliPlanApply:
+    def test_plan_then_apply(self, tmp_path, make_pdf):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", "Invoice #1\namount due: $5\n05/01/2024")
+        plan_path = tmp_path / "plan.jsonl"
+        log = tmp_path / "log.csv"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main, ["plan", str(folder), "-o", str(plan_path), *_IN_PROCESS]
+        )
+        assert result.exit_code == 0, result.output
+        assert "WOULD RENAME: a.pdf -> Invoice_2024-05-01.pdf" in result.output
+        assert (folder / "a.pdf").exists()
+
+        result = runner.invoke(
+            main, ["apply", str(plan_path), "--output-csv", str(log)]
+        )
+        assert result.exit_code == 0, result.output
+        assert "RENAME: a.pdf -> Invoice_2024-05-01.pdf" in result.output
+        assert (folder / "Invoice_2024-05-01.pdf").exists()
+        with open(log, newline="") as fh:
+            assert [row["status"] for row in csv.DictReader(fh)] == ["renamed"]
+
+    def test_apply_rejects_non_plan(self, tmp_path):
+        bogus = tmp_path / "plan.jsonl"
+        bogus.write_text("{}\n")
+        result = CliRunner().invoke(main, ["apply", str(bogus)])
+        assert result.exit_code != 0
+        assert "not a supported rename plan" in result.output
+
+    def test_help_lists_commands(self):
+        result = CliRunner().invoke(main, ["--help"])
+        assert result.exit_code == 0
+        for command in ("run", "plan", "apply", "merge-logs", "serve"):
+            assert command in result.output
+
+
+class TestCliShard:
+    def test_plan_apply_and_merge(self, tmp_path, make_pdf, monkeypatch):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        for i in range(4):
+            make_pdf(folder / f"scan_{i}.pdf", f"Invoice\n0{i + 1}/15/2024")
+
+        runner = CliRunner()
+        logs = []
+        monkeypatch.chdir(tmp_path)
+        # Planning changes nothing, so no shard sees another's renames.
+        for shard in ("1/2", "2/2"):
+            result = runner.invoke(
+                main, ["plan", str(folder), "--shard", shard, *_IN_PROCESS]
+            )
+            assert result.exit_code == 0, result.output
+        for i in (1, 2):
+            plan_path = Path(f"rename_plan.shard-{i}-of-2.jsonl")
+            assert plan_path.exists()
+            logs.append(str(tmp_path / f"log-{i}.csv"))
+            result = runner.invoke(
+                main, ["apply", str(plan_path), "--output-csv", logs[-1]]
+            )
+            assert result.exit_code == 0, result.output
+
+        merged = tmp_path / "merged.csv"
+        result = runner.invoke(
+            main, ["merge-logs", *logs, "--output-csv", str(merged)]
+        )
+        assert result.exit_code == 0, result.output
+        assert f"Merged 4 rows from 2 logs into {merged}" in result.output
+        with open(merged, newline="") as fh:
+            assert [row["original_name"] for row in csv.DictReader(fh)] == [
+                f"scan_{i}.pdf" for i in range(4)
+            ]
+
+    def test_run_log_is_named_after_shard(self, tmp_path, make_pdf, monkeypatch):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf")
+        runner = CliRunner()
+        monkeypatch.chdir(tmp_path)
+        result = runner.invoke(main, [str(folder), "--shard", "1/1"])
+        assert result.exit_code == 0, result.output
+        assert "Log written to rename_log.shard-1-of-1.csv" in result.output
+
+    def test_rejects_bad_shard(self, tmp_path):
+        result = CliRunner().invoke(main, [str(tmp_path), "--shard", "3/2"])
+        assert result.exit_code != 0
+        assert "is not a shard like 1/4" in result.output
+
+
+class TestCliRunLog:
+    def test_run_then_query(self, tmp_path, make_pdf, monkeypatch):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", "Invoice\nAetna\n01/15/2023")
+        make_pdf(folder / "b.pdf", "Just some text")
+        runner = CliRunner()
+        monkeypatch.chdir(tmp_path)
+        for expected_run in (1, 2):
+            result = runner.invoke(
+                main, [str(folder), "--log-format", "sqlite", *_IN_PROCESS]
+            )
+            assert result.exit_code == 0, result.output
+            assert (
+                f"Log written to rename_log.db (run {expected_run})"
+                in result.output
+            )
+
+        result = runner.invoke(main, ["query", "rename_log.db", "--run", "1"])
+        assert result.exit_code == 0, result.output
+        assert "run 1: a.pdf -> Invoice_Aetna_2023-01-15.pdf" in result.output
+        assert "2 matching rows" in result.output
+
+        exported = tmp_path / "invoices.csv"
+        result = runner.invoke(main, [
+            "query", "rename_log.db", "--doc-type", "Invoice",
+            "--output-csv", str(exported),
+        ])
+        assert result.exit_code == 0, result.output
+        assert f"Exported 2 rows to {exported}" in result.output
+        with open(exported, newline="") as fh:
+            assert [row["run_id"] for row in csv.DictReader(fh)] == ["1", "2"]
+
+    def test_query_rejects_csv_log(self, tmp_path):
+        log = tmp_path / "rename_log.csv"
+        log.write_text("original_name,new_name\n")
+        result = CliRunner().invoke(main, ["query", str(log)])
+        assert result.exit_code != 0
+        assert "is not a supported pdf-organizer run log" in result.output
+
+
+class TestCliServe:
+    def test_refuses_socket_in_use(self, tmp_path):
+        path = tmp_path / "serve.sock"
+        with socket.socket(socket.AF_UNIX) as listening:
+            listening.bind(str(path))
+            listening.listen()
+            result = CliRunner().invoke(main, ["serve", "--socket", str(path)])
+        assert result.exit_code != 0
+        assert "a server is already listening" in result.output
+
+
+class TestCliWatch:
+    def test_summary_after_interrupt(self, tmp_path):
+        def fake_watch(folder, **options):
+            yield {
+                "original_name": "a.pdf", "new_name": "Invoice.pdf",
+                "doc_type": "Invoice", "institution": "", "date": "",
+                "pages": 1, "status": "renamed", "duplicate_of": "",
+            }
+            raise KeyboardInterrupt
+
+        with patch("pdf_organizer.cli.watch_renames", fake_watch):
+            result = CliRunner().invoke(main, [
+                str(tmp_path), "--watch", "--output-csv", str(tmp_path / "log.csv"),
+            ])
+
+        assert result.exit_code == 0
+        assert "Watching" in result.output
+        assert "RENAME: a.pdf -> Invoice.pdf" in result.output
+        assert "Summary: 1 renamed, 0 skipped, 0 errors" in result.output
+
+    def test_rejects_recursive(self, tmp_path):
+        result = CliRunner().invoke(main, [str(tmp_path), "--watch", "--recursive"])
+        assert result.exit_code != 0
+        assert "--recursive" in result.output
+
+
+class TestCliProfile:
+    def test_profile_report_and_json(self, tmp_path, make_pdf):
+        folder = tmp_path / "in"
+        folder.mkdir()
+        make_pdf(folder / "a.pdf", "Receipt\n06/01/2024", "more")
+        stats = tmp_path / "profile.json"
+
+        runner = CliRunner()
+        result = runner.invoke(
+            main,
+            [str(folder), "--dry-run", "--profile-json", str(stats), *_IN_PROCESS],
+        )
+
+        assert result.exit_code == 0
+        assert "Profile: 1 files, 2 pages" in result.output
+        assert "Slowest 1 files:" in result.output
+        assert json.loads(stats.read_text())["slowest"][0]["name"] == "a.pdf"
+
+    def test_no_profile_by_default(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Receipt")
+        runner = CliRunner()
+        result = runner.invoke(main, [str(tmp_path), "--dry-run", *_IN_PROCESS])
+        assert "Profile:" not in result.output
+
+
 class TestCliMissingFolder:
     def test_nonexistent_folder(self):
         runner = CliRunner()
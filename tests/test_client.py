@@ -0,0 +1,46 @@
+"""Tests for the client module."""
+
+import json
+import threading
+
+from pdf_organizer.client import default_socket_path, main
+from pdf_organizer.server import ClassificationServer
+
+
+class TestDefaultSocketPath:
+    def test_runtime_dir(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert default_socket_path() == tmp_path / "pdf-organizer.sock"
+
+    def test_cache_dir(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert default_socket_path() == tmp_path / "pdf-organizer" / "serve.sock"
+
+
+class TestMain:
+    def test_prints_one_result_per_path(self, tmp_path, make_pdf, capsys):
+        pdf = make_pdf(tmp_path / "scan.pdf", "Invoice\n01/15/2024")
+        server = ClassificationServer(tmp_path / "serve.sock")
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            code = main([
+                "--socket", str(server.socket_path), "--rename",
+                str(pdf), str(tmp_path / "missing.pdf"),
+            ])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert code == 1
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines[0]["new_name"] == "Invoice_2024-01-15.pdf"
+        assert lines[1] == {
+            "path": str(tmp_path / "missing.pdf"), "error": "no such file",
+        }
+        assert (tmp_path / "Invoice_2024-01-15.pdf").exists()
+
+    def test_no_server(self, tmp_path, capsys):
+        assert main(["--socket", str(tmp_path / "none.sock"), "x.pdf"]) == 2
+        assert "cannot connect" in capsys.readouterr().err
@@ -0,0 +1,87 @@
+"""Tests for the dedup module."""
+
+import os
+
+from pdf_organizer import dedup
+from pdf_organizer.dedup import DuplicateFinder, partial_digest
+
+
+class TestPartialDigest:
+    def test_ignores_the_middle_of_large_files(self, tmp_path):
+        head, tail = b"h" * 10000, b"t" * 10000
+        (tmp_path / "a").write_bytes(head + b"x" * 100 + tail)
+        (tmp_path / "b").write_bytes(head + b"y" * 100 + tail)
+        size = 20100
+        assert partial_digest(tmp_path / "a", size) == partial_digest(
+            tmp_path / "b", size
+        )
+
+    def test_small_files_are_hashed_whole(self, tmp_path):
+        (tmp_path / "a").write_bytes(b"a" * 9000 + b"1")
+        (tmp_path / "b").write_bytes(b"a" * 9000 + b"2")
+        assert partial_digest(tmp_path / "a", 9001) != partial_digest(
+            tmp_path / "b", 9001
+        )
+
+
+class TestDuplicateFinder:
+    def test_identical_files(self, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"same")
+        (tmp_path / "b.pdf").write_bytes(b"same")
+        finder = DuplicateFinder()
+
+        assert finder.check(tmp_path / "a.pdf") is None
+        assert finder.check(tmp_path / "b.pdf") == tmp_path / "a.pdf"
+        assert finder.is_duplicate(tmp_path / "b.pdf")
+        assert not finder.is_duplicate(tmp_path / "a.pdf")
+
+    def test_same_size_different_content(self, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"aaaa")
+        (tmp_path / "b.pdf").write_bytes(b"bbbb")
+        finder = DuplicateFinder()
+
+        finder.check(tmp_path / "a.pdf")
+        assert finder.check(tmp_path / "b.pdf") is None
+
+    def test_unique_sizes_are_not_read(self, tmp_path, monkeypatch):
+        (tmp_path / "a.pdf").write_bytes(b"a")
+        (tmp_path / "b.pdf").write_bytes(b"bb")
+        monkeypatch.setattr(dedup, "partial_digest", None)
+        monkeypatch.setattr(dedup, "file_digest", None)
+        finder = DuplicateFinder()
+
+        assert finder.check(tmp_path / "a.pdf") is None
+        assert finder.check(tmp_path / "b.pdf") is None
+
+    def test_hard_link_is_not_read(self, tmp_path, monkeypatch):
+        (tmp_path / "a.pdf").write_bytes(b"same")
+        os.link(tmp_path / "a.pdf", tmp_path / "b.pdf")
+        monkeypatch.setattr(dedup, "partial_digest", None)
+        finder = DuplicateFinder()
+
+        finder.check(tmp_path / "a.pdf")
+        assert finder.check(tmp_path / "b.pdf") == tmp_path / "a.pdf"
+
+    def test_follows_renamed_original(self, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"same")
+        finder = DuplicateFinder()
+        finder.check(tmp_path / "a.pdf")
+        (tmp_path / "a.pdf").rename(tmp_path / "A.pdf")
+        finder.moved(tmp_path / "a.pdf", tmp_path / "A.pdf")
+        (tmp_path / "b.pdf").write_bytes(b"same")
+
+        assert finder.check(tmp_path / "b.pdf") == tmp_path / "a.pdf"
+
+    def test_original_result(self, tmp_path):
+        (tmp_path / "a.pdf").write_bytes(b"same")
+        (tmp_path / "b.pdf").write_bytes(b"same")
+        finder = DuplicateFinder()
+        finder.check(tmp_path / "a.pdf")
+        finder.check(tmp_path / "b.pdf")
+        info = {"doc_type": "Invoice", "institution": "", "date": ""}
+        finder.record(tmp_path / "a.pdf", info, "Invoice.pdf")
+
+        assert finder.original(tmp_path / "b.pdf") == (info, "Invoice.pdf")
+        # The duplicate is forgotten; only the first copy is kept.
+        assert not finder.is_duplicate(tmp_path / "b.pdf")
+        assert list(finder._by_path) == [tmp_path / "a.pdf"]
@@ -0,0 +1,269 @@
+"""Tests for the extractor module."""
+
+from types import SimpleNamespace
+
+import pdfplumber
+from pdfminer.fontmetrics import FONT_METRICS
+
+from pdf_organizer import extractor
+from pdf_organizer.extractor import (
+    ENGINES,
+    TextBuffer,
+    extract_text,
+    has_text_layer,
+    iter_page_texts,
+    read_metadata,
+)
+
+PAGES = (
+    "Chase Bank\nAccount Summary\nStatement Period: January 31, 2024",
+    "Ending Balance: $6,330.00 (final)",
+)
+
+
+class TestEngines:
+    def test_fast_matches_layout_on_simple_text(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        assert extract_text(pdf, engine="fast") == extract_text(pdf, engine="layout")
+        assert list(iter_page_texts(pdf, engine="fast")) == list(PAGES)
+
+    def test_every_engine_respects_max_pages(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        for engine in ENGINES:
+            assert list(iter_page_texts(pdf, max_pages=1, engine=engine)) == [
+                PAGES[0]
+            ]
+
+    def test_auto_falls_back_to_layout(self, tmp_path, make_pdf, monkeypatch):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        monkeypatch.setattr(
+            extractor, "_raw_page_text", lambda pdf, page: ("\ufffd\ufffd", False)
+        )
+        assert list(iter_page_texts(pdf, engine="auto")) == list(PAGES)
+        assert list(iter_page_texts(pdf, engine="fast")) == ["\ufffd\ufffd"] * 2
+
+    def test_blank_page(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", "")
+        for engine in ENGINES:
+            assert list(iter_page_texts(pdf, engine=engine)) == [""]
+
+    def test_unreadable_file(self, tmp_path):
+        bad = tmp_path / "bad.pdf"
+        bad.write_bytes(b"not a pdf")
+        assert extract_text(bad, engine="fast") == ""
+
+    def test_timings(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        timings: dict[str, float] = {}
+        list(iter_page_texts(pdf, timings=timings, engine="fast"))
+        assert set(timings) == {"open", "extract"}
+
+
+GLYPH_LINES = ("Invoice Amount Due", "Chase 05/01/2024")
+
+
+def _per_glyph_pdf(make_objects_pdf, path):
+    """Write a page that places every glyph with its own Td, as generators do."""
+    widths = FONT_METRICS["Helvetica"][1]
+    ops = [b"BT /F1 11 Tf"]
+    for i, line in enumerate(GLYPH_LINES):
+        ops.append(b"1 0 0 1 72 %d Tm" % (740 - 14 * i))
+        for ch in line:
+            if ch != " ":
+                ops.append(b"(%s) Tj" % ch.encode("latin-1"))
+            ops.append(b"%.3f 0 Td" % (widths[ch] * 11 / 1000))
+    ops.append(b"ET")
+    content = b"\n".join(ops)
+    return make_objects_pdf(path, [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[5 0 R]/Count 1>>",
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+        b"<</Length %d>>stream\n%s\nendstream" % (len(content), content),
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+        b"/Resources<</Font<</F1 3 0 R>>>>/Contents 4 0 R>>",
+    ])
+
+
+class TestPerGlyphText:
+    def test_fast_joins_glyphs_into_words(self, tmp_path, make_objects_pdf):
+        pdf = _per_glyph_pdf(make_objects_pdf, tmp_path / "a.pdf")
+        expected = ["\n".join(GLYPH_LINES)]
+        assert list(iter_page_texts(pdf, engine="fast")) == expected
+        assert list(iter_page_texts(pdf, engine="auto")) == expected
+
+    def test_auto_rejects_spaced_out_glyphs(
+        self, tmp_path, make_objects_pdf, monkeypatch
+    ):
+        pdf = _per_glyph_pdf(make_objects_pdf, tmp_path / "a.pdf")
+        monkeypatch.setattr(extractor, "_WORD_GAP", -1.0)  # a space per glyph
+        [fast] = iter_page_texts(pdf, engine="fast")
+        assert fast.startswith("I n v o i c e A m o u n t")
+        [auto] = iter_page_texts(pdf, engine="auto")
+        assert auto == extract_text(pdf, engine="layout")
+        assert auto.startswith("Invoice Amount Due")
+
+
+def _form_pdf(make_objects_pdf, path):
+    """Write a page that only draws a form XObject, which draws text."""
+    form = b"BT /F1 11 Tf 72 740 Td (Invoice) Tj ET"
+    return make_objects_pdf(path, [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[6 0 R]/Count 1>>",
+        b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+        b"<</Type/XObject/Subtype/Form/BBox[0 0 612 792]"
+        b"/Resources<</Font<</F1 3 0 R>>>>/Length %d>>stream\n%s\nendstream"
+        % (len(form), form),
+        b"<</Length 8>>stream\n/Fm1 Do\n\nendstream",
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+        b"/Resources<</XObject<</Fm1 4 0 R>>>>/Contents 5 0 R>>",
+    ])
+
+
+def _first_page_has_text(path):
+    with pdfplumber.open(path) as pdf:
+        return has_text_layer(pdf.pages[0])
+
+
+class TestTextLayer:
+    def test_text_page(self, tmp_path, make_pdf):
+        assert _first_page_has_text(make_pdf(tmp_path / "a.pdf", *PAGES))
+
+    def test_scanned_page(self, tmp_path, make_scan_pdf):
+        assert not _first_page_has_text(make_scan_pdf(tmp_path / "a.pdf"))
+
+    def test_unused_font(self, tmp_path, make_scan_pdf):
+        pdf = make_scan_pdf(tmp_path / "a.pdf", font=True)
+        assert not _first_page_has_text(pdf)
+
+    def test_text_in_form(self, tmp_path, make_objects_pdf):
+        pdf = _form_pdf(make_objects_pdf, tmp_path / "a.pdf")
+        assert _first_page_has_text(pdf)
+        assert list(iter_page_texts(pdf, engine="fast")) == ["Invoice"]
+
+    def test_textless_pages_are_not_extracted(
+        self, tmp_path, make_scan_pdf, monkeypatch
+    ):
+        pdf = make_scan_pdf(tmp_path / "a.pdf", pages=3)
+
+        def fail(pdf, page):
+            raise AssertionError("extracted a page without text")
+
+        for engine in ENGINES:
+            monkeypatch.setitem(ENGINES, engine, fail)
+            textless = []
+            texts = iter_page_texts(pdf, max_pages=2, engine=engine,
+                                    textless=textless)
+            assert list(texts) == ["", ""]
+            assert textless == [1, 2]
+
+
+XMP = """<x:xmpmeta xmlns:x="adobe:ns:meta/">
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">
+<rdf:Description xmlns:dc="http://purl.org/dc/elements/1.1/"
+    xmlns:xmp="http://ns.adobe.com/xap/1.0/"
+    xmp:CreateDate="2023-11-05T10:00:00Z">
+<dc:title><rdf:Alt><rdf:li xml:lang="x-default">Aetna claim</rdf:li></rdf:Alt>
+</dc:title>
+</rdf:Description>
+</rdf:RDF>
+</x:xmpmeta>"""
+
+
+def _metadata(path):
+    with pdfplumber.open(path) as pdf:
+        return read_metadata(pdf)
+
+
+class TestMetadata:
+    def test_info_dictionary(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES, info={
+            "Title": "Chase statement",
+            "Author": " Chase Bank ",
+            "Producer": "",
+            "CreationDate": "D:20240131120000Z",
+        })
+        assert _metadata(pdf) == {
+            "title": "Chase statement",
+            "author": "Chase Bank",
+            "created": "2024-01-31",
+        }
+
+    def test_xmp(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES, xmp=XMP)
+        assert _metadata(pdf) == {"title": "Aetna claim", "created": "2023-11-05"}
+
+    def test_info_wins_over_xmp(self, tmp_path, make_pdf):
+        pdf = make_pdf(
+            tmp_path / "a.pdf", *PAGES, info={"Title": "Invoice"}, xmp=XMP
+        )
+        assert _metadata(pdf) == {"title": "Invoice", "created": "2023-11-05"}
+
+    def test_none(self, tmp_path, make_pdf):
+        assert _metadata(make_pdf(tmp_path / "a.pdf", *PAGES)) == {}
+
+    def test_settled_by_metadata(self, tmp_path, make_pdf, monkeypatch):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES, info={"Title": "Invoice"})
+
+        def fail(pdf, page):
+            raise AssertionError("read a page")
+
+        seen = []
+        for engine in ENGINES:
+            monkeypatch.setitem(ENGINES, engine, fail)
+            texts = iter_page_texts(
+                pdf, engine=engine, on_metadata=lambda m: not seen.append(m)
+            )
+            assert list(texts) == []
+        assert seen == [{"title": "Invoice"}] * len(ENGINES)
+
+    def test_unsettled_reads_pages(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        texts = iter_page_texts(pdf, engine="fast", on_metadata=lambda m: False)
+        assert list(texts) == list(PAGES)
+
+
+class TestMemory:
+    def test_pages_are_released(self, tmp_path, make_pdf, monkeypatch):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        released = []
+        real = extractor._release
+
+        def spy(doc, page):
+            assert doc.doc._cached_objs
+            real(doc, page)
+            released.append((page.page_number, hasattr(page, "_objects")))
+            assert not doc.doc._cached_objs
+
+        monkeypatch.setattr(extractor, "_release", spy)
+        for engine in ENGINES:
+            released.clear()
+            assert list(iter_page_texts(pdf, engine=engine)) == list(PAGES)
+            assert released == [(1, False), (2, False)]
+
+    def test_without_pdfminer_object_cache(self):
+        # A pdfminer without the private object cache only costs memory.
+        page = SimpleNamespace(close=lambda: None)
+        extractor._release(SimpleNamespace(doc=SimpleNamespace()), page)
+
+    def test_max_chars(self, tmp_path, make_pdf):
+        pdf = make_pdf(tmp_path / "a.pdf", *PAGES)
+        full = extract_text(pdf, engine="fast")
+        assert extract_text(pdf, engine="fast", max_chars=10) == full[:10]
+        assert extract_text(pdf, engine="fast", max_chars=len(full)) == full
+
+
+class TestTextBuffer:
+    def test_joins_non_blank_pages(self):
+        texts = TextBuffer()
+        for text in ("a", "", "b"):
+            assert texts.add(text)
+        assert texts.text() == "a\nb"
+        assert not texts.truncated
+
+    def test_cap_counts_separators(self):
+        texts = TextBuffer(6)
+        assert texts.add("abc")
+        assert not texts.add("defg")
+        assert not texts.add("more")
+        assert texts.text() == "abc\nde"
+        assert texts.truncated
@@ -0,0 +1,82 @@
+"""Tests for the institution matcher."""
+
+import pickle
+
+from pdf_organizer.institutions import (
+    InstitutionMatcher,
+    build_matcher,
+    read_dictionary,
+)
+
+
+class TestInstitutionMatcher:
+    def test_case_insensitive(self):
+        matcher = InstitutionMatcher(["Wells Fargo"])
+        assert matcher.find("WELLS FARGO BANK, N.A.") == "Wells Fargo"
+
+    def test_word_boundaries(self):
+        matcher = InstitutionMatcher(["Chase", "Target"])
+        assert matcher.find("Thank you for your purchase") == ""
+        assert matcher.find("Targeted offers") == ""
+        assert matcher.find("Chase.") == "Chase"
+        assert matcher.find("(target)") == "Target"
+
+    def test_names_with_punctuation(self):
+        matcher = InstitutionMatcher(["AT&T", "T-Mobile"])
+        assert matcher.find("Your AT&T bill") == "AT&T"
+        assert matcher.find("t-mobile usa") == "T-Mobile"
+
+    def test_list_order_wins(self):
+        matcher = InstitutionMatcher(["Blue Cross", "Blue Shield", "Cross"])
+        assert matcher.find("Blue Shield / Blue Cross") == "Blue Cross"
+        assert matcher.find("Cross-border, Blue Shield") == "Blue Shield"
+
+    def test_overlapping_names(self):
+        matcher = InstitutionMatcher(["Bank of America", "America First"])
+        assert matcher.find("bank of america first") == "Bank of America"
+        assert matcher.find("xbank of america first") == "America First"
+
+    def test_no_match(self):
+        assert InstitutionMatcher(["Chase"]).find("") == ""
+        assert InstitutionMatcher([]).find("Chase") == ""
+
+
+class TestDictionaries:
+    def test_read_dictionary(self, tmp_path):
+        path = tmp_path / "payees.txt"
+        path.write_text("# payees\nAcme Widgets\n\n  Globex  \n", encoding="utf-8")
+        assert read_dictionary(path) == ["Acme Widgets", "Globex"]
+
+    def test_build_matcher_uses_disk_cache(self, tmp_path):
+        names = [f"Payee {i:05d}" for i in range(2000)]
+        first = build_matcher(names, tmp_path)
+        cached = list(tmp_path.glob("institutions-*.matcher"))
+        assert len(cached) == 1
+
+        second = build_matcher(names, tmp_path)
+        assert second is not first
+        assert second.find("paid to PAYEE 01234 today") == "Payee 01234"
+        assert second.fingerprint == first.fingerprint
+
+    def test_corrupt_cache_is_rebuilt(self, tmp_path):
+        build_matcher(["Globex"], tmp_path)
+        [cached] = tmp_path.glob("institutions-*.matcher")
+        cached.write_bytes(b"not a matcher")
+        assert build_matcher(["Globex"], tmp_path).find("globex corp") == "Globex"
+
+    def test_cache_holds_no_code(self, tmp_path):
+        names = ["Chase", "Bank of America", "ACME-Co", "Café Rouge"]
+        built = build_matcher(names, tmp_path)
+        [cached] = tmp_path.glob("institutions-*.matcher")
+        with open(cached, "rb") as fh:
+            loaded = InstitutionMatcher._load(fh)
+        assert (loaded._goto, loaded._out, loaded._fail) == (
+            built._goto, built._out, built._fail
+        )
+        assert loaded.find("paid at café rouge") == "Café Rouge"
+
+        # A pickle planted in its place is not loaded, only replaced.
+        cached.write_bytes(pickle.dumps(built))
+        assert build_matcher(names, tmp_path).find("chase") == "Chase"
+        with open(cached, "rb") as fh:
+            assert InstitutionMatcher._load(fh).names == names
@@ -0,0 +1,164 @@
+"""Tests for the journal module."""
+
+import json
+
+import pytest
+
+from pdf_organizer.journal import (
+    Journal,
+    completed_names,
+    iter_records,
+    read_header,
+    undo,
+)
+
+
+def _result(original, new, status="renamed"):
+    return {"original_name": original, "new_name": new, "status": status}
+
+
+class TestJournal:
+    def test_writes_header_and_records(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "Invoice.pdf"))
+
+        assert read_header(path)["folder"] == str(tmp_path.resolve())
+        assert list(iter_records(path)) == [_result("a.pdf", "Invoice.pdf")]
+
+    def test_records_are_visible_before_close(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        journal = Journal(path, tmp_path, fsync_every=1000)
+        journal.record(_result("a.pdf", "Invoice.pdf"))
+        assert len(list(iter_records(path))) == 1
+        journal.close()
+
+    def test_appends_to_existing_journal(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("b.pdf", "B.pdf"))
+        assert [r["new_name"] for r in iter_records(path)] == ["A.pdf", "B.pdf"]
+
+    def test_recovers_from_partial_last_line(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write('{"original_name": "b.pd')
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("c.pdf", "C.pdf"))
+        assert [r["new_name"] for r in iter_records(path)] == ["A.pdf", "C.pdf"]
+
+    def test_rejects_other_folder(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        (tmp_path / "other").mkdir()
+        Journal(path, tmp_path).close()
+        with pytest.raises(ValueError):
+            Journal(path, tmp_path / "other")
+
+    def test_rejects_dry_run_mismatch(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        Journal(path, tmp_path, dry_run=True).close()
+        with pytest.raises(ValueError):
+            Journal(path, tmp_path)
+
+
+class TestCompletedNames:
+    def test_errors_are_retried(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+            journal.record(_result("b.pdf", "b.pdf", "skipped"))
+            journal.record(_result("c.pdf", "C.pdf", "error"))
+        assert completed_names(path) == {"A.pdf", "b.pdf"}
+
+    def test_killed_files_are_retried(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "a.pdf", "timeout"))
+            journal.record(_result("b.pdf", "b.pdf", "oom"))
+        assert completed_names(path) == set()
+
+    def test_kept_duplicates_are_done(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "a.pdf", "duplicate"))
+            journal.record(_result("b.pdf", "B.pdf", "linked"))
+            journal.record(_result("c.pdf", "", "deleted"))
+        assert completed_names(path) == {"a.pdf", "B.pdf"}
+
+    def test_scans_needing_ocr_are_done(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "a.pdf", "needs_ocr"))
+        assert completed_names(path) == {"a.pdf"}
+
+    def test_dry_run_names_are_the_originals(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path, dry_run=True) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+            journal.record(_result("b.pdf", "", "deleted"))
+            journal.record(_result("c.pdf", "C.pdf", "error"))
+        assert completed_names(path) == {"a.pdf", "b.pdf"}
+
+
+class TestUndo:
+    def test_restores_in_reverse_order(self, tmp_path):
+        # b.pdf was renamed to A.pdf after A.pdf itself had moved away.
+        (tmp_path / "B.pdf").write_bytes(b"first")
+        (tmp_path / "A.pdf").write_bytes(b"second")
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("A.pdf", "B.pdf"))
+            journal.record(_result("b.pdf", "A.pdf"))
+            journal.record(_result("c.pdf", "c.pdf", "skipped"))
+
+        results = list(undo(path))
+
+        assert [r["status"] for r in results] == ["restored", "restored"]
+        assert (tmp_path / "A.pdf").read_bytes() == b"first"
+        assert (tmp_path / "b.pdf").read_bytes() == b"second"
+        assert not (tmp_path / "B.pdf").exists()
+
+    def test_restores_linked_duplicates(self, tmp_path):
+        (tmp_path / "B.pdf").write_bytes(b"same")
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("b.pdf", "B.pdf", "linked"))
+            journal.record(_result("c.pdf", "", "deleted"))
+
+        assert [r["new_name"] for r in undo(path)] == ["b.pdf"]
+        assert (tmp_path / "b.pdf").exists()
+
+    def test_never_overwrites(self, tmp_path):
+        (tmp_path / "A.pdf").write_bytes(b"renamed")
+        (tmp_path / "a.pdf").write_bytes(b"newcomer")
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+
+        [result] = undo(path)
+
+        assert result["status"] == "error"
+        assert (tmp_path / "a.pdf").read_bytes() == b"newcomer"
+
+    def test_dry_run_changes_nothing(self, tmp_path):
+        (tmp_path / "A.pdf").touch()
+        path = tmp_path / "run.jsonl"
+        with Journal(path, tmp_path) as journal:
+            journal.record(_result("a.pdf", "A.pdf"))
+        assert [r["status"] for r in undo(path, dry_run=True)] == ["restored"]
+        assert (tmp_path / "A.pdf").exists()
+
+    def test_refuses_dry_run_journal(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        Journal(path, tmp_path, dry_run=True).close()
+        with pytest.raises(ValueError):
+            list(undo(path))
+
+    def test_header_is_json(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        Journal(path, tmp_path).close()
+        assert json.loads(path.read_text().splitlines()[0])["version"] == 1
@@ -0,0 +1,65 @@
+"""Tests for the mapped module."""
+
+import hashlib
+import mmap
+
+import pytest
+
+from pdf_organizer.extractor import iter_page_texts
+from pdf_organizer.mapped import MappedFile
+
+
+class TestMappedFile:
+    def test_digest(self, tmp_path):
+        path = tmp_path / "a.bin"
+        data = bytes(range(256)) * 10_000
+        path.write_bytes(data)
+        with MappedFile(path) as mapped:
+            assert mapped.digest() == hashlib.sha256(data).hexdigest()
+            assert mapped.bytes_read == len(data)
+
+    def test_stream(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"0123456789")
+        with MappedFile(path) as mapped:
+            assert mapped.read(3) == b"012"
+            assert mapped.tell() == 3
+            mapped.seek(-2, 2)
+            assert mapped.read() == b"89"
+            assert mapped.read(5) == b""
+            mapped.seek(1)
+            mapped.seek(2, 1)
+            assert mapped.read(2) == b"34"
+            with pytest.raises(ValueError):
+                mapped.seek(-1)
+
+    def test_counts_each_page_once(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"x" * (3 * mmap.PAGESIZE + 10))
+        with MappedFile(path) as mapped:
+            mapped.read(10)
+            mapped.seek(0)
+            mapped.read(10)
+            assert mapped.bytes_read == mmap.PAGESIZE
+            mapped.seek(-5, 2)
+            mapped.read()
+            assert mapped.bytes_read == mmap.PAGESIZE + 10
+            mapped.digest()
+            assert mapped.bytes_read == mapped.size
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.pdf"
+        path.touch()
+        with MappedFile(path) as mapped:
+            assert mapped.read() == b""
+            assert mapped.digest() == hashlib.sha256().hexdigest()
+            assert mapped.bytes_read == 0
+
+    def test_parsed_from_the_same_map(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "a.pdf", "Invoice\n01/15/2024")
+        with MappedFile(path) as mapped:
+            mapped.digest()
+            assert list(iter_page_texts(path, mapped=mapped)) == [
+                "Invoice\n01/15/2024"
+            ]
+            assert mapped.bytes_read == path.stat().st_size
@@ -0,0 +1,88 @@
+"""Tests for the pipeline module."""
+
+import threading
+import time
+
+import pytest
+
+from pdf_organizer.pipeline import Pipeline, PipelineStats
+
+
+def _slow(seconds):
+    def stage(items):
+        for item in items:
+            time.sleep(seconds)
+            yield item
+    return stage
+
+
+def _double(items):
+    for item in items:
+        yield item * 2
+
+
+class TestPipeline:
+    def test_passes_items_in_order(self):
+        pipeline = Pipeline(depth=2)
+        results = pipeline.run(range(50), [("a", iter), ("b", _double), ("c", iter)])
+        assert list(results) == [i * 2 for i in range(50)]
+
+    def test_none_items_pass_through(self):
+        items = [None, 0, None]
+        assert list(Pipeline().run(items, [("a", iter), ("b", iter)])) == items
+
+    def test_stages_overlap(self):
+        stages = [("a", _slow(0.02)), ("b", _slow(0.02)), ("c", _slow(0.02))]
+        start = time.monotonic()
+        assert list(Pipeline().run(range(10), stages)) == list(range(10))
+        # A serial run would take 0.6 s.
+        assert time.monotonic() - start < 0.45
+
+    def test_exceptions_reach_the_caller(self):
+        def fail(items):
+            for item in items:
+                if item == 3:
+                    raise KeyError("bad item")
+                yield item
+
+        results = Pipeline().run(range(10), [("a", iter), ("b", fail), ("c", iter)])
+        with pytest.raises(KeyError, match="bad item"):
+            list(results)
+
+    def test_close_stops_every_stage(self):
+        before = threading.active_count()
+        results = Pipeline(depth=2).run(
+            range(10**6), [("a", iter), ("b", _slow(0.001)), ("c", iter)]
+        )
+        assert next(results) == 0
+        results.close()
+        assert threading.active_count() == before
+
+    def test_bounded_queues(self):
+        stats = PipelineStats()
+        results = Pipeline(depth=3, stats=stats).run(
+            range(100), [("fast", iter), ("slow", _slow(0.001))]
+        )
+        assert len(list(results)) == 100
+        [q] = stats.queues
+        assert q.name == "fast->slow"
+        assert q.max_depth <= 3
+
+    def test_stats_show_the_bottleneck(self):
+        stats = PipelineStats()
+        stages = [("scan", iter), ("parse", _slow(0.01)), ("rename", iter)]
+        list(Pipeline(stats=stats).run(range(20), stages))
+
+        scan, parse, rename = stats.stages
+        assert [s.items for s in stats.stages] == [20, 20, 20]
+        assert parse.busy > 0.15
+        assert rename.starved > 0.15
+        assert parse.busy > scan.busy + rename.busy
+        assert "parse" in "\n".join(stats.report())
+
+    def test_stats_add_up_over_runs(self):
+        stats = PipelineStats()
+        for _ in range(2):
+            list(Pipeline(stats=stats).run(range(5), [("a", iter), ("b", iter)]))
+        assert [s.items for s in stats.stages] == [10, 10]
+        assert len(stats.queues) == 1
@@ -0,0 +1,130 @@
+"""Tests for the plan module."""
+
+import json
+import os
+
+import pytest
+
+from pdf_organizer import plan as plan_module
+from pdf_organizer.plan import apply_plan, plan_folder, read_plan, write_plan
+from pdf_organizer.renamer import iter_renames
+
+
+def _plan(folder, tmp_path, **options):
+    path = tmp_path / "plan.jsonl"
+    write_plan(iter_renames(folder, dry_run=True, **options), path, folder)
+    return path
+
+
+@pytest.fixture
+def folder(tmp_path, make_pdf):
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    make_pdf(folder / "a.pdf", "Invoice\n01/15/2024")
+    make_pdf(folder / "b.pdf", "Receipt\n02/01/2024")
+    make_pdf(folder / "c.pdf", "nothing to see")
+    return folder
+
+
+class TestWritePlan:
+    def test_records_fingerprints(self, folder, tmp_path):
+        path = _plan(folder, tmp_path)
+
+        assert plan_folder(path) == folder.resolve()
+        _, records = read_plan(path)
+        assert [(r["original_name"], r["new_name"], r["status"]) for r in records] == [
+            ("a.pdf", "Invoice_2024-01-15.pdf", "renamed"),
+            ("b.pdf", "Receipt_2024-02-01.pdf", "renamed"),
+            ("c.pdf", "c.pdf", "skipped"),
+        ]
+        st = os.stat(folder / "a.pdf")
+        assert records[0]["fingerprint"] == [st.st_ino, st.st_size, st.st_mtime_ns]
+        assert sorted(p.name for p in folder.iterdir()) == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "plan.jsonl"
+        path.write_text(json.dumps({"version": 99}) + "\n")
+        with pytest.raises(ValueError):
+            read_plan(path)
+
+
+class TestApplyPlan:
+    def test_renames_without_extracting(self, folder, tmp_path, monkeypatch):
+        path = _plan(folder, tmp_path)
+        monkeypatch.setattr("pdf_organizer.renamer._analyze", None)
+
+        results = apply_plan(path)
+
+        assert [(r["new_name"], r["status"]) for r in results] == [
+            ("Invoice_2024-01-15.pdf", "renamed"),
+            ("Receipt_2024-02-01.pdf", "renamed"),
+        ]
+        assert sorted(p.name for p in folder.iterdir()) == [
+            "Invoice_2024-01-15.pdf", "Receipt_2024-02-01.pdf", "c.pdf",
+        ]
+
+    def test_dry_run_changes_nothing(self, folder, tmp_path):
+        path = _plan(folder, tmp_path)
+        assert len(apply_plan(path, dry_run=True)) == 2
+        assert sorted(p.name for p in folder.iterdir()) == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_changed_file_is_stale(self, folder, tmp_path):
+        path = _plan(folder, tmp_path)
+        with open(folder / "a.pdf", "ab") as fh:
+            fh.write(b"\n% edited")
+
+        results = apply_plan(path)
+
+        assert [(r["original_name"], r["status"]) for r in results] == [
+            ("a.pdf", "stale"), ("b.pdf", "renamed"),
+        ]
+        assert (folder / "a.pdf").exists()
+
+    def test_resolves_collisions_at_apply_time(self, folder, tmp_path):
+        path = _plan(folder, tmp_path)
+        (folder / "Invoice_2024-01-15.pdf").write_bytes(b"arrived later")
+
+        results = apply_plan(path)
+
+        assert results[0]["new_name"] == "Invoice_2024-01-15_2.pdf"
+        assert (folder / "Invoice_2024-01-15.pdf").read_bytes() == b"arrived later"
+
+    def test_rolls_back_on_failure(self, folder, tmp_path, monkeypatch):
+        path = _plan(folder, tmp_path)
+        real = plan_module._rename_noreplace
+
+        def failing(src, dst):
+            if os.path.basename(src) == "b.pdf":
+                raise PermissionError("read-only")
+            real(src, dst)
+
+        monkeypatch.setattr(plan_module, "_rename_noreplace", failing)
+
+        with pytest.raises(PermissionError):
+            apply_plan(path)
+        assert sorted(p.name for p in folder.iterdir()) == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_links_duplicates(self, folder, tmp_path):
+        (folder / "d.pdf").write_bytes((folder / "a.pdf").read_bytes())
+        path = _plan(folder, tmp_path, dedup="link")
+
+        results = apply_plan(path)
+
+        linked = results[-1]
+        assert (linked["status"], linked["duplicate_of"]) == (
+            "linked", "Invoice_2024-01-15.pdf",
+        )
+        assert (folder / linked["new_name"]).samefile(
+            folder / "Invoice_2024-01-15.pdf"
+        )
+
+    def test_keeps_duplicate_of_changed_original(self, folder, tmp_path):
+        (folder / "d.pdf").write_bytes((folder / "a.pdf").read_bytes())
+        path = _plan(folder, tmp_path, dedup="delete")
+        with open(folder / "a.pdf", "ab") as fh:
+            fh.write(b"\n% edited")
+
+        results = apply_plan(path)
+
+        assert [r["status"] for r in results] == ["stale", "renamed", "stale"]
+        assert (folder / "d.pdf").exists()
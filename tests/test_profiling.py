@@ -0,0 +1,72 @@
+"""Tests for the profiling module."""
+
+import json
+
+from pdf_organizer.profiling import STAGES, FileStats, Profiler
+
+
+def _stats(name, seconds, pages=1, size=100, peak_rss=None, bytes_read=None):
+    return FileStats(
+        name, pages, size, {"extract": seconds, "rename": 0.001}, peak_rss,
+        bytes_read,
+    )
+
+
+class TestProfiler:
+    def test_totals(self):
+        profiler = Profiler()
+        profiler.record(_stats("a.pdf", 0.2, pages=2, size=10))
+        profiler.record(_stats("b.pdf", 0.4, pages=3, size=20))
+        assert profiler.files == 2
+        assert profiler.pages == 5
+        assert profiler.bytes == 30
+        assert abs(profiler.totals["extract"] - 0.6) < 1e-9
+        assert abs(profiler.maxima["extract"] - 0.4) < 1e-9
+        assert profiler.totals["open"] == 0.0
+
+    def test_slowest_keeps_top_n(self):
+        profiler = Profiler(top=2)
+        for name, seconds in [("a", 0.1), ("b", 0.5), ("c", 0.3), ("d", 0.2)]:
+            profiler.record(_stats(name, seconds))
+        assert [s.name for s in profiler.slowest()] == ["b", "c"]
+
+    def test_hooks_receive_every_file(self):
+        seen = []
+        profiler = Profiler(hooks=(seen.append,))
+        profiler.add_hook(lambda stats: seen.append(stats.name))
+        profiler.record(_stats("a.pdf", 0.1))
+        assert seen == [_stats("a.pdf", 0.1), "a.pdf"]
+
+    def test_json_and_report(self, tmp_path):
+        profiler = Profiler(top=1)
+        profiler.record(_stats("a.pdf", 0.1))
+        profiler.finish()
+        path = tmp_path / "profile.json"
+        profiler.write_json(path)
+
+        data = json.loads(path.read_text())
+        assert set(data["stages"]) == set(STAGES)
+        assert data["slowest"][0]["name"] == "a.pdf"
+        assert data["pipeline"]["stages"] == {}
+        report = "\n".join(profiler.report())
+        assert "extract" in report and "a.pdf" in report
+
+    def test_peak_memory(self):
+        profiler = Profiler()
+        profiler.record(_stats("a.pdf", 0.1, peak_rss=50 * 2**20))
+        profiler.record(_stats("b.pdf", 0.1, peak_rss=80 * 2**20))
+        profiler.record(_stats("c.pdf", 0.1))
+
+        assert profiler.to_dict()["peak_rss"] == {
+            "name": "b.pdf", "bytes": 80 * 2**20,
+        }
+        assert "  Peak memory: 80.0 MB (b.pdf)" in profiler.report()
+
+    def test_bytes_read(self):
+        profiler = Profiler()
+        profiler.record(_stats("a.pdf", 0.1, size=2**20, bytes_read=2**20))
+        profiler.record(_stats("b.pdf", 0.1, size=2**20, bytes_read=0))
+        profiler.record(_stats("c.pdf", 0.1, size=2**20))
+
+        assert profiler.to_dict()["bytes_read"] == 2**20
+        assert "  Read: 1.0 MB of 3.0 MB (33%)" in profiler.report()
@@ -1,9 +1,27 @@
 """Tests for the renamer module."""
 
 import csv
+import errno
+import threading
+import time
 from pathlib import Path
 
-from pdf_organizer.renamer import build_new_name, write_csv_log, _sanitize
+import pytest
+
+from pdf_organizer import renamer, scanner
+from pdf_organizer.cache import ExtractionCache
+from pdf_organizer.mapped import MappedFile
+from pdf_organizer.profiling import Profiler
+from pdf_organizer.renamer import (
+    CsvLog,
+    DirectoryIndex,
+    build_new_name,
+    iter_renames,
+    rename_files,
+    write_csv_log,
+    _rename_noreplace,
+    _sanitize,
+)
 
 
 class TestSanitize:
@@ -79,8 +97,7 @@ class TestWriteCsvLog:
         assert rows[0]["doc_type"] == "Bank_Statement"
         assert rows[0]["institution"] == "Chase"
         assert rows[0]["date"] == "2024-01-31"
-        # status column is excluded from CSV
-        assert "status" not in rows[0]
+        assert rows[0]["status"] == "renamed"
 
     def test_multiple_rows(self, tmp_path):
         results = [
@@ -108,6 +125,20 @@ class TestWriteCsvLog:
             rows = list(csv.DictReader(f))
         assert len(rows) == 2
 
+    def test_append(self, tmp_path):
+        csv_path = tmp_path / "log.csv"
+        for name in ("a.pdf", "b.pdf"):
+            with CsvLog(csv_path, append=True) as log:
+                log.write({"original_name": name, "status": "skipped"})
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            assert [r["original_name"] for r in csv.DictReader(f)] == [
+                "a.pdf", "b.pdf"
+            ]
+
+        csv_path.write_text("original_name,new_name\n")
+        with pytest.raises(ValueError, match="other columns"):
+            CsvLog(csv_path, append=True)
+
 
 class TestCollisionHandling:
     def test_collision_appends_suffix(self, tmp_path):
@@ -129,3 +160,651 @@ class TestCollisionHandling:
         target = tmp_path / "Invoice_2024-01-01.pdf"
         resolved = _resolve_collision(target)
         assert resolved.name == "Invoice_2024-01-01_3.pdf"
+
+
+class TestDirectoryIndex:
+    def test_matches_resolve_collision(self, tmp_path):
+        (tmp_path / "Invoice_2024-01-01.pdf").touch()
+        (tmp_path / "Invoice_2024-01-01_2.pdf").touch()
+        index = DirectoryIndex(tmp_path)
+        assert index.resolve("Invoice_2024-01-01.pdf") == "Invoice_2024-01-01_3.pdf"
+        assert index.resolve("Receipt.pdf") == "Receipt.pdf"
+
+    def test_many_identical_names(self, tmp_path):
+        index = DirectoryIndex(tmp_path)
+        names = []
+        for _ in range(5):
+            names.append(index.resolve("Invoice.pdf"))
+            index.add(names[-1])
+        assert names == ["Invoice.pdf"] + [f"Invoice_{n}.pdf" for n in range(2, 6)]
+
+    def test_discarded_name_is_reused(self, tmp_path):
+        index = DirectoryIndex(tmp_path)
+        for name in ("Invoice.pdf", "Invoice_2.pdf", "Invoice_3.pdf"):
+            index.add(name)
+        assert index.resolve("Invoice.pdf") == "Invoice_4.pdf"
+        index.discard("Invoice_2.pdf")
+        assert index.resolve("Invoice.pdf") == "Invoice_2.pdf"
+
+    def test_rename_does_not_stat_candidates(self, tmp_path, make_pdf, monkeypatch):
+        for i in range(4):
+            make_pdf(tmp_path / f"scan_{i}.pdf", "Invoice\nDate: 01/15/2024")
+
+        def fail(self):
+            raise AssertionError("Path.exists called")
+
+        monkeypatch.setattr(Path, "exists", fail)
+        results = rename_files(tmp_path, jobs=1)
+        assert [r["new_name"] for r in results] == [
+            "Invoice_2024-01-15.pdf",
+            "Invoice_2024-01-15_2.pdf",
+            "Invoice_2024-01-15_3.pdf",
+            "Invoice_2024-01-15_4.pdf",
+        ]
+
+    def test_dry_run_matches_real_run(self, tmp_path, make_pdf):
+        for folder in ("dry", "real"):
+            (tmp_path / folder).mkdir()
+            for i in range(3):
+                make_pdf(tmp_path / folder / f"scan_{i}.pdf", "Invoice\n01/15/2024")
+        dry = rename_files(tmp_path / "dry", dry_run=True)
+        real = rename_files(tmp_path / "real")
+        assert [r["new_name"] for r in dry] == [r["new_name"] for r in real]
+
+    def test_file_created_after_snapshot(self, tmp_path, make_pdf, monkeypatch):
+        make_pdf(tmp_path / "scan.pdf", "Invoice\n01/15/2024")
+        real_index = DirectoryIndex
+
+        def late_index(folder):
+            index = real_index(folder)
+            (folder / "Invoice_2024-01-15.pdf").write_bytes(b"keep me")
+            return index
+
+        monkeypatch.setattr(renamer, "DirectoryIndex", late_index)
+        [result] = rename_files(tmp_path)
+        assert result["new_name"] == "Invoice_2024-01-15_2.pdf"
+        assert (tmp_path / "Invoice_2024-01-15.pdf").read_bytes() == b"keep me"
+
+
+class TestRecursiveRename:
+    def test_collisions_are_scoped_per_directory(self, tmp_path, make_pdf):
+        for folder in ("", "a/", "a/b/"):
+            for i in range(2):
+                path = tmp_path / f"{folder}scan_{i}.PDF"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                make_pdf(path, "Invoice\n01/15/2024")
+
+        results = rename_files(tmp_path, recursive=True)
+
+        assert [r["new_name"] for r in results] == [
+            "Invoice_2024-01-15.pdf",
+            "Invoice_2024-01-15_2.pdf",
+            "a/Invoice_2024-01-15.pdf",
+            "a/Invoice_2024-01-15_2.pdf",
+            "a/b/Invoice_2024-01-15.pdf",
+            "a/b/Invoice_2024-01-15_2.pdf",
+        ]
+        assert results[2]["original_name"] == "a/scan_0.PDF"
+        assert (tmp_path / "a" / "b" / "Invoice_2024-01-15_2.pdf").exists()
+
+    def test_parallel_matches_serial(self, tmp_path, make_pdf):
+        for run in ("serial", "parallel"):
+            for i in range(4):
+                path = tmp_path / run / f"d{i % 2}" / f"scan_{i}.pdf"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                make_pdf(path, f"Receipt\n0{i + 1}/01/2024")
+
+        serial = rename_files(tmp_path / "serial", jobs=1, recursive=True)
+        parallel = rename_files(tmp_path / "parallel", jobs=3, recursive=True)
+        assert parallel == serial
+
+
+class TestProfiling:
+    def test_records_stage_timings(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice\n01/15/2024", "page two")
+        seen = []
+        profiler = Profiler(hooks=(seen.append,))
+
+        [result] = rename_files(tmp_path, jobs=1, profiler=profiler)
+
+        [stats] = seen
+        assert stats.name == "a.pdf"
+        assert stats.pages == 2
+        assert stats.size == (tmp_path / result["new_name"]).stat().st_size
+        assert set(stats.timings) == {"open", "extract", "classify", "rename"}
+        assert "timings" not in result
+
+    def test_records_pipeline_stages(self, tmp_path, make_pdf):
+        for name in ("a.pdf", "b.pdf"):
+            make_pdf(tmp_path / name, "Invoice")
+        profiler = Profiler()
+
+        rename_files(tmp_path, jobs=1, profiler=profiler)
+
+        stages = profiler.pipeline.stages
+        assert [(s.name, s.items) for s in stages] == [
+            ("scan", 2), ("extract", 2), ("rename", 2),
+        ]
+        assert [q.name for q in profiler.pipeline.queues] == [
+            "scan->extract", "extract->rename",
+        ]
+
+    def test_no_timings_without_profiler(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "a.pdf", "Invoice")
+        info, _, _ = renamer._analyze(path)
+        assert "timings" not in info
+
+
+class TestRenameNoReplace:
+    def test_refuses_to_overwrite(self, tmp_path):
+        src, dst = tmp_path / "a.pdf", tmp_path / "b.pdf"
+        src.write_bytes(b"a")
+        dst.write_bytes(b"b")
+        with pytest.raises(FileExistsError):
+            _rename_noreplace(src, dst)
+        assert src.read_bytes() == b"a"
+        assert dst.read_bytes() == b"b"
+
+    def test_renames(self, tmp_path):
+        src, dst = tmp_path / "a.pdf", tmp_path / "b.pdf"
+        src.write_bytes(b"a")
+        _rename_noreplace(src, dst)
+        assert not src.exists()
+        assert dst.read_bytes() == b"a"
+
+    def test_without_hard_links(self, tmp_path, monkeypatch):
+        def no_link(*args, **kwargs):
+            raise PermissionError(errno.EPERM, "not supported")
+
+        monkeypatch.setattr(renamer.os, "link", no_link)
+        src, dst = tmp_path / "a.pdf", tmp_path / "b.pdf"
+        src.write_bytes(b"a")
+        (tmp_path / "c.pdf").write_bytes(b"c")
+
+        _rename_noreplace(src, dst)
+        assert dst.read_bytes() == b"a"
+        dst.rename(src)
+        with pytest.raises(FileExistsError):
+            _rename_noreplace(src, tmp_path / "c.pdf")
+        assert (tmp_path / "c.pdf").read_bytes() == b"c"
+
+
+_REAL_ANALYZE = renamer._analyze
+
+
+def _slow_on_hang(pdf_path, *args, **kwargs):
+    """Stand-in for ``_analyze`` that never finishes on ``hang.pdf``."""
+    if pdf_path.name == "hang.pdf":
+        time.sleep(60)
+    return _REAL_ANALYZE(pdf_path, *args, **kwargs)
+
+
+class TestWorkerLimits:
+    def test_timeout_leaves_file_and_continues(self, tmp_path, make_pdf, monkeypatch):
+        monkeypatch.setattr(renamer, "_analyze", _slow_on_hang)
+        make_pdf(tmp_path / "hang.pdf", "Invoice\n01/15/2024")
+        make_pdf(tmp_path / "ok.pdf", "Receipt\n02/01/2024")
+
+        results = rename_files(tmp_path, jobs=1, file_timeout=1.0)
+
+        assert [(r["original_name"], r["new_name"], r["status"]) for r in results] == [
+            ("hang.pdf", "hang.pdf", "timeout"),
+            ("ok.pdf", "Receipt_2024-02-01.pdf", "renamed"),
+        ]
+        assert (tmp_path / "hang.pdf").exists()
+
+
+class TestDedup:
+    def _populate(self, folder, make_pdf):
+        make_pdf(folder / "a.pdf", "Invoice\n01/15/2024")
+        (folder / "b.pdf").write_bytes((folder / "a.pdf").read_bytes())
+        make_pdf(folder / "c.pdf", "Receipt\n02/01/2024")
+
+    def test_duplicate_is_not_extracted(self, tmp_path, make_pdf, monkeypatch):
+        self._populate(tmp_path, make_pdf)
+        analyzed = []
+
+        def counting(pdf_path, *args, **kwargs):
+            analyzed.append(pdf_path.name)
+            return _REAL_ANALYZE(pdf_path, *args, **kwargs)
+
+        monkeypatch.setattr(renamer, "_analyze", counting)
+        results = rename_files(tmp_path, jobs=1, dedup="report")
+
+        assert analyzed == ["a.pdf", "c.pdf"]
+        assert [(r["new_name"], r["duplicate_of"], r["pages"]) for r in results] == [
+            ("Invoice_2024-01-15.pdf", "", 1),
+            ("Invoice_2024-01-15_2.pdf", "Invoice_2024-01-15.pdf", 0),
+            ("Receipt_2024-02-01.pdf", "", 1),
+        ]
+
+    def test_skip(self, tmp_path, make_pdf):
+        self._populate(tmp_path, make_pdf)
+        results = rename_files(tmp_path, jobs=1, dedup="skip")
+
+        assert [r["status"] for r in results] == ["renamed", "duplicate", "renamed"]
+        assert (tmp_path / "b.pdf").exists()
+
+    def test_link(self, tmp_path, make_pdf):
+        self._populate(tmp_path, make_pdf)
+        results = rename_files(tmp_path, jobs=1, dedup="link")
+
+        assert results[1]["status"] == "linked"
+        first = tmp_path / "Invoice_2024-01-15.pdf"
+        assert first.samefile(tmp_path / "Invoice_2024-01-15_2.pdf")
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "Invoice_2024-01-15.pdf",
+            "Invoice_2024-01-15_2.pdf",
+            "Receipt_2024-02-01.pdf",
+        ]
+
+    def test_delete(self, tmp_path, make_pdf):
+        self._populate(tmp_path, make_pdf)
+        results = rename_files(tmp_path, jobs=1, dedup="delete")
+
+        assert (results[1]["status"], results[1]["new_name"]) == ("deleted", "")
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "Invoice_2024-01-15.pdf", "Receipt_2024-02-01.pdf",
+        ]
+
+    def test_dry_run_changes_nothing(self, tmp_path, make_pdf):
+        self._populate(tmp_path, make_pdf)
+        results = rename_files(tmp_path, dry_run=True, jobs=1, dedup="delete")
+
+        assert results[1]["status"] == "deleted"
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "a.pdf", "b.pdf", "c.pdf",
+        ]
+
+    def test_parallel_matches_serial(self, tmp_path, make_pdf):
+        serial, parallel = tmp_path / "serial", tmp_path / "parallel"
+        for folder in (serial, parallel):
+            folder.mkdir()
+            self._populate(folder, make_pdf)
+        assert rename_files(serial, jobs=1, dedup="report") == rename_files(
+            parallel, jobs=2, dedup="report"
+        )
+
+    def test_rejects_unknown_action(self, tmp_path):
+        with pytest.raises(ValueError):
+            rename_files(tmp_path, dedup="merge")
+
+
+class TestSharding:
+    def test_shards_cover_folder_once(self, tmp_path, make_pdf):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        for i in range(8):
+            make_pdf(folder / f"scan_{i}.pdf", f"Invoice\n0{i + 1}/15/2024")
+
+        shards = [
+            rename_files(folder, dry_run=True, jobs=1, shard=(i, 3))
+            for i in (1, 2, 3)
+        ]
+
+        names = [r["original_name"] for results in shards for r in results]
+        assert sorted(names) == [f"scan_{i}.pdf" for i in range(8)]
+        assert all(len(results) < 8 for results in shards)
+
+    def test_shards_never_take_the_same_name(self, tmp_path, make_pdf):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        for i in range(8):
+            make_pdf(folder / f"scan_{i}.pdf", "Invoice\n01/15/2024")
+
+        results = [
+            r
+            for i in (1, 2)
+            for r in rename_files(folder, jobs=1, shard=(i, 2), dedup=None)
+        ]
+
+        assert len({r["new_name"] for r in results}) == 8
+        assert len(list(folder.iterdir())) == 8
+
+    def test_shards_never_rename_a_file_twice(self, tmp_path, make_pdf):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        inodes = {}
+        for i in range(16):
+            path = make_pdf(folder / f"scan_{i}.pdf", f"Invoice\n01/15/2024\n{i}")
+            inodes[path.name] = path.stat().st_ino
+
+        # Shard 2 lists the folder after shard 1 has renamed its files.
+        results = [
+            r
+            for i in (1, 2)
+            for r in rename_files(folder, jobs=1, shard=(i, 2), dedup=None)
+        ]
+
+        assert sorted(r["original_name"] for r in results) == sorted(inodes)
+        for r in results:
+            assert (folder / r["new_name"]).stat().st_ino == inodes[
+                r["original_name"]
+            ]
+
+    def test_shard_is_listed_lazily(self, tmp_path, make_pdf, monkeypatch):
+        folder = tmp_path / "docs"
+        folder.mkdir()
+        for i in range(100):
+            make_pdf(folder / f"scan_{i:02d}.pdf", "Invoice\n01/15/2024")
+        listed = []
+
+        def spy(*args):
+            for path in scanner.iter_pdfs(*args):
+                listed.append(path)
+                yield path
+
+        monkeypatch.setattr(renamer, "iter_pdfs", spy)
+        results = iter_renames(folder, dry_run=True, shard=(1, 2))
+        next(results)
+        # The first result comes before the whole folder has been listed.
+        assert len(listed) < 100
+        results.close()
+
+
+class TestWatchRenames:
+    def test_renames_existing_then_new_files(self, tmp_path, make_pdf):
+        make_pdf(tmp_path / "a.pdf", "Invoice\n01/15/2024")
+        stop = threading.Event()
+        results = renamer.watch_renames(tmp_path, stop=stop, settle=0.1)
+
+        first = next(results)
+        assert (first["original_name"], first["new_name"]) == (
+            "a.pdf", "Invoice_2024-01-15.pdf",
+        )
+
+        start = time.monotonic()
+        make_pdf(tmp_path / "b.pdf", "Receipt\n02/01/2024")
+        second = next(results)
+        assert time.monotonic() - start < 1.0
+        assert (second["original_name"], second["new_name"]) == (
+            "b.pdf", "Receipt_2024-02-01.pdf",
+        )
+
+        # Our own renames are not picked up again.
+        stop.set()
+        assert list(results) == []
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "Invoice_2024-01-15.pdf", "Receipt_2024-02-01.pdf",
+        ]
+
+    def test_rejects_recursive(self, tmp_path):
+        with pytest.raises(ValueError):
+            next(renamer.watch_renames(tmp_path, recursive=True))
+
+
+class TestParallelRename:
+    def _populate(self, folder, make_pdf):
+        folder.mkdir()
+        for i in range(6):
+            # Pairs of identical documents force collision handling.
+            make_pdf(
+                folder / f"scan_{i}.pdf",
+                f"Chase\nAccount Summary\nStatement date 0{i // 2 + 1}/15/2024",
+            )
+        make_pdf(folder / "blank.pdf")
+
+    def test_matches_serial_run(self, tmp_path, make_pdf):
+        self._populate(tmp_path / "serial", make_pdf)
+        self._populate(tmp_path / "parallel", make_pdf)
+
+        serial = rename_files(tmp_path / "serial", jobs=1)
+        parallel = rename_files(tmp_path / "parallel", jobs=3)
+
+        assert parallel == serial
+        assert sorted(p.name for p in (tmp_path / "parallel").iterdir()) == sorted(
+            p.name for p in (tmp_path / "serial").iterdir()
+        )
+        assert "Bank_Statement_Chase_2024-01-15_2.pdf" in {
+            r["new_name"] for r in parallel
+        }
+
+
+class TestLazyExtraction:
+    def _statement(self, folder, make_pdf):
+        folder.mkdir()
+        first = "Chase\nAccount Summary\nStatement period January 31, 2024\n"
+        return make_pdf(
+            folder / "stmt.pdf",
+            first + "padding line\n" * 40,
+            *[f"Transactions 0{i}/02/2024" for i in range(2, 8)],
+        )
+
+    def test_stops_once_settled(self, tmp_path, make_pdf):
+        folder = tmp_path / "f"
+        folder.mkdir()
+        first = "IRS\nForm 1040\nFiled April 15, 2024\n" + "padding line\n" * 40
+        make_pdf(folder / "tax.pdf", first, "Schedule B", "Bank statement")
+        [result] = rename_files(folder, dry_run=True, date_policy="first")
+        assert result["pages"] == 1
+        assert result["new_name"] == "Tax_Return_IRS_2024-04-15.pdf"
+
+    def test_lower_priority_type_reads_on(self, tmp_path, make_pdf):
+        # A later page could still hold a tax return's keywords.
+        self._statement(tmp_path / "f", make_pdf)
+        [result] = rename_files(tmp_path / "f", dry_run=True, date_policy="first")
+        assert result["pages"] == 7
+        assert result["new_name"] == "Bank_Statement_Chase_2024-01-31.pdf"
+
+    def test_latest_reads_every_page(self, tmp_path, make_pdf):
+        self._statement(tmp_path / "f", make_pdf)
+        [result] = rename_files(tmp_path / "f", dry_run=True)
+        assert result["pages"] == 7
+        assert result["date"] == "2024-07-02"
+
+    def test_max_pages_budget(self, tmp_path, make_pdf):
+        self._statement(tmp_path / "f", make_pdf)
+        [result] = rename_files(tmp_path / "f", dry_run=True, max_pages=3)
+        assert result["pages"] == 3
+        assert result["date"] == "2024-03-02"
+
+    def test_max_text_keeps_classifying(self, tmp_path, make_pdf):
+        path = self._statement(tmp_path / "f", make_pdf)
+        info, text, complete = renamer._analyze(path, keep_text=True, max_text=20)
+        assert info["date"] == "2024-07-02"
+        assert len(text) == 20
+        assert not complete
+
+    def test_hash_and_parse_read_the_file_once(self, tmp_path, make_pdf):
+        path = self._statement(tmp_path / "f", make_pdf)
+        profiler = Profiler()
+        with ExtractionCache(tmp_path / "cache") as cache:
+            rename_files(tmp_path / "f", dry_run=True, cache=cache, profiler=profiler)
+            [stats] = profiler.slowest()
+            assert stats.bytes_read == path.stat().st_size
+
+            # Known fingerprint and cached result: nothing is read.
+            profiler = Profiler()
+            rename_files(tmp_path / "f", dry_run=True, cache=cache, profiler=profiler)
+            assert profiler.slowest()[0].bytes_read == 0
+
+    def test_cache_hits_do_not_open_files(self, tmp_path, make_pdf, monkeypatch):
+        folder = tmp_path / "f"
+        folder.mkdir()
+        for name in ("a", "b", "c"):
+            make_pdf(folder / f"{name}.pdf", f"Invoice {name}\n03/15/2024")
+        opened = []
+        monkeypatch.setattr(
+            renamer, "MappedFile", lambda path: opened.append(path) or MappedFile(path)
+        )
+        with ExtractionCache(tmp_path / "cache") as cache:
+            rename_files(folder, dry_run=True, cache=cache)
+            assert len(opened) == 3
+            opened.clear()
+            rename_files(folder, dry_run=True, cache=cache)
+            assert cache.hits == 3
+        # Known fingerprints: each file is only stat'ed.
+        assert opened == []
+
+    def test_scans_need_ocr(self, tmp_path, make_pdf, make_scan_pdf):
+        folder = tmp_path / "f"
+        folder.mkdir()
+        make_scan_pdf(folder / "scan.pdf", pages=2)
+        make_pdf(folder / "other.pdf", "Invoice\nAcme\n03/15/2024")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            for _ in range(2):  # analysed, then from the cache
+                results = rename_files(folder, cache=cache)
+                scan = next(r for r in results if r["original_name"] == "scan.pdf")
+                assert scan["status"] == "needs_ocr"
+                assert scan["new_name"] == "scan.pdf"
+        assert (folder / "scan.pdf").exists()
+
+    def test_text_page_among_scans(self, tmp_path, make_objects_pdf):
+        # An invoice cover page followed by a scanned page.
+        text = b"BT /F1 11 Tf 72 740 Td (Invoice 03/15/2024) Tj ET"
+        image = b"q 10 0 0 10 0 0 cm /Im1 Do Q"
+        path = make_objects_pdf(tmp_path / "a.pdf", [
+            b"<</Type/Catalog/Pages 2 0 R>>",
+            b"<</Type/Pages/Kids[7 0 R 8 0 R]/Count 2>>",
+            b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>",
+            b"<</Type/XObject/Subtype/Image/Width 1/Height 1/ColorSpace"
+            b"/DeviceGray/BitsPerComponent 8/Length 1>>stream\n\0\nendstream",
+            b"<</Length %d>>stream\n%s\nendstream" % (len(text), text),
+            b"<</Length %d>>stream\n%s\nendstream" % (len(image), image),
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<</Font<</F1 3 0 R>>>>/Contents 5 0 R>>",
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+            b"/Resources<</XObject<</Im1 4 0 R>>>>/Contents 6 0 R>>",
+        ])
+        info, _, _ = renamer._analyze(path)
+        assert info["pages"] == 2
+        assert info["doc_type"] == "Invoice"
+        assert "status" not in info
+
+    def test_peak_rss_is_measured(self, tmp_path, make_pdf):
+        path = self._statement(tmp_path / "f", make_pdf)
+        info, _, _ = renamer._analyze(path, profile=True)
+        assert info["peak_rss"] > 0
+
+
+class TestTiers:
+    PAGES = (
+        "Chase\nAccount Summary\nStatement period January 31, 2024\n"
+        + "padding line\n" * 40,
+        "Transactions 02/02/2024",
+    )
+
+    def _analyze(self, path, **kwargs):
+        info, _, complete = renamer._analyze(path, **kwargs)
+        assert not complete or not info["source"] or "text" in info["source"]
+        return info
+
+    def test_metadata_settles_everything(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "a.pdf", *self.PAGES, info={
+            "Title": "Invoice_Aetna_2024-03-15", "Subject": "Billed in 2023",
+        })
+        info = self._analyze(path)
+        assert info["pages"] == 0
+        assert (info["doc_type"], info["institution"], info["date"]) == (
+            "Invoice", "Aetna", "2024-03-15"
+        )
+        assert info["source"] == (
+            "doc_type:metadata institution:metadata date:metadata"
+        )
+
+    def test_file_name(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "Insurance_Aetna_2023-06-01.pdf", *self.PAGES)
+        info = self._analyze(path)
+        assert info["pages"] == 0
+        assert (info["doc_type"], info["institution"], info["date"]) == (
+            "Insurance", "Aetna", "2023-06-01"
+        )
+        assert info["source"] == (
+            "doc_type:filename institution:filename date:filename"
+        )
+
+    def test_author_names_the_institution(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "a.pdf", *self.PAGES,
+                        info={"Title": "Invoice", "Author": "Aetna"})
+        info = self._analyze(path, date_policy="first")
+        assert info["pages"] == 1
+        assert (info["doc_type"], info["institution"], info["date"]) == (
+            "Invoice", "Aetna", "2024-01-31"
+        )
+        assert info["source"] == (
+            "doc_type:metadata institution:metadata date:text"
+        )
+
+    def test_misleading_file_name(self, tmp_path, make_pdf):
+        for name in ("target_2019-05-01_download.pdf", "progressive_tax_plan.pdf"):
+            path = make_pdf(tmp_path / name, *self.PAGES)
+            info = self._analyze(path, date_policy="first")
+            assert (info["doc_type"], info["institution"], info["date"]) == (
+                "Bank_Statement", "Chase", "2024-01-31"
+            )
+            assert info["source"] == "doc_type:text institution:text date:text"
+
+    def test_misleading_title(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "a.pdf", *self.PAGES,
+                        info={"Title": "Scanned 2020-01-01"})
+        info = self._analyze(path, date_policy="first")
+        assert info["date"] == "2024-01-31"
+        assert info["source"] == "doc_type:text institution:text date:text"
+
+    def test_mentions_fill_empty_fields(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "chase_2020-01-01.pdf", "Account notes")
+        info = self._analyze(path)
+        assert (info["institution"], info["date"]) == ("Chase", "2020-01-01")
+        assert info["source"] == "institution:filename date:filename"
+
+    def test_pages_fill_the_rest(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "scan0001.pdf", *self.PAGES,
+                        info={"Title": "Receipt"})
+        info = self._analyze(path, date_policy="first")
+        assert info["pages"] == 1
+        assert (info["doc_type"], info["institution"], info["date"]) == (
+            "Receipt", "Chase", "2024-01-31"
+        )
+        assert info["source"] == (
+            "doc_type:metadata institution:text date:text"
+        )
+
+    def test_keyword_in_name_does_not_override_pages(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "IMG_1040.pdf", *self.PAGES,
+                        info={"Title": "Scanned health document"})
+        info = self._analyze(path)
+        assert info["pages"] == 2
+        assert info["doc_type"] == "Bank_Statement"
+        assert info["source"] == "doc_type:text institution:text date:text"
+
+    def test_creation_date_is_a_fallback(self, tmp_path, make_pdf):
+        info = {"Title": "Invoice", "CreationDate": "D:20240505"}
+        dated = make_pdf(tmp_path / "a.pdf", "Acme\n03/15/2024", info=info)
+        undated = make_pdf(tmp_path / "b.pdf", "Acme", info=info)
+        assert self._analyze(dated)["date"] == "2024-03-15"
+        fallback = self._analyze(undated)
+        assert fallback["date"] == "2024-05-05"
+        assert fallback["source"] == "doc_type:metadata date:metadata"
+
+    def test_text_only(self, tmp_path, make_pdf):
+        path = make_pdf(tmp_path / "Invoice_Aetna.pdf", *self.PAGES,
+                        info={"Title": "Receipt"})
+        info = self._analyze(path, text_only=True)
+        assert info["pages"] == 2
+        assert info["doc_type"] == "Bank_Statement"
+        assert info["source"] == (
+            "doc_type:text institution:text date:text"
+        )
+
+    def test_organized_folder_reads_no_pages(self, tmp_path, make_pdf):
+        folder = tmp_path / "f"
+        folder.mkdir()
+        make_pdf(folder / "stmt.pdf", *self.PAGES)
+        [first] = rename_files(folder)
+        assert first["pages"] == 2
+        [again] = rename_files(folder)
+        assert again["pages"] == 0
+        assert again["new_name"] == again["original_name"] == first["new_name"]
+
+    def test_name_bound_cache_entries(self, tmp_path, make_pdf):
+        folder = tmp_path / "f"
+        folder.mkdir()
+        make_pdf(folder / "Invoice_Aetna_2024-03-15.pdf", "Page one")
+        with ExtractionCache(tmp_path / "cache") as cache:
+            [first] = rename_files(folder, dry_run=True, cache=cache)
+            assert first["doc_type"] == "Invoice"
+            (folder / first["original_name"]).rename(folder / "copy.pdf")
+            [moved] = rename_files(folder, dry_run=True, cache=cache)
+        # The name no longer says what the file is; the pages are read.
+        assert moved["pages"] == 1
+        assert moved["doc_type"] == "Unknown"
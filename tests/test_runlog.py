@@ -0,0 +1,146 @@
+"""Tests for the runlog module."""
+
+import csv
+import sqlite3
+
+import pytest
+
+from pdf_organizer import runlog
+from pdf_organizer.runlog import QUERY_FIELDS, SqliteLog, export_csv, query_log
+
+
+def _result(original, new="", doc_type="", institution="", date="", **extra):
+    return {
+        "original_name": original, "new_name": new, "doc_type": doc_type,
+        "institution": institution, "date": date, "pages": 1,
+        "status": "renamed" if new else "skipped", "duplicate_of": "", **extra,
+    }
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = tmp_path / "log.db"
+    with SqliteLog(path, tmp_path) as log:
+        log.write(_result(
+            "a.pdf", "Invoice_Aetna_2023-01-15.pdf", "Invoice", "Aetna",
+            "2023-01-15",
+        ))
+        log.write(_result(
+            "b.pdf", "Bank_Statement_Chase_2023-04-30.pdf", "Bank_Statement",
+            "Chase", "2023-04-30",
+        ))
+        log.write(_result("c.pdf"))
+    with SqliteLog(path, tmp_path, command="apply") as log:
+        log.write(_result(
+            "d.pdf", "Invoice_Chase_2024-02-01.pdf", "Invoice", "Chase",
+            "2024-02-01",
+        ))
+    return path
+
+
+def _names(rows):
+    return [row["original_name"] for row in rows]
+
+
+class TestSqliteLog:
+    def test_runs_are_appended(self, log_path):
+        rows = list(query_log(log_path))
+        assert _names(rows) == ["a.pdf", "b.pdf", "c.pdf", "d.pdf"]
+        assert [row["run_id"] for row in rows] == [1, 1, 1, 2]
+        assert rows[0]["pages"] == 1
+        assert set(rows[0]) == set(QUERY_FIELDS)
+
+    def test_runs_are_recorded(self, log_path, tmp_path):
+        with sqlite3.connect(log_path) as db:
+            runs = db.execute(
+                "SELECT id, command, folder, finished IS NOT NULL FROM runs"
+            ).fetchall()
+        folder = str(tmp_path.resolve())
+        assert runs == [(1, "run", folder, 1), (2, "apply", folder, 1)]
+
+    def test_rows_are_batched(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(runlog, "_BATCH_SIZE", 2)
+        path = tmp_path / "log.db"
+        log = SqliteLog(path, tmp_path)
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            log.write(_result(name))
+        # The first batch is committed; the rest waits for close.
+        assert _names(query_log(path)) == ["a.pdf", "b.pdf"]
+        log.close()
+        assert _names(query_log(path)) == ["a.pdf", "b.pdf", "c.pdf"]
+
+    def test_refuses_other_databases(self, tmp_path):
+        path = tmp_path / "other.db"
+        with sqlite3.connect(path) as db:
+            db.execute("CREATE TABLE things (x)")
+        with pytest.raises(ValueError, match="not a supported"):
+            SqliteLog(path, tmp_path)
+
+    def test_refuses_other_files(self, tmp_path):
+        path = tmp_path / "log.csv"
+        path.write_text("original_name,new_name\n" * 100)
+        with pytest.raises(ValueError, match="not a supported"):
+            SqliteLog(path, tmp_path)
+
+    def test_upgrades_older_logs(self, tmp_path):
+        path = tmp_path / "old.db"
+        # A first-version log, which had no source column.
+        schema = runlog._SCHEMA.replace(
+            "duplicate_of  TEXT NOT NULL,\n    source        TEXT NOT NULL",
+            "duplicate_of  TEXT NOT NULL",
+        )
+        assert "source" not in schema
+        with sqlite3.connect(path) as db:
+            db.executescript(schema + "PRAGMA user_version = 1;")
+            db.execute("INSERT INTO runs VALUES (1, 'run', '.', 0, 0)")
+            db.execute(
+                "INSERT INTO results VALUES (1, 'a.pdf', '', '', '', '', 1, "
+                "'skipped', '')"
+            )
+        with SqliteLog(path, tmp_path) as log:
+            log.write(_result("b.pdf", source="doc_type:filename"))
+        assert [row["source"] for row in query_log(path)] == [
+            "", "doc_type:filename"
+        ]
+
+
+class TestQueryLog:
+    def test_doc_type(self, log_path):
+        assert _names(query_log(log_path, doc_type="Invoice")) == [
+            "a.pdf", "d.pdf"
+        ]
+
+    def test_institution_ignores_case(self, log_path):
+        assert _names(query_log(log_path, institution="chase")) == [
+            "b.pdf", "d.pdf"
+        ]
+
+    def test_date_prefix(self, log_path):
+        assert _names(query_log(log_path, date="2023")) == ["a.pdf", "b.pdf"]
+        assert _names(query_log(log_path, date="2023-04")) == ["b.pdf"]
+        assert _names(query_log(log_path, date="2024-02-01")) == ["d.pdf"]
+
+    def test_name_matches_either_name(self, log_path):
+        assert _names(query_log(log_path, name="b.pdf")) == ["b.pdf"]
+        assert _names(
+            query_log(log_path, name="Invoice_Chase_2024-02-01.pdf")
+        ) == ["d.pdf"]
+
+    def test_combined_filters(self, log_path):
+        rows = query_log(log_path, doc_type="Invoice", run_id=1)
+        assert _names(rows) == ["a.pdf"]
+        assert _names(query_log(log_path, status="skipped")) == ["c.pdf"]
+        assert list(query_log(log_path, doc_type="Receipt")) == []
+
+    def test_missing_log(self, tmp_path):
+        with pytest.raises(ValueError, match="does not exist"):
+            list(query_log(tmp_path / "missing.db"))
+
+    def test_export_csv(self, log_path, tmp_path):
+        output = tmp_path / "out.csv"
+        assert export_csv(query_log(log_path, institution="Chase"), output) == 2
+        with open(output, newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        assert list(rows[0]) == QUERY_FIELDS
+        assert [row["run_id"] for row in rows] == ["1", "2"]
+        assert rows[1]["new_name"] == "Invoice_Chase_2024-02-01.pdf"
@@ -0,0 +1,62 @@
+"""Tests for the scanner module."""
+
+from pdf_organizer.scanner import iter_pdfs
+
+
+def _tree(root, *paths):
+    for rel in paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+def _rel(root, paths):
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+class TestIterPdfs:
+    def test_top_level_only_by_default(self, tmp_path):
+        _tree(tmp_path, "b.pdf", "a.pdf", "notes.txt", "sub/c.pdf")
+        assert _rel(tmp_path, iter_pdfs(tmp_path)) == ["a.pdf", "b.pdf"]
+
+    def test_extension_is_case_insensitive(self, tmp_path):
+        _tree(tmp_path, "A.PDF", "b.Pdf", "c.pdf.bak")
+        assert _rel(tmp_path, iter_pdfs(tmp_path)) == ["A.PDF", "b.Pdf"]
+
+    def test_recursive_groups_files_by_directory(self, tmp_path):
+        _tree(
+            tmp_path,
+            "z.pdf", "a/2.pdf", "a/1.pdf", "a/deep/x.pdf", "b/y.pdf", "m.pdf",
+        )
+        assert _rel(tmp_path, iter_pdfs(tmp_path, recursive=True)) == [
+            "m.pdf", "z.pdf", "a/1.pdf", "a/2.pdf", "a/deep/x.pdf", "b/y.pdf",
+        ]
+
+    def test_include_and_exclude(self, tmp_path):
+        _tree(
+            tmp_path,
+            "2023/bank.pdf", "2023/tax.pdf", "2024/bank.pdf", "2024/skip/bank.pdf",
+        )
+        found = iter_pdfs(
+            tmp_path, recursive=True, include=["bank*"], exclude=["2024/skip"]
+        )
+        assert _rel(tmp_path, found) == ["2023/bank.pdf", "2024/bank.pdf"]
+
+    def test_exclude_matches_relative_path(self, tmp_path):
+        _tree(tmp_path, "a/keep.pdf", "a/old.pdf", "old.pdf")
+        found = iter_pdfs(tmp_path, recursive=True, exclude=["a/old.pdf"])
+        assert _rel(tmp_path, found) == ["old.pdf", "a/keep.pdf"]
+
+    def test_does_not_follow_directory_symlinks(self, tmp_path):
+        _tree(tmp_path, "a/x.pdf")
+        (tmp_path / "a" / "loop").symlink_to(tmp_path, target_is_directory=True)
+        assert _rel(tmp_path, iter_pdfs(tmp_path, recursive=True)) == ["a/x.pdf"]
+
+    def test_is_lazy(self, tmp_path):
+        _tree(tmp_path, "a/x.pdf", "b/y.pdf")
+        found = iter_pdfs(tmp_path, recursive=True)
+        assert next(found).name == "x.pdf"
+        # Directories created mid-walk are still picked up: "b" is not
+        # listed until "a" is done.
+        _tree(tmp_path, "b/z.pdf")
+        assert [p.name for p in found] == ["y.pdf", "z.pdf"]
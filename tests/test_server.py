@@ -0,0 +1,94 @@
+"""Tests for the server module."""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from pdf_organizer.client import Client, ServiceError
+from pdf_organizer.server import ClassificationServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ClassificationServer(tmp_path / "serve.sock", engine="fast")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def client(server):
+    with Client(server.socket_path, timeout=30) as client:
+        yield client
+
+
+class TestClassificationServer:
+    def test_classify_reports_new_name(self, tmp_path, make_pdf, client):
+        pdf = make_pdf(tmp_path / "scan.pdf", "Invoice\n01/15/2024")
+
+        result = client.classify(str(pdf))
+
+        assert result == {
+            "path": str(pdf),
+            "original_name": "scan.pdf",
+            "new_name": "Invoice_2024-01-15.pdf",
+            "doc_type": "Invoice",
+            "institution": "",
+            "date": "2024-01-15",
+            "pages": 1,
+            "status": "renamed",
+            "duplicate_of": "",
+            "source": "doc_type:text date:text",
+        }
+        assert pdf.exists()
+
+    def test_rename(self, tmp_path, make_pdf, client):
+        make_pdf(tmp_path / "Invoice_2024-01-15.pdf", "Invoice\n01/15/2024")
+        pdf = make_pdf(tmp_path / "scan.pdf", "Invoice\n01/15/2024")
+
+        result = client.rename(str(pdf))
+
+        assert (result["status"], result["new_name"]) == (
+            "renamed", "Invoice_2024-01-15_2.pdf",
+        )
+        assert (tmp_path / "Invoice_2024-01-15_2.pdf").exists()
+        assert not pdf.exists()
+
+    def test_errors(self, tmp_path, client):
+        with pytest.raises(ServiceError, match="no such file"):
+            client.classify(str(tmp_path / "missing.pdf"))
+        with pytest.raises(ServiceError, match="unknown op"):
+            client.request("delete", str(tmp_path / "missing.pdf"))
+        # The connection stays usable after an error.
+        with pytest.raises(ServiceError, match="no such file"):
+            client.classify(str(tmp_path / "missing.pdf"))
+
+    def test_rejects_malformed_request(self, server):
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(str(server.socket_path))
+            sock.sendall(b"not json\n")
+            reply = json.loads(sock.makefile("rb").readline())
+        assert "error" in reply
+
+    def test_socket_is_private(self, server):
+        assert server.socket_path.stat().st_mode & 0o777 == 0o600
+
+    def test_refuses_running_server(self, server):
+        with pytest.raises(FileExistsError):
+            ClassificationServer(server.socket_path)
+
+    def test_replaces_stale_socket(self, tmp_path):
+        path = tmp_path / "serve.sock"
+        stale = socket.socket(socket.AF_UNIX)
+        stale.bind(str(path))
+        stale.close()
+
+        server = ClassificationServer(path)
+        server.server_close()
+
+        assert not path.exists()
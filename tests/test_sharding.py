@@ -0,0 +1,93 @@
+"""Tests for the sharding module."""
+
+import csv
+
+import pytest
+
+from pdf_organizer.renamer import CsvLog
+from pdf_organizer.scanner import iter_pdfs, scan_order_key
+from pdf_organizer.sharding import (
+    merge_logs,
+    parse_shard,
+    shard_key,
+    shard_of,
+    shard_path,
+)
+
+
+def _log(path, names):
+    with CsvLog(path) as log:
+        for name in names:
+            log.write({
+                "original_name": name, "new_name": "", "doc_type": "",
+                "institution": "", "date": "", "pages": 1, "status": "skipped",
+                "duplicate_of": "",
+            })
+
+
+def _names(path):
+    with open(path, newline="") as fh:
+        return [row["original_name"] for row in csv.DictReader(fh)]
+
+
+class TestParseShard:
+    def test_valid(self):
+        assert parse_shard("2/4") == (2, 4)
+        assert parse_shard("1/1") == (1, 1)
+
+    @pytest.mark.parametrize("spec", ["0/4", "5/4", "2", "a/b", "1/0", ""])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+class TestShardOf:
+    def test_is_stable(self):
+        # Hosts only agree if the hash never depends on the process.
+        assert shard_of("2024/scan_001.pdf", 4) == shard_of("2024/scan_001.pdf", 4)
+        assert shard_of("scan_001.pdf", 1) == 1
+
+    def test_spreads_files_evenly(self):
+        shards = [shard_of(f"scan_{i:05d}.pdf", 4) for i in range(4000)]
+        for index in range(1, 5):
+            assert 900 < shards.count(index) < 1100
+
+    def test_key_survives_rename(self, tmp_path):
+        path = tmp_path / "scan_001.pdf"
+        path.write_bytes(b"%PDF")
+        key = shard_key(path, tmp_path)
+        assert key.startswith("inode:")
+        path.rename(tmp_path / "Invoice_2024-01-15.pdf")
+        assert shard_key(tmp_path / "Invoice_2024-01-15.pdf", tmp_path) == key
+
+    def test_key_of_missing_file_is_its_path(self, tmp_path):
+        assert shard_key(tmp_path / "a" / "gone.pdf", tmp_path) == "a/gone.pdf"
+
+    def test_shard_path(self, tmp_path):
+        assert shard_path(tmp_path / "rename_log.csv", (2, 4)) == (
+            tmp_path / "rename_log.shard-2-of-4.csv"
+        )
+
+
+class TestMergeLogs:
+    def test_scan_order_key_matches_iter_pdfs(self, tmp_path):
+        for rel in ("b.pdf", "a/z.pdf", "a/b/c.pdf", "c/a.pdf", "a.pdf", "a/a.pdf"):
+            path = tmp_path / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+        scanned = [
+            p.relative_to(tmp_path).as_posix()
+            for p in iter_pdfs(tmp_path, recursive=True)
+        ]
+        assert sorted(scanned, key=scan_order_key) == scanned
+
+    def test_merges_in_scan_order(self, tmp_path):
+        _log(tmp_path / "1.csv", ["a.pdf", "d.pdf", "sub/b.pdf"])
+        _log(tmp_path / "2.csv", ["b.pdf", "c.pdf", "sub/a.pdf", "sub/deep/a.pdf"])
+        output = tmp_path / "merged.csv"
+
+        assert merge_logs([tmp_path / "1.csv", tmp_path / "2.csv"], output) == 7
+        assert _names(output) == [
+            "a.pdf", "b.pdf", "c.pdf", "d.pdf",
+            "sub/a.pdf", "sub/b.pdf", "sub/deep/a.pdf",
+        ]
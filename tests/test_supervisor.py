@@ -0,0 +1,100 @@
+"""Tests for the supervisor module."""
+
+import os
+import time
+
+import pytest
+
+from pdf_organizer.supervisor import (
+    SupervisedPool,
+    WorkerFailed,
+    WorkerOutOfMemory,
+    WorkerTimeout,
+    peak_rss,
+    reset_peak_rss,
+)
+
+
+def _task(arg):
+    if arg == "slow":
+        time.sleep(60)
+    elif arg == "big":
+        hog = bytearray(400 * 1024 * 1024)
+        hog[::4096] = b"x" * len(hog[::4096])  # touch every page
+        time.sleep(60)
+    elif arg == "crash":
+        os._exit(3)
+    elif arg == "raise":
+        raise ValueError("bad input")
+    return arg * 2
+
+
+class TestSupervisedPool:
+    def test_results(self):
+        with SupervisedPool(_task, 2) as pool:
+            futures = [pool.submit(i) for i in range(10)]
+            assert [f.result(timeout=10) for f in futures] == list(range(0, 20, 2))
+
+    def test_timeout_kills_and_replaces_worker(self):
+        with SupervisedPool(_task, 1, timeout=0.5) as pool:
+            slow = pool.submit("slow")
+            after = pool.submit(21)
+            with pytest.raises(WorkerTimeout):
+                slow.result(timeout=10)
+            assert after.result(timeout=10) == 42
+
+    def test_memory_limit(self):
+        with SupervisedPool(_task, 1, max_rss=200 * 1024 * 1024) as pool:
+            big = pool.submit("big")
+            after = pool.submit(5)
+            with pytest.raises(WorkerOutOfMemory) as exc_info:
+                big.result(timeout=20)
+            assert exc_info.value.status == "oom"
+            assert after.result(timeout=10) == 10
+
+    def test_crashed_worker(self):
+        with SupervisedPool(_task, 1) as pool:
+            crash = pool.submit("crash")
+            after = pool.submit(1)
+            with pytest.raises(WorkerFailed) as exc_info:
+                crash.result(timeout=10)
+            assert exc_info.value.status == "error"
+            assert after.result(timeout=10) == 2
+
+    def test_exceptions_are_passed_through(self):
+        with SupervisedPool(_task, 1) as pool:
+            with pytest.raises(ValueError, match="bad input"):
+                pool.submit("raise").result(timeout=10)
+
+    def test_other_workers_keep_going(self):
+        with SupervisedPool(_task, 2, timeout=1.0) as pool:
+            slow = pool.submit("slow")
+            start = time.monotonic()
+            quick = [pool.submit(i) for i in range(20)]
+            assert [f.result(timeout=10) for f in quick] == list(range(0, 40, 2))
+            assert time.monotonic() - start < 1.0
+            with pytest.raises(WorkerTimeout):
+                slow.result(timeout=10)
+
+    def test_shutdown_with_pending_work(self):
+        pool = SupervisedPool(_task, 1)
+        slow = pool.submit("slow")
+        queued = pool.submit(1)
+        time.sleep(0.2)
+        pool.shutdown()
+        assert queued.cancelled()
+        with pytest.raises(WorkerFailed):
+            slow.result(timeout=1)
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/clear_refs"), reason="needs Linux /proc"
+)
+class TestPeakRss:
+    def test_reset(self):
+        hog = bytearray(64 * 1024 * 1024)
+        hog[::4096] = b"x" * len(hog[::4096])
+        high = peak_rss()
+        del hog
+        reset_peak_rss()
+        assert peak_rss() < high - 32 * 1024 * 1024
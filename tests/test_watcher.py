@@ -0,0 +1,71 @@
+"""Tests for the watcher module."""
+
+import time
+
+import pytest
+
+from pdf_organizer.watcher import FolderWatcher
+
+
+@pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+def use_inotify(request):
+    return request.param
+
+
+def _wait_for(watcher, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ready = watcher.wait(0.2)
+        if ready:
+            return ready
+    return []
+
+
+class TestFolderWatcher:
+    def test_reports_new_pdfs(self, tmp_path, use_inotify):
+        (tmp_path / "old.pdf").write_bytes(b"%PDF")
+        with FolderWatcher(tmp_path, settle=0.1, use_inotify=use_inotify) as watcher:
+            (tmp_path / "new.PDF").write_bytes(b"%PDF")
+            (tmp_path / "notes.txt").write_text("x")
+            assert _wait_for(watcher) == [tmp_path / "new.PDF"]
+            assert watcher.wait(0.3) == []
+
+    def test_waits_until_file_is_complete(self, tmp_path, use_inotify):
+        with FolderWatcher(tmp_path, settle=0.3, use_inotify=use_inotify) as watcher:
+            path = tmp_path / "big.pdf"
+            with open(path, "wb") as fh:
+                for _ in range(4):
+                    fh.write(b"%PDF" * 100)
+                    fh.flush()
+                    assert watcher.wait(0.15) == []
+            assert _wait_for(watcher) == [path]
+
+    def test_ignored_names(self, tmp_path, use_inotify):
+        (tmp_path / "a.pdf").write_bytes(b"%PDF")
+        with FolderWatcher(tmp_path, settle=0.1, use_inotify=use_inotify) as watcher:
+            watcher.ignore("Invoice.pdf")
+            (tmp_path / "a.pdf").rename(tmp_path / "Invoice.pdf")
+            (tmp_path / "b.pdf").write_bytes(b"%PDF")
+            assert _wait_for(watcher) == [tmp_path / "b.pdf"]
+            assert watcher.wait(0.3) == []
+
+    def test_include_exclude(self, tmp_path, use_inotify):
+        with FolderWatcher(
+            tmp_path, settle=0.1, include=["scan_*"], exclude=["*_draft.pdf"],
+            use_inotify=use_inotify,
+        ) as watcher:
+            for name in ("scan_1.pdf", "scan_2_draft.pdf", "other.pdf"):
+                (tmp_path / name).write_bytes(b"%PDF")
+            assert _wait_for(watcher) == [tmp_path / "scan_1.pdf"]
+
+    def test_vanished_files_are_dropped(self, tmp_path, use_inotify):
+        with FolderWatcher(tmp_path, settle=0.2, use_inotify=use_inotify) as watcher:
+            path = tmp_path / "tmp.pdf"
+            path.write_bytes(b"%PDF")
+            time.sleep(0.05)
+            path.unlink()
+            assert watcher.wait(0.5) == []
+
+    def test_backend(self, tmp_path):
+        with FolderWatcher(tmp_path, use_inotify=False) as watcher:
+            assert watcher.backend == "polling"